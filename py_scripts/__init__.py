@@ -5,13 +5,24 @@
 包含所有爬虫相关的模块和功能
 """
 
-from .config import CrawlerConfig
-from .wechat_window_manager import WeChatWindowManager
-from .screenshot_manager import ScreenshotManager
-from .interaction_manager import InteractionManager
-from .analysis_client import AnalysisClient
-from .data_manager import DataManager
-from .crawler_core import CrawlerCore
+from .lazy_imports import lazy_exports
+
+_LAZY_IMPORTS = {
+    'CrawlerConfig': '.config',
+    'WeChatWindowManager': '.wechat_window_manager',
+    'ScreenshotManager': '.screenshot_manager',
+    'InteractionManager': '.interaction_manager',
+    'InputScheduler': '.input_scheduler',
+    'get_input_scheduler': '.input_scheduler',
+    'FocusTracker': '.focus_tracker',
+    'AnalysisClient': '.analysis_client',
+    'DataManager': '.data_manager',
+    'CrawlerCore': '.smart_crawler'
+}
+
+# 按需导入各组件，导入包本身时不加载任何第三方依赖
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS)
+
 
 __version__ = "2.1.0"
 __author__ = "WeChat Mini Program Crawler Team"
@@ -21,6 +32,9 @@ __all__ = [
     'WeChatWindowManager',
     'ScreenshotManager', 
     'InteractionManager',
+    'InputScheduler',
+    'get_input_scheduler',
+    'FocusTracker',
     'AnalysisClient',
     'DataManager',
     'CrawlerCore'
@@ -8,17 +8,22 @@
 import base64
 import requests
 from config import CrawlerConfig
+import time
+from tracer import tracer
+from metrics import ANALYSIS_LATENCY
 
 class AnalysisClient:
     """分析客户端"""
     
     def __init__(self):
         self.server_url = CrawlerConfig.SERVER_URL
+        # 复用HTTP连接（批量爬取多个应用时也共用同一会话）
+        self.session = requests.Session()
     
     def check_server_health(self):
         """检查MCP服务器状态"""
         try:
-            response = requests.get(f"{self.server_url}/health", timeout=5)
+            response = self.session.get(f"{self.server_url}/health", timeout=5)
             if response.status_code == 200:
                 print("✅ MCP服务器连接正常")
                 return True
@@ -60,12 +65,15 @@ class AnalysisClient:
         }
         
         try:
-            response = requests.post(
-                f"{self.server_url}/api/v1/wechat-mini/analyze-screenshot",
-                json=request_data,
-                headers={'Content-Type': 'application/json'},
-                timeout=CrawlerConfig.ANALYSIS_TIMEOUT
-            )
+            started = time.perf_counter()
+            with tracer.span('analysis', page=page_name):
+                response = self.session.post(
+                    f"{self.server_url}/api/v1/wechat-mini/analyze-screenshot",
+                    json=request_data,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=CrawlerConfig.ANALYSIS_TIMEOUT
+                )
+            ANALYSIS_LATENCY.observe(time.perf_counter() - started)
             
             if response.status_code == 200:
                 result = response.json()
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试脚本
+每个脚本都可以直接运行: python py_scripts/benchmarks/<脚本名>.py
+"""
\ No newline at end of file
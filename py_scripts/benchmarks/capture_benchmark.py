@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图后端基准测试
+对比各截图后端的每秒帧数和每帧内存分配（含下游转换为OpenCV格式的开销）
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from capture_manager import PILCaptureBackend, MSSCaptureBackend, ReplayCaptureBackend
+
+
+def create_replay_backend(replay_dir, width, height):
+    """创建回放后端，没有录制帧时生成合成帧"""
+    if replay_dir:
+        return ReplayCaptureBackend(replay_dir, advance_on_grab=True)
+    
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+    return ReplayCaptureBackend(frames, advance_on_grab=True)
+
+
+def create_backends(names, replay_dir, width, height):
+    """按名称创建可用的截图后端，不可用的后端跳过"""
+    backends = []
+    for name in names:
+        try:
+            if name == 'pil':
+                backends.append(PILCaptureBackend())
+            elif name == 'mss':
+                backends.append(MSSCaptureBackend())
+            elif name == 'replay':
+                backends.append(create_replay_backend(replay_dir, width, height))
+        except Exception as e:
+            print(f"⚠️ 跳过截图后端 {name}: {e}")
+    return backends
+
+
+def consume(frame):
+    """模拟下游的典型使用：灰度转换"""
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def benchmark_backend(backend, bbox, iterations, warmup=3):
+    """测量单个后端的吞吐和内存分配"""
+    for _ in range(warmup):
+        consume(backend.grab(bbox))
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        consume(backend.grab(bbox))
+    elapsed = time.perf_counter() - started
+    
+    # 内存分配单独测量，避免tracemalloc拖慢计时
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    snapshot_before = tracemalloc.get_traced_memory()[0]
+    for _ in range(iterations):
+        consume(backend.grab(bbox))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'backend': backend.name,
+        'fps': iterations / elapsed if elapsed else 0,
+        'ms_per_frame': elapsed / iterations * 1000,
+        'peak_mb': (peak - snapshot_before) / 1024 / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="截图后端基准测试")
+    parser.add_argument('--backends', default='pil,mss,replay', help="逗号分隔的后端列表")
+    parser.add_argument('--bbox', default='0,0,414,896', help="抓取区域 left,top,right,bottom")
+    parser.add_argument('--iterations', type=int, default=50, help="每个后端的抓取次数")
+    parser.add_argument('--replay-dir', default=None, help="replay后端使用的录制帧目录（默认生成合成帧）")
+    args = parser.parse_args()
+    
+    bbox = tuple(int(v) for v in args.bbox.split(','))
+    width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    backends = create_backends(args.backends.split(','), args.replay_dir, width, height)
+    if not backends:
+        print("❌ 没有可用的截图后端")
+        return 1
+    
+    print(f"📷 抓取区域 {width}x{height}，每个后端 {args.iterations} 次")
+    print(f"{'后端':<8} {'帧/秒':>8} {'毫秒/帧':>8} {'峰值分配MB':>10}")
+    for backend in backends:
+        try:
+            result = benchmark_backend(backend, bbox, args.iterations)
+            print(f"{result['backend']:<8} {result['fps']:>8.1f} {result['ms_per_frame']:>8.2f} {result['peak_mb']:>10.2f}")
+        except Exception as e:
+            print(f"⚠️ 截图后端 {backend.name} 测试失败: {e}")
+        finally:
+            backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
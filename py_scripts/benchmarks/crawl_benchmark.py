@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端爬取基准测试
+在模拟小程序上运行完整的 MainCrawler.start_crawling，统计耗时、截图帧数、OCR调用和sleep次数
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 模拟环境必须在导入爬虫模块之前安装
+from simulator import SimulatedEnvironment, MiniProgramSimulator, SimulatedPage
+
+
+def build_app(args):
+    """按参数构建模拟小程序"""
+    from ocr_manager.button_matcher import ButtonMatcher
+    buttons = ButtonMatcher().target_buttons[:args.buttons]
+    pages = {name: SimulatedPage(name, item_count=args.items) for name in buttons} if args.items else None
+    return MiniProgramSimulator(buttons, pages=pages, load_time=args.load_time)
+
+
+def run_once(environment, verbose):
+    """运行一次完整爬取，返回统计结果"""
+    environment.app.reset()
+    crawler = environment.create_crawler()
+    environment.reset_stats()
+    blob_store = crawler.screenshot_manager.blob_store
+    written_before = blob_store.stats['bytes_written'] if blob_store is not None else 0
+    
+    output = io.StringIO()
+    redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output)
+    started = time.perf_counter()
+    with redirect:
+        success = crawler.start_crawling(environment.app.app_name)
+    wall_time = time.perf_counter() - started
+    
+    stats = environment.get_stats()
+    stats['success'] = success
+    stats['wall_time'] = round(wall_time, 3)
+    stats['pages'] = len(crawler.data_manager.crawl_data['pages'])
+    stats['written_kb'] = round((blob_store.stats['bytes_written'] - written_before) / 1024) if blob_store is not None else '-'
+    stats['reused'] = sum(1 for page in crawler.data_manager.crawl_data['pages']
+                          if page.get('delta', {}).get('status') == 'unchanged')
+    return stats
+
+
+def print_results(results):
+    """打印每轮结果"""
+    columns = [
+        ('wall_time', '墙钟(s)'),
+        ('sleep_seconds', '虚拟等待(s)'),
+        ('sleeps', 'sleep次数'),
+        ('frames', '截图帧'),
+        ('ocr_calls', 'OCR调用'),
+        ('ocr_pixels', 'OCR像素'),
+        ('clicks', '点击'),
+        ('scrolls', '滚动'),
+        ('pages', '页面'),
+        ('reused', '复用页面'),
+        ('written_kb', '截图写盘KB')
+    ]
+    print("\n📊 端到端爬取基准测试结果")
+    print("轮次  " + "  ".join(f"{title:>10}" for _, title in columns))
+    for i, stats in enumerate(results):
+        flag = "" if stats['success'] else "  ❌"
+        print(f"{i + 1:<4}  " + "  ".join(f"{stats[key]:>10}" for key, _ in columns) + flag)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端爬取基准测试（模拟小程序）")
+    parser.add_argument('--runs', type=int, default=2, help="爬取轮数（共用输出目录，第二轮起命中按钮缓存）")
+    parser.add_argument('--buttons', type=int, default=12, help="主页按钮数量")
+    parser.add_argument('--items', type=int, default=0, help="每个内页的条目数（默认按页面变化）")
+    parser.add_argument('--load-time', type=float, default=0.5, help="模拟页面加载时间（虚拟秒）")
+    parser.add_argument('--fresh-cache', action='store_true', help="每轮前清空按钮缓存")
+    parser.add_argument('--delta', action='store_true', help="增量爬取（第二轮起以上一轮为基线）")
+    parser.add_argument('--churn', type=float, default=0.0, help="第二轮起每轮前内容发生变化的页面比例")
+    parser.add_argument('--output-dir', default=None, help="结果输出目录（默认临时目录）")
+    parser.add_argument('--verbose', action='store_true', help="显示爬虫日志")
+    args = parser.parse_args()
+    
+    environment = SimulatedEnvironment().install()
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix="crawl_benchmark_")
+    environment.use_output_dir(output_dir)
+    environment.set_app(build_app(args))
+    
+    # 与main.py一致的PyAutoGUI配置
+    import pyautogui
+    from config import CrawlerConfig
+    pyautogui.PAUSE = CrawlerConfig.PYAUTOGUI_PAUSE
+    # 基准测试可能在同一主机上并行运行，不占用指标端口
+    CrawlerConfig.METRICS_HTTP_PORT = 0
+    
+    CrawlerConfig.DELTA_CRAWL = args.delta
+    
+    rng = random.Random(0)
+    results = []
+    try:
+        for run in range(args.runs):
+            if args.fresh_cache and os.path.exists(CrawlerConfig.BUTTON_CACHE_FILE):
+                os.remove(CrawlerConfig.BUTTON_CACHE_FILE)
+            if run > 0 and args.churn > 0:
+                pages = list(environment.app.pages)
+                for page_name in rng.sample(pages, round(len(pages) * args.churn)):
+                    environment.app.update_page(page_name)
+            results.append(run_once(environment, args.verbose))
+    finally:
+        environment.uninstall()
+        if not args.output_dir:
+            shutil.rmtree(output_dir, ignore_errors=True)
+    
+    print_results(results)
+    return 0 if all(stats['success'] for stats in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
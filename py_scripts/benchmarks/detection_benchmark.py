@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+区域检测基准测试
+在录制的微信窗口截图（带标注的真实边界）上运行各检测器和完整 DetectionStrategy，
+统计每个检测器的耗时分布、IoU准确率以及检测策略的兜底率
+
+数据目录结构:
+    frames/ground_truth.json
+    frames/*.png
+
+ground_truth.json:
+    {"frames": [{"image": "001.png",
+                 "title": "微信",
+                 "origin": [0, 0],
+                 "window": {"x": 0, "y": 0, "width": 900, "height": 800},
+                 "miniprogram": {"x": 243, "y": 30, "width": 414, "height": 736}}]}
+
+origin为截图左上角对应的屏幕坐标（默认(0,0)），window和miniprogram均为屏幕坐标
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 检测器只通过pygetwindow查询窗口，回放时每帧替换为录制的窗口；
+# 必须在导入爬虫模块之前安装（Linux等没有pygetwindow的环境也能运行）
+sys.modules['pygetwindow'] = types.ModuleType('pygetwindow')
+
+import cv2
+from config import CrawlerConfig
+from capture_manager import ReplayCaptureBackend, set_capture_backend
+from screenshot_manager import (
+    SystemWindowDetector, ContentDetector, EdgeDetector, UIFeatureDetector,
+    DetectionStrategy, ScreenshotUtils
+)
+import screenshot_manager.system_detector as system_detector_module
+from tracer import Tracer
+
+DETECTORS = ('system', 'content', 'edge', 'ui_feature', 'strategy')
+GROUND_TRUTH_FILE = "ground_truth.json"
+
+
+class RecordedWindowManager:
+    """回放用的窗口管理器，微信窗口边界取自标注"""
+    
+    def __init__(self, window_bounds):
+        self.wechat_window_bounds = dict(window_bounds)
+    
+    def find_and_setup_wechat_window(self):
+        return bool(self.wechat_window_bounds)
+
+
+def recorded_window_module(title, window_bounds):
+    """替代pygetwindow，只报告录制帧里的微信窗口"""
+    geometry = (window_bounds['x'], window_bounds['y'], window_bounds['width'], window_bounds['height'])
+    return types.SimpleNamespace(
+        getAllTitles=lambda: [title],
+        getWindowGeometry=lambda name: geometry if name == title else None
+    )
+
+
+def load_dataset(data_dir):
+    """读取标注文件和截图"""
+    with open(os.path.join(data_dir, GROUND_TRUTH_FILE), 'r', encoding='utf-8') as f:
+        entries = json.load(f)['frames']
+    
+    dataset = []
+    for entry in entries:
+        image = cv2.imread(os.path.join(data_dir, entry['image']))
+        if image is None:
+            print(f"⚠️ 无法读取截图，跳过: {entry['image']}")
+            continue
+        dataset.append(dict(entry, frame=image, origin=tuple(entry.get('origin', (0, 0)))))
+    return dataset
+
+
+def run_detector(name, sample):
+    """在一帧上运行单个检测器，返回(检测结果, 检测策略采用的方法)"""
+    window_manager = RecordedWindowManager(sample['window'])
+    
+    if name == 'system':
+        return SystemWindowDetector().detect_miniprogram_window(), None
+    if name == 'content':
+        return ContentDetector(window_manager).detect_miniprogram_content(), None
+    if name == 'edge':
+        return EdgeDetector(window_manager).detect_miniprogram_edges(), None
+    if name == 'ui_feature':
+        window = sample['window']
+        local = UIFeatureDetector().detect_ui_features(crop_window(sample, window))
+        if not local:
+            return None, None
+        return dict(local, x=window['x'] + local['x'], y=window['y'] + local['y']), None
+    
+    strategy = DetectionStrategy(window_manager)
+    bounds = strategy.detect_miniprogram_bounds()
+    return bounds, strategy.last_method
+
+
+def crop_window(sample, bounds):
+    """从录制帧裁出指定屏幕区域"""
+    bbox = (bounds['x'], bounds['y'], bounds['x'] + bounds['width'], bounds['y'] + bounds['height'])
+    return ReplayCaptureBackend._crop(sample['frame'], sample['origin'], bbox)
+
+
+def run_benchmark(dataset, detectors, iou_threshold, verbose):
+    """逐帧运行检测器，汇总耗时、IoU和兜底率"""
+    timer = Tracer(enabled=True)
+    ious = {name: [] for name in detectors}
+    errors = {name: 0 for name in detectors}
+    methods = {}
+    
+    for sample in dataset:
+        set_capture_backend(ReplayCaptureBackend([sample['frame']], origin=sample['origin']))
+        system_detector_module.gw = recorded_window_module(sample.get('title', "微信"), sample['window'])
+        
+        for name in detectors:
+            output = io.StringIO()
+            redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output)
+            with redirect, timer.span(name, category='detector'):
+                try:
+                    bounds, method = run_detector(name, sample)
+                except Exception as e:
+                    # 检测器异常按未检出计，继续测试其余帧
+                    print(f"⚠️ 检测器 {name} 在 {sample['image']} 上异常: {e}", file=sys.stderr)
+                    errors[name] += 1
+                    bounds, method = None, None
+            
+            ious[name].append(ScreenshotUtils.calculate_iou(bounds, sample['miniprogram']))
+            if method:
+                methods[method] = methods.get(method, 0) + 1
+    
+    timings = timer.get_stage_stats('detector')
+    results = {}
+    for name in detectors:
+        values = ious[name]
+        results[name] = {
+            'frames': len(values),
+            'errors': errors[name],
+            'mean_iou': round(sum(values) / len(values), 4) if values else 0.0,
+            'min_iou': round(min(values), 4) if values else 0.0,
+            'hit_rate': round(sum(1 for v in values if v >= iou_threshold) / len(values), 4) if values else 0.0,
+            'p50_ms': timings.get(name, {}).get('p50_ms', 0),
+            'p95_ms': timings.get(name, {}).get('p95_ms', 0)
+        }
+    
+    strategy_runs = sum(methods.values())
+    return {
+        'iou_threshold': iou_threshold,
+        'detectors': results,
+        'strategy_methods': methods,
+        'fallback_rate': round(methods.get('fallback', 0) / strategy_runs, 4) if strategy_runs else 0.0
+    }
+
+
+def print_results(report):
+    """打印汇总表"""
+    print(f"\n📊 区域检测基准测试结果 (IoU命中阈值 {report['iou_threshold']})")
+    print(f"{'检测器':<12} {'帧数':>6} {'异常':>6} {'平均IoU':>8} {'最小IoU':>8} {'命中率':>8} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for name, stats in report['detectors'].items():
+        print(f"{name:<12} {stats['frames']:>6} {stats['errors']:>6} {stats['mean_iou']:>8.3f} {stats['min_iou']:>8.3f} "
+              f"{stats['hit_rate']:>8.1%} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f}")
+    
+    if report['strategy_methods']:
+        methods = ", ".join(f"{method}={count}" for method, count in sorted(report['strategy_methods'].items()))
+        print(f"\n🧭 检测策略采用的方法: {methods}")
+        print(f"🛡️ 兜底率: {report['fallback_rate']:.1%}")
+
+
+def compare_with_baseline(report, baseline, max_iou_drop):
+    """与基线对比，准确率下降或兜底率上升时返回问题列表"""
+    problems = []
+    for name, stats in report['detectors'].items():
+        base = baseline['detectors'].get(name)
+        if not base:
+            continue
+        if stats['mean_iou'] < base['mean_iou'] - max_iou_drop:
+            problems.append(f"{name} 平均IoU {base['mean_iou']:.3f} -> {stats['mean_iou']:.3f}")
+        if stats['hit_rate'] < base['hit_rate']:
+            problems.append(f"{name} 命中率 {base['hit_rate']:.1%} -> {stats['hit_rate']:.1%}")
+    
+    if report['fallback_rate'] > baseline.get('fallback_rate', 0):
+        problems.append(f"兜底率 {baseline['fallback_rate']:.1%} -> {report['fallback_rate']:.1%}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="区域检测基准测试（录制截图 + 标注边界）")
+    parser.add_argument('data_dir', help=f"包含截图和 {GROUND_TRUTH_FILE} 的目录")
+    parser.add_argument('--detectors', default=",".join(DETECTORS), help="逗号分隔的检测器列表")
+    parser.add_argument('--iou-threshold', type=float, default=0.9, help="判定为命中的最小IoU")
+    parser.add_argument('--save', default=None, help="把结果保存为JSON（可作为基线）")
+    parser.add_argument('--baseline', default=None, help="基线结果JSON，准确率下降时返回非零")
+    parser.add_argument('--max-iou-drop', type=float, default=0.01, help="允许的平均IoU下降幅度")
+    parser.add_argument('--verbose', action='store_true', help="显示检测器日志")
+    args = parser.parse_args()
+    
+    dataset = load_dataset(args.data_dir)
+    if not dataset:
+        print("❌ 没有可用的标注截图")
+        return 1
+    
+    # 检测器会写出调试图像，放到临时目录避免污染截图目录
+    debug_dir = tempfile.mkdtemp(prefix="detection_benchmark_")
+    CrawlerConfig.SCREENSHOTS_DIR = debug_dir
+    try:
+        report = run_benchmark(dataset, args.detectors.split(','), args.iou_threshold, args.verbose)
+    finally:
+        shutil.rmtree(debug_dir, ignore_errors=True)
+    
+    print_results(report)
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存: {args.save}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        problems = compare_with_baseline(report, baseline, args.max_iou_drop)
+        if problems:
+            print("\n❌ 准确率低于基线:")
+            for problem in problems:
+                print(f"   {problem}")
+            return 1
+        print("\n✅ 准确率不低于基线")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR吞吐量基准测试与线程自动调优
+在小程序截图语料上运行 TextDetector，遍历推理线程数、输入缩放比例和识别批大小，
+统计每秒处理图像数和标注文字召回率，并可把最优组合写入OCR运行配置（TextDetector启动时读取）
+
+数据目录结构:
+    corpus/*.png
+    corpus/labels.json   （可选）
+
+labels.json:
+    {"images": [{"image": "home.png", "texts": ["首页", "我的订单"]}]}
+
+没有标注的截图只参与吞吐量统计；没有任何标注时不测试缩小比例（无法评估准确率损失）。
+缩放比例只用于整帧识别，分块增量识别的局部区域和滚动截图的新增条带始终按原尺寸识别
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+from datetime import datetime
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+from config import CrawlerConfig
+from tracer import Tracer
+
+LABELS_FILE = "labels.json"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def parse_list(value, cast):
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+
+def default_threads():
+    cpu_count = os.cpu_count() or 1
+    return sorted({threads for threads in (1, 2, 4, cpu_count) if threads <= cpu_count})
+
+
+def normalize_text(text):
+    return re.sub(r'\s+', '', text).lower()
+
+
+def load_corpus(data_dir):
+    """读取截图和标注，返回[{'image', 'frame', 'texts'}]（texts为None表示未标注）"""
+    labels = {}
+    labels_path = os.path.join(data_dir, LABELS_FILE)
+    if os.path.exists(labels_path):
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            labels = {entry['image']: entry['texts'] for entry in json.load(f)['images']}
+    
+    corpus = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        frame = cv2.imread(os.path.join(data_dir, name))
+        if frame is None:
+            print(f"⚠️ 无法读取截图，跳过: {name}")
+            continue
+        corpus.append({'image': name, 'frame': frame, 'texts': labels.get(name)})
+    return corpus
+
+
+def count_hits(expected, text_items):
+    """标注文字被识别出的条数（识别结果包含标注文字即算命中）"""
+    recognized = [normalize_text(item['text']) for item in text_items]
+    return sum(1 for text in expected if any(normalize_text(text) in found for found in recognized))
+
+
+def run_config(detector, corpus, profile, repeat, timer):
+    """按一组配置识别整个语料，返回(吞吐量, 召回率)"""
+    from ocr_manager.ocr_profile import apply_thread_count
+    
+    detector.profile = dict(profile)
+    apply_thread_count(profile['threads'])
+    name = config_name(profile)
+    
+    # 预热一次，不计入统计
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector.detect_text_from_array(corpus[0]['frame'], scale=profile['scale'])
+    
+    hits = expected = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for round_index in range(repeat):
+            for sample in corpus:
+                with timer.span(name, category='ocr'):
+                    text_items = detector.detect_text_from_array(sample['frame'], scale=profile['scale'])
+                if round_index == 0 and sample['texts']:
+                    hits += count_hits(sample['texts'], text_items)
+                    expected += len(sample['texts'])
+    
+    stats = timer.get_stage_stats('ocr')[name]
+    images_per_sec = stats['count'] / (stats['total_ms'] / 1000) if stats['total_ms'] else 0.0
+    recall = hits / expected if expected else None
+    return images_per_sec, recall
+
+
+def config_name(profile):
+    return f"threads={profile['threads']} scale={profile['scale']} batch={profile['batch_size']}"
+
+
+def choose_best(results, max_recall_drop):
+    """召回率不低于最高召回率减去容差的组合中，选吞吐量最高的"""
+    recalls = [result['recall'] for result in results if result['recall'] is not None]
+    if recalls:
+        floor = max(recalls) - max_recall_drop
+        candidates = [result for result in results if result['recall'] is not None and result['recall'] >= floor]
+    else:
+        candidates = results
+    return max(candidates, key=lambda result: result['images_per_sec'])
+
+
+def print_results(results, best):
+    print("\n📊 OCR吞吐量基准测试结果")
+    print(f"{'线程':>6} {'缩放':>6} {'批大小':>6} {'图像/秒':>10} {'p50(ms)':>9} {'p95(ms)':>9} {'召回率':>8}")
+    for result in results:
+        profile = result['profile']
+        recall = "-" if result['recall'] is None else f"{result['recall']:.1%}"
+        flag = " ⭐" if result is best else ""
+        print(f"{profile['threads']:>6} {profile['scale']:>6} {profile['batch_size']:>6} "
+              f"{result['images_per_sec']:>10.2f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {recall:>8}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR吞吐量基准测试与线程自动调优")
+    parser.add_argument('data_dir', help=f"截图语料目录（可含 {LABELS_FILE} 标注）")
+    parser.add_argument('--threads', default=",".join(str(t) for t in default_threads()), help="逗号分隔的推理线程数")
+    parser.add_argument('--scales', default="1.0,0.75,0.5", help="逗号分隔的输入缩放比例")
+    parser.add_argument('--batch-sizes', default="1,4,8", help="逗号分隔的识别批大小")
+    parser.add_argument('--repeat', type=int, default=1, help="每组配置识别语料的轮数")
+    parser.add_argument('--max-recall-drop', type=float, default=0.01, help="选择最优配置时允许的召回率下降")
+    parser.add_argument('--save', default=None, help="把全部结果保存为JSON")
+    parser.add_argument('--write-profile', nargs='?', const=CrawlerConfig.OCR_PROFILE_FILE, default=None,
+                        help=f"把最优配置写入OCR运行配置（默认 {CrawlerConfig.OCR_PROFILE_FILE}）")
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.data_dir)
+    if not corpus:
+        print("❌ 语料目录中没有可用的截图")
+        return 1
+    labelled = sum(1 for sample in corpus if sample['texts'])
+    
+    scales = parse_list(args.scales, float)
+    if not labelled and any(scale != 1.0 for scale in scales):
+        print("⚠️ 没有标注，无法评估缩小后的准确率，只测试原始尺寸")
+        scales = [1.0]
+    
+    # 在当前进程内识别，测量的就是单个爬虫进程的配置
+    CrawlerConfig.OCR_WORKER_PROCESSES = 0
+    from ocr_manager import TextDetector
+    detector = TextDetector()
+    if detector.reader is None:
+        print("❌ OCR引擎不可用")
+        return 1
+    
+    print(f"🖼️ 语料: {len(corpus)} 张截图（{labelled} 张有标注）")
+    timer = Tracer(enabled=True)
+    results = []
+    for threads, scale, batch_size in itertools.product(
+        parse_list(args.threads, int), scales, parse_list(args.batch_sizes, int)
+    ):
+        profile = {'threads': threads, 'scale': scale, 'batch_size': batch_size}
+        images_per_sec, recall = run_config(detector, corpus, profile, args.repeat, timer)
+        stats = timer.get_stage_stats('ocr')[config_name(profile)]
+        results.append({
+            'profile': profile,
+            'images_per_sec': round(images_per_sec, 3),
+            'p50_ms': stats['p50_ms'],
+            'p95_ms': stats['p95_ms'],
+            'recall': None if recall is None else round(recall, 4)
+        })
+        print(f"⏱️ {config_name(profile)}: {images_per_sec:.2f} 图像/秒")
+    
+    best = choose_best(results, args.max_recall_drop)
+    print_results(results, best)
+    print(f"\n🏆 最优配置: {config_name(best['profile'])}")
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'images': len(corpus), 'labelled': labelled, 'results': results, 'best': best},
+                      f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存: {args.save}")
+    
+    if args.write_profile:
+        from ocr_manager.ocr_profile import save_ocr_profile
+        path = save_ocr_profile(
+            best['profile'], args.write_profile,
+            images_per_sec=best['images_per_sec'],
+            recall=best['recall'],
+            host=platform.node(),
+            cpu_count=os.cpu_count(),
+            measured_at=datetime.now().isoformat()
+        )
+        print(f"💾 OCR运行配置已写入: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
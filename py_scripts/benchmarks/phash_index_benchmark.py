@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感知哈希近重复索引基准测试
+生成大量64位感知哈希（随机哈希 + 围绕若干"页面"抖动的近重复簇，接近真实截图的分布），
+对比BK树、多索引哈希表与逐个比较的线性扫描在不同汉明半径下的查询速度，并校验结果一致
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screenshot_manager.hash_index import INDEX_STRUCTURES, HASH_BITS, PerceptualHashIndex, _popcount
+
+
+def flip_bits(hash_value, count, rng):
+    """随机翻转count位，模拟渲染差异造成的哈希抖动"""
+    for bit in rng.sample(range(HASH_BITS), count):
+        hash_value ^= 1 << bit
+    return hash_value
+
+
+def generate_hashes(size, cluster_ratio, rng):
+    """生成哈希集合：cluster_ratio比例的哈希属于近重复簇（每簇约20张），其余均匀随机"""
+    cluster_count = max(1, int(size * cluster_ratio) // 20)
+    centers = [rng.getrandbits(HASH_BITS) for _ in range(cluster_count)]
+    hashes = []
+    for _ in range(size):
+        if rng.random() < cluster_ratio:
+            hashes.append(flip_bits(rng.choice(centers), rng.randint(0, 3), rng))
+        else:
+            hashes.append(rng.getrandbits(HASH_BITS))
+    return hashes
+
+
+def generate_queries(hashes, count, rng):
+    """一半查询为已有哈希的近重复，一半为新页面（随机哈希）"""
+    queries = []
+    for index in range(count):
+        if index % 2 == 0:
+            queries.append(flip_bits(rng.choice(hashes), rng.randint(0, 2), rng))
+        else:
+            queries.append(rng.getrandbits(HASH_BITS))
+    return queries
+
+
+def linear_query(hashes, query, radius):
+    return sorted(hash_value for hash_value in hashes if _popcount(hash_value ^ query) <= radius)
+
+
+def build_index(structure, hashes):
+    """构建索引，返回(索引, 耗时秒)"""
+    index = PerceptualHashIndex(structure=structure)
+    started = time.perf_counter()
+    for hash_value in hashes:
+        index.add(hash_value, persist=False)
+    return index, time.perf_counter() - started
+
+
+def benchmark_index(index, queries, radius, expected):
+    """运行一组查询，返回(每秒查询数, 平均核对哈希数, 平均命中数, 是否与线性扫描一致)"""
+    visits = 0
+    matches = 0
+    found = []
+    started = time.perf_counter()
+    for query in queries:
+        results = index.query(query, radius)
+        visits += index.last_visits
+        matches += len(results)
+        found.append(results)
+    seconds = time.perf_counter() - started
+    
+    consistent = all(
+        sorted(hash_value for _, hash_value, _ in results) == linear
+        for results, linear in zip(found, expected)
+    )
+    return len(queries) / seconds, visits / len(queries), matches / len(queries), consistent
+
+
+def benchmark_radius(indexes, hashes, queries, radius):
+    """同一组查询分别走线性扫描和各索引结构，返回统计结果"""
+    started = time.perf_counter()
+    expected = [linear_query(hashes, query, radius) for query in queries]
+    linear_qps = len(queries) / (time.perf_counter() - started)
+    
+    result = {'radius': radius, 'linear_queries_per_sec': round(linear_qps, 1), 'structures': {}}
+    for structure, index in indexes.items():
+        qps, visits, matches, consistent = benchmark_index(index, queries, radius, expected)
+        result['structures'][structure] = {
+            'queries_per_sec': round(qps, 1),
+            'speedup': round(qps / linear_qps, 1),
+            'avg_checked_ratio': round(visits / len(hashes), 5),
+            'avg_matches': round(matches, 2),
+            'consistent': consistent
+        }
+    return result
+
+
+def print_results(results):
+    print("\n📊 近重复查询基准测试结果（次/秒，括号内为相对线性扫描的加速比和核对哈希比例）")
+    structures = list(results[0]['structures'])
+    print(f"{'半径':>4} {'线性扫描':>10} " + " ".join(f"{structure:>32}" for structure in structures) + f" {'平均命中':>8}")
+    for result in results:
+        cells = []
+        for structure in structures:
+            stats = result['structures'][structure]
+            flag = "" if stats['consistent'] else " ❌"
+            cells.append(f"{stats['queries_per_sec']:>10.1f} (x{stats['speedup']:<7} {stats['avg_checked_ratio']:>7.2%}){flag}")
+        matches = next(iter(result['structures'].values()))['avg_matches']
+        print(f"{result['radius']:>4} {result['linear_queries_per_sec']:>10.1f} " +
+              " ".join(f"{cell:>32}" for cell in cells) + f" {matches:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="感知哈希近重复索引基准测试")
+    parser.add_argument('--size', type=int, default=100000, help="索引中的哈希数量")
+    parser.add_argument('--queries', type=int, default=200, help="每个半径的查询次数")
+    parser.add_argument('--radii', default="0,2,4,8", help="逗号分隔的汉明半径")
+    parser.add_argument('--structures', default=",".join(INDEX_STRUCTURES), help="逗号分隔的索引结构")
+    parser.add_argument('--cluster-ratio', type=float, default=0.3, help="属于近重复簇的哈希比例")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--save', default=None, help="把结果保存为JSON")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    hashes = generate_hashes(args.size, args.cluster_ratio, rng)
+    queries = generate_queries(hashes, args.queries, rng)
+    
+    indexes = {}
+    build_seconds = {}
+    for structure in args.structures.split(','):
+        indexes[structure], build_seconds[structure] = build_index(structure, hashes)
+        print(f"🌳 {structure} 构建: {len(hashes)} 个哈希，耗时 {build_seconds[structure]:.2f}s")
+    
+    results = [benchmark_radius(indexes, hashes, queries, int(radius)) for radius in args.radii.split(',')]
+    print_results(results)
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'size': args.size, 'queries': args.queries,
+                       'build_seconds': {structure: round(seconds, 3) for structure, seconds in build_seconds.items()},
+                       'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"💾 结果已保存: {args.save}")
+    
+    consistent = all(stats['consistent'] for result in results for stats in result['structures'].values())
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
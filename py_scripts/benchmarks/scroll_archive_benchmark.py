@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动截图归档基准测试
+对比逐帧PNG与增量滚动归档（首帧 + 每帧新露出的行）的体积、编码耗时、顺序解码和随机解码耗时，并校验逐像素无损；
+默认使用合成的长页面（抗锯齿文字、带噪点的缩略图、固定导航栏），--dir 可改用已保存的 *_scroll_N.png 截图
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from screenshot_manager.scroll_archive import ScrollArchive, ScrollArchiveWriter, iter_archive_frames
+
+SCROLL_NAME = re.compile(r"^(.*)_scroll_(\d+)\.png$")
+
+
+def render_page(rng, width, page_height, header):
+    """合成一张长页面：每行一个缩略图（渐变加噪点，近似照片）和两行抗锯齿文字"""
+    page = np.full((page_height, width, 3), 255, dtype=np.uint8)
+    page[:header] = (246, 246, 246)
+    cv2.putText(page, f"Page {rng.randint(1, 999)}", (width // 2 - 60, 38), cv2.FONT_HERSHEY_SIMPLEX, 0.8,
+                (30, 30, 30), 2, cv2.LINE_AA)
+
+    row_height = 96
+    for top in range(header + 12, page_height - row_height, row_height):
+        thumb = np.linspace(rng.randint(40, 120), rng.randint(140, 230), 72, dtype=np.float32)
+        thumb = np.repeat(thumb[None, :, None], 72, axis=0) + rng.gauss(0, 1) * 12
+        thumb = thumb + np.random.default_rng(rng.randint(0, 1 << 30)).normal(0, 10, (72, 72, 3))
+        page[top:top + 72, 16:88] = np.clip(thumb, 0, 255).astype(np.uint8)
+        words = " ".join(rng.choice(["item", "price", "level", "skill", "data", "guide", "map"]) for _ in range(4))
+        cv2.putText(page, words, (104, top + 26), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (40, 40, 40), 1, cv2.LINE_AA)
+        cv2.putText(page, f"{rng.randint(1, 99999)} / {rng.random():.3f}", (104, top + 58), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5, (120, 120, 120), 1, cv2.LINE_AA)
+        page[top + row_height - 8, 16:width - 16] = (225, 225, 225)
+    return page
+
+
+def synthetic_sequences(count, width, height, header, step, seed):
+    """按固定步长滚动长页面得到的滚动截图序列（导航栏固定在顶部）"""
+    rng = random.Random(seed)
+    sequences = []
+    for index in range(count):
+        page_height = rng.randint(2, 6) * height
+        page = render_page(rng, width, page_height, header)
+        body = page[header:]
+        viewport = height - header
+        frames, offset = [], 0
+        while True:
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[:header] = page[:header]
+            frame[header:] = body[offset:offset + viewport]
+            frames.append(frame)
+            if offset + viewport >= len(body):
+                break
+            offset = min(offset + step, len(body) - viewport)
+        sequences.append((f"synthetic_{index + 1}", frames))
+    return sequences
+
+
+def directory_sequences(root):
+    """读取目录树中按页面分组、按序号排序的 *_scroll_N.png"""
+    groups = defaultdict(list)
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            match = SCROLL_NAME.match(filename)
+            if match:
+                groups[os.path.join(directory, match.group(1))].append((int(match.group(2)), os.path.join(directory, filename)))
+
+    sequences = []
+    for name, items in sorted(groups.items()):
+        frames = [cv2.imread(path, cv2.IMREAD_UNCHANGED) for _, path in sorted(items)]
+        if len(frames) > 1 and all(frame is not None for frame in frames):
+            sequences.append((name, frames))
+    return sequences
+
+
+def benchmark_sequence(frames, archive_path, header, keyframe_interval, rng):
+    """返回一个序列在两种格式下的体积和耗时（秒）"""
+    result = {'frames': len(frames)}
+
+    started = time.perf_counter()
+    encoded = [cv2.imencode('.png', frame)[1] for frame in frames]
+    result['png_encode'] = time.perf_counter() - started
+    result['png_bytes'] = sum(len(data) for data in encoded)
+
+    started = time.perf_counter()
+    for data in encoded:
+        cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    result['png_decode'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ScrollArchiveWriter(archive_path, fixed_header=header, keyframe_interval=keyframe_interval) as writer:
+        for frame in frames:
+            writer.add_frame(frame)
+    result['archive_encode'] = time.perf_counter() - started
+    result['archive_bytes'] = os.path.getsize(archive_path)
+    result['key_frames'] = writer.stats['key_frames']
+
+    started = time.perf_counter()
+    with open(archive_path, 'rb') as f:
+        decoded = list(iter_archive_frames(f))
+    result['archive_decode'] = time.perf_counter() - started
+    result['lossless'] = len(decoded) == len(frames) and all(np.array_equal(a, b) for a, b in zip(decoded, frames))
+
+    # 随机解码：每次重新打开归档，只取一帧
+    order = list(range(len(frames)))
+    rng.shuffle(order)
+    started = time.perf_counter()
+    for frame_index in order:
+        with ScrollArchive(archive_path) as archive:
+            if not np.array_equal(archive.read_frame(frame_index), frames[frame_index]):
+                result['lossless'] = False
+    result['random_decode'] = (time.perf_counter() - started) / len(order)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="滚动截图归档基准测试")
+    parser.add_argument('--dir', default=None, help="使用该目录下已保存的 *_scroll_N.png（默认使用合成页面）")
+    parser.add_argument('--pages', type=int, default=20, help="合成页面数")
+    parser.add_argument('--width', type=int, default=414, help="合成截图宽度")
+    parser.add_argument('--height', type=int, default=736, help="合成截图高度")
+    parser.add_argument('--header', type=int, default=60, help="固定导航栏高度")
+    parser.add_argument('--step', type=int, default=400, help="合成页面每次滚动的像素")
+    parser.add_argument('--keyframe-interval', type=int, default=0, help="每隔多少帧插入关键帧（0为只有首帧）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    if args.dir:
+        sequences = directory_sequences(args.dir)
+    else:
+        sequences = synthetic_sequences(args.pages, args.width, args.height, args.header, args.step, args.seed)
+    if not sequences:
+        print("❌ 没有可用的滚动截图序列")
+        return 1
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="scroll_archive_bench_")
+    try:
+        results = [benchmark_sequence(frames, os.path.join(workdir, "sequence.scrl"), args.header,
+                                      args.keyframe_interval, rng)
+                   for _, frames in sequences]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total = {key: sum(result[key] for result in results) for key in results[0] if key != 'lossless'}
+    frames = total['frames']
+    print(f"\n📊 {len(results)} 个滚动序列，共 {frames} 帧（关键帧 {total['key_frames']}）")
+    print(f"{'格式':<10} {'体积(KB)':>10} {'每帧(KB)':>10} {'编码(ms/帧)':>12} {'顺序解码(ms/帧)':>16} {'随机解码(ms/帧)':>16}")
+    print(f"{'逐帧PNG':<10} {total['png_bytes'] / 1024:>10.1f} {total['png_bytes'] / 1024 / frames:>10.1f} "
+          f"{total['png_encode'] * 1000 / frames:>12.2f} {total['png_decode'] * 1000 / frames:>16.2f} "
+          f"{total['png_decode'] * 1000 / frames:>16.2f}")
+    print(f"{'增量归档':<10} {total['archive_bytes'] / 1024:>10.1f} {total['archive_bytes'] / 1024 / frames:>10.1f} "
+          f"{total['archive_encode'] * 1000 / frames:>12.2f} {total['archive_decode'] * 1000 / frames:>16.2f} "
+          f"{total['random_decode'] * 1000 / len(results):>16.2f}")
+    print(f"📦 压缩比: 归档体积为逐帧PNG的 {total['archive_bytes'] / total['png_bytes']:.1%}")
+
+    lossless = all(result['lossless'] for result in results)
+    print("✅ 全部帧逐像素一致" if lossless else "❌ 存在解码不一致的帧")
+    return 0 if lossless else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
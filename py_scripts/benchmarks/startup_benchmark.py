@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准测试
+用 python -X importtime 测量CLI入口（导入main并完成依赖检查）的导入耗时，
+超出预算或提前导入了重依赖时返回非零
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PY_SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 到依赖检查为止都不应加载的重依赖
+HEAVY_MODULES = ('torch', 'easyocr', 'cv2', 'numpy', 'PIL', 'skimage', 'pyautogui', 'AppKit', 'pygetwindow')
+
+DEFAULT_STATEMENT = "import main; main.check_dependencies()"
+DEFAULT_BUDGET_MS = 50
+
+
+def measure_once(statement):
+    """运行一次带 -X importtime 的子进程，返回[(模块名, 自身微秒, 累计微秒, 层级)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=PY_SCRIPTS_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        level = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(parts[0]), int(parts[1]), level))
+    return imports
+
+
+def summarize(imports, excluded=()):
+    """总导入耗时（毫秒）取顶层导入的累计耗时之和，跳过解释器启动时就会导入的模块"""
+    return sum(cumulative for name, _, cumulative, level in imports if level == 0 and name not in excluded) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI启动导入耗时基准测试（python -X importtime）")
+    parser.add_argument('--runs', type=int, default=5, help="测量次数（取中位数）")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="导入耗时预算（毫秒）")
+    parser.add_argument('--statement', default=DEFAULT_STATEMENT, help="要测量的启动语句")
+    parser.add_argument('--top', type=int, default=10, help="列出自身耗时最多的模块数")
+    args = parser.parse_args()
+    
+    # 第一次运行用于生成.pyc缓存，不计入结果
+    try:
+        measure_once(args.statement)
+        runs = [measure_once(args.statement) for _ in range(args.runs)]
+        # 解释器自身启动（site等）导入的模块不计入
+        interpreter_modules = {name for name, _, _, _ in measure_once("pass")}
+    except RuntimeError as e:
+        print(f"❌ 启动语句执行失败: {e}")
+        return 1
+    
+    totals = [summarize(imports, interpreter_modules) for imports in runs]
+    median_ms = statistics.median(totals)
+    
+    last = runs[-1]
+    imported = {name for name, _, _, _ in last}
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    
+    print(f"⏱️ 启动语句: {args.statement}")
+    print(f"📦 导入模块数: {len(last) - len(imported & interpreter_modules)}")
+    print(f"🐍 已排除解释器启动时导入的 {len(interpreter_modules)} 个模块")
+    print(f"📊 导入耗时: 中位数 {median_ms:.1f}ms  最小 {min(totals):.1f}ms  最大 {max(totals):.1f}ms  (预算 {args.budget_ms:.0f}ms)")
+    
+    print(f"\n🐢 自身耗时最多的 {args.top} 个模块:")
+    entries = [entry for entry in last if entry[0] not in interpreter_modules]
+    for name, self_us, cumulative_us, _ in sorted(entries, key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"   {self_us / 1000:>8.2f}ms  (累计 {cumulative_us / 1000:>8.2f}ms)  {name}")
+    
+    failed = False
+    if heavy:
+        print(f"\n❌ 启动阶段提前导入了重依赖: {', '.join(heavy)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\n❌ 导入耗时超出预算: {median_ms:.1f}ms > {args.budget_ms:.0f}ms")
+        failed = True
+    
+    if not failed:
+        print("\n✅ 启动耗时在预算内")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文搜索基准测试
+在临时结果库中写入大量合成页面（文字按字频近似Zipf分布），
+对比FTS5全文索引与逐行LIKE匹配的查询耗时
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results_store import ResultsStore
+
+VOCAB_SIZE = 3000
+
+
+def build_store(db_file, elements, per_page, rng):
+    """写入elements条文字元素（每页per_page条），返回(结果库, 全部文字, 耗时秒)"""
+    vocab = [chr(code) for code in range(0x4e00, 0x4e00 + VOCAB_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCAB_SIZE)]
+    
+    store = ResultsStore(db_file)
+    store.batch_pages = 50
+    texts = []
+    started = time.perf_counter()
+    store.begin_run("基准测试应用")
+    for page_index in range(elements // per_page):
+        items = []
+        for row in range(per_page):
+            text = ''.join(rng.choices(vocab, weights, k=rng.randint(2, 12)))
+            texts.append(text)
+            items.append({'text': text, 'confidence': 0.9, 'page_center': [100, row * 40],
+                          'page_bbox': [[60, row * 40 - 10], [140, row * 40 - 10], [140, row * 40 + 10], [60, row * 40 + 10]],
+                          'frame_index': row // 15})
+        store.add_page({'page_name': f"页面{page_index}", 'local_ocr_text': items})
+    store.finish_run({'crawl_info': {'status': 'completed', 'total_pages': elements // per_page}})
+    return store, texts, time.perf_counter() - started
+
+
+def time_queries(run_query, queries):
+    """返回(平均耗时ms, 最大耗时ms, 总命中数)"""
+    durations = []
+    hits = 0
+    for query in queries:
+        started = time.perf_counter()
+        hits += len(run_query(query))
+        durations.append((time.perf_counter() - started) * 1000)
+    return sum(durations) / len(durations), max(durations), hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全文搜索基准测试")
+    parser.add_argument('--elements', type=int, default=1000000, help="文字元素数量")
+    parser.add_argument('--per-page', type=int, default=100, help="每个页面的文字元素数")
+    parser.add_argument('--queries', type=int, default=30, help="每种查询长度的查询次数")
+    parser.add_argument('--limit', type=int, default=20, help="每次查询返回的命中数")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="text_search_bench_")
+    try:
+        store, texts, build_seconds = build_store(os.path.join(workdir, "results.db"), args.elements, args.per_page, rng)
+        size_mb = os.path.getsize(store.db_file) / 1024 / 1024
+        print(f"🗄️ 写入 {len(texts)} 条文字元素，耗时 {build_seconds:.1f}s，数据库 {size_mb:.0f}MB")
+        
+        print("\n📊 搜索耗时（ms）")
+        print(f"{'查询长度':>8} {'FTS5平均':>10} {'FTS5最大':>10} {'LIKE平均':>10} {'命中一致':>8}")
+        for length in (1, 2, 4):
+            queries = []
+            while len(queries) < args.queries:
+                text = rng.choice(texts)
+                if len(text) >= length:
+                    start = rng.randrange(len(text) - length + 1)
+                    queries.append(text[start:start + length])
+            
+            fts_avg, fts_max, fts_hits = time_queries(lambda query: store.search(query, limit=args.limit), queries)
+            fts_enabled, store.fts_enabled = store.fts_enabled, False
+            like_avg, _, like_hits = time_queries(lambda query: store.search(query, limit=args.limit), queries)
+            store.fts_enabled = fts_enabled
+            print(f"{length:>8} {fts_avg:>10.1f} {fts_max:>10.1f} {like_avg:>10.1f} {'✅' if fts_hits == like_hits else '❌':>8}")
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
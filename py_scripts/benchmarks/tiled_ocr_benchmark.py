@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块增量OCR基准测试
+在合成画面序列上运行 TiledTextDetector（识别器只记录调用，不加载OCR模型），统计OCR调用次数和识别面积，
+并校验每个分块累计偏离上次识别时的画面超过阈值后都会被重新识别（淡入、慢动画等逐帧小变化不会一直沿用旧结果）
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+
+# 添加py_scripts目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CrawlerConfig
+from ocr_manager.tiled_detector import TiledTextDetector
+
+
+class RecordingDetector:
+    """只记录识别区域的文字检测器（接口与TextDetector.detect_text_from_array相同）"""
+    
+    full_frame_scale = 1.0
+    
+    def __init__(self):
+        self.calls = []
+    
+    def detect_text_from_array(self, image, offset=(0, 0), scale=1.0):
+        height, width = image.shape[:2]
+        self.calls.append((offset[0], offset[1], offset[0] + width, offset[1] + height))
+        return []
+
+
+def static_frames(width, height, frames):
+    """画面不变"""
+    base = np.full((height, width, 3), 200, dtype=np.uint8)
+    return [base.copy() for _ in range(frames)]
+
+
+def local_change_frames(width, height, frames, tile):
+    """每帧只有一个分块突变（如计数器跳动）"""
+    sequence = static_frames(width, height, frames)
+    for index, frame in enumerate(sequence[1:], 1):
+        frame[tile:2 * tile, tile:2 * tile] = 200 - 10 * index
+    return sequence
+
+
+def drift_frames(width, height, frames, tile, step):
+    """一个分块逐帧缓慢变亮（淡入），每帧的变化都低于阈值"""
+    sequence = static_frames(width, height, frames)
+    for index, frame in enumerate(sequence):
+        frame[:tile, :tile] = 100 + step * index
+    return sequence
+
+
+def run_sequence(frames, tile, threshold):
+    """逐帧检测，返回统计和漏识别的帧数
+    
+    漏识别：某个分块与它最后一次被识别时的画面平均灰度差已超过阈值，本帧却没有被重新识别
+    """
+    recorder = RecordingDetector()
+    detector = TiledTextDetector(recorder, tile_size=tile, diff_threshold=threshold)
+    ocred = None
+    stale = 0
+    for frame in frames:
+        gray = frame.mean(axis=2)
+        recorder.calls.clear()
+        detector.detect(frame)
+        if ocred is None:
+            ocred = gray.copy()
+            continue
+        
+        drifted = False
+        for top in range(0, gray.shape[0], tile):
+            for left in range(0, gray.shape[1], tile):
+                block = (slice(top, top + tile), slice(left, left + tile))
+                covered = any(x1 <= left and y1 <= top and x2 >= left + tile and y2 >= top + tile
+                              for x1, y1, x2, y2 in recorder.calls)
+                if covered:
+                    ocred[block] = gray[block]
+                elif np.abs(gray[block] - ocred[block]).mean() > threshold:
+                    drifted = True
+        stale += drifted
+    return detector.get_stats(), stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分块增量OCR基准测试")
+    parser.add_argument('--width', type=int, default=384, help="合成画面宽度")
+    parser.add_argument('--height', type=int, default=768, help="合成画面高度")
+    parser.add_argument('--frames', type=int, default=11, help="每个序列的帧数")
+    parser.add_argument('--drift-step', type=int, default=4, help="淡入序列每帧的灰度变化（应低于阈值）")
+    parser.add_argument('--verbose', action='store_true', help="显示检测器日志")
+    args = parser.parse_args()
+    
+    tile = CrawlerConfig.OCR_TILE_SIZE
+    threshold = CrawlerConfig.OCR_TILE_DIFF_THRESHOLD
+    sequences = [
+        ('静止', static_frames(args.width, args.height, args.frames)),
+        ('局部变化', local_change_frames(args.width, args.height, args.frames, tile)),
+        ('缓慢淡入', drift_frames(args.width, args.height, args.frames, tile, args.drift_step)),
+    ]
+    
+    print(f"{'序列':<10} {'帧数':>6} {'整页OCR':>8} {'局部OCR':>8} {'无变化':>8} {'识别面积':>10} {'漏识别帧':>10}")
+    passed = True
+    for name, frames in sequences:
+        output = io.StringIO()
+        redirect = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(output)
+        with redirect:
+            stats, stale = run_sequence(frames, tile, threshold)
+        passed = passed and stale == 0
+        print(f"{name:<10} {stats['frames']:>6} {stats['full_ocr']:>8} {stats['partial_ocr']:>8} "
+              f"{stats['unchanged']:>8} {stats['ocr_area_ratio']:>10.1%} {stale:>10}")
+    
+    print("✅ 所有累计变化超过阈值的分块都已重新识别" if passed else "❌ 存在累计变化超过阈值却沿用旧结果的分块")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
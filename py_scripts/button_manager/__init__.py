@@ -5,7 +5,16 @@
 负责按钮识别、点击和导航管理
 """
 
-from .button_detector import ButtonDetector
-from .button_navigator import ButtonNavigator
+from lazy_imports import lazy_exports
 
-__all__ = ['ButtonDetector', 'ButtonNavigator'] 
\ No newline at end of file
+_LAZY_IMPORTS = {
+    'ButtonDetector': '.button_detector',
+    'ButtonNavigator': '.button_navigator',
+    'ButtonCache': '.button_cache'
+}
+
+# 按需导入子模块，导入包时不加载pyautogui和OCR
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS)
+
+
+__all__ = ['ButtonDetector', 'ButtonNavigator', 'ButtonCache'] 
\ No newline at end of file
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按钮位置缓存
+按小程序名称持久化主页按钮位置和主页指纹，指纹一致时跳过OCR直接复用
+"""
+
+import json
+import os
+import time
+from config import CrawlerConfig
+from screenshot_manager.utils import ScreenshotUtils
+
+
+class ButtonCache:
+    """按钮位置缓存类"""
+    
+    def __init__(self, cache_file=None):
+        """初始化按钮位置缓存"""
+        self.cache_file = cache_file or CrawlerConfig.BUTTON_CACHE_FILE
+        self.max_distance = CrawlerConfig.BUTTON_CACHE_MAX_DISTANCE
+        self.entries = self._load()
+        self.hits = 0
+        self.misses = 0
+    
+    def _load(self):
+        """从磁盘加载缓存"""
+        if not os.path.exists(self.cache_file):
+            return {}
+        
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 按钮缓存读取失败，忽略旧缓存: {e}")
+            return {}
+    
+    def _save(self):
+        """将缓存写回磁盘"""
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ 按钮缓存保存失败: {e}")
+    
+    def lookup(self, app_name, fingerprint, bounds):
+        """查找缓存的按钮位置，主页指纹和区域尺寸都匹配时才返回"""
+        entry = self.entries.get(app_name)
+        if not entry:
+            self.misses += 1
+            return None
+        
+        if entry['width'] != bounds['width'] or entry['height'] != bounds['height']:
+            print(f"🗂️ 按钮缓存失效: 小程序区域尺寸已变化")
+            self.misses += 1
+            return None
+        
+        distance = ScreenshotUtils.hamming_distance(int(entry['fingerprint'], 16), fingerprint)
+        if distance > self.max_distance:
+            print(f"🗂️ 按钮缓存失效: 主页指纹距离 {distance} > {self.max_distance}")
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        print(f"🗂️ 命中按钮缓存: {app_name} (指纹距离 {distance})")
+        
+        buttons = []
+        for cached in entry['buttons']:
+            button = dict(cached)
+            button['center'] = tuple(button['center'])
+            button['from_cache'] = True
+            buttons.append(button)
+        return buttons
+    
+    def store(self, app_name, fingerprint, bounds, buttons):
+        """保存主页按钮位置"""
+        self.entries[app_name] = {
+            'fingerprint': f"{fingerprint:016x}",
+            'width': bounds['width'],
+            'height': bounds['height'],
+            'updated_at': time.time(),
+            'buttons': [self._serialize_button(button) for button in buttons]
+        }
+        self._save()
+        print(f"🗂️ 已缓存 {len(buttons)} 个按钮位置: {app_name}")
+    
+    def invalidate(self, app_name):
+        """使指定小程序的缓存失效"""
+        if self.entries.pop(app_name, None) is not None:
+            self._save()
+            print(f"🗂️ 已清除按钮缓存: {app_name}")
+    
+    def _serialize_button(self, button):
+        """将按钮信息转换为可JSON序列化的格式（OCR结果中可能含numpy数值）"""
+        return {
+            'target': button['target'],
+            'matched_text': button.get('matched_text', button['target']),
+            'center': [int(v) for v in button['center']],
+            'bbox': [[int(x), int(y)] for x, y in button.get('bbox', [])],
+            'confidence': float(button.get('confidence', 0)),
+            'similarity': float(button.get('similarity', 1.0))
+        }
+    
+    def get_cache_stats(self):
+        """获取缓存命中统计"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'cached_apps': len(self.entries)
+        }
\ No newline at end of file
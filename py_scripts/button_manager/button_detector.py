@@ -5,10 +5,14 @@
 整合OCR识别和按钮匹配功能，检测小程序中的目标按钮
 """
 
-import os
 import time
-from PIL import ImageGrab
-from ocr_manager import TextDetector, ButtonMatcher
+import cv2
+import numpy as np
+from capture_manager import grab_bounds
+from ocr_manager import TextDetector, ButtonMatcher, TiledTextDetector
+from screenshot_manager.utils import ScreenshotUtils
+from tracer import tracer
+from metrics import FRAMES_CAPTURED
 
 
 class ButtonDetector:
@@ -17,27 +21,53 @@ class ButtonDetector:
     def __init__(self):
         """初始化按钮检测器"""
         self.text_detector = TextDetector()
+        self.tiled_detector = TiledTextDetector(self.text_detector)
         self.button_matcher = ButtonMatcher()
         self.last_detection_result = None
+        self.last_page_state = None  # (截图, 页面状态指纹, 文字识别结果)
     
-    def detect_buttons_in_bounds(self, bounds):
+    def capture_bounds(self, bounds):
+        """截取指定区域（BGR数组）"""
+        with tracer.span('capture'):
+            FRAMES_CAPTURED.inc(source='button_detect')
+            return grab_bounds(bounds)
+    
+    def compute_page_fingerprint(self, screenshot):
+        """计算页面截图的感知哈希指纹"""
+        return ScreenshotUtils.calculate_perceptual_hash(screenshot)
+    
+    def capture_page_state(self, bounds):
+        """截取当前页面，返回(页面状态指纹, 文字识别结果)
+        
+        页面状态指纹由视觉指纹（感知哈希）和识别文字集合组成，用于深度爬取时判断页面是否已访问。
+        文字必须整页识别（分块增量识别按灰度差判断变化，可能漏掉颜色相近的文字变化）；
+        画面与上次完全相同时（如点击没有跳转）直接复用上次结果
+        """
+        screenshot = self.capture_bounds(bounds)
+        if self.last_page_state is not None and np.array_equal(screenshot, self.last_page_state[0]):
+            return self.last_page_state[1], self.last_page_state[2]
+        
+        with tracer.span('ocr'):
+            text_items = self.text_detector.detect_text_from_array(screenshot, scale=self.text_detector.full_frame_scale)
+        state = {
+            'phash': self.compute_page_fingerprint(screenshot),
+            'texts': frozenset(self.button_matcher._clean_text(item['text']) for item in text_items)
+        }
+        self.last_page_state = (screenshot, state, text_items)
+        return state, text_items
+    
+    def detect_buttons_in_bounds(self, bounds, screenshot=None):
         """在指定区域检测目标按钮"""
         print(f"🔍 开始在区域中检测按钮...")
         
         try:
-            # 截取指定区域
-            screenshot = ImageGrab.grab(bbox=(
-                bounds['x'], bounds['y'],
-                bounds['x'] + bounds['width'],
-                bounds['y'] + bounds['height']
-            ))
+            # 截取指定区域（可复用调用方已截取的图像）
+            if screenshot is None:
+                screenshot = self.capture_bounds(bounds)
             
-            # 保存临时截图用于OCR
-            temp_path = "/tmp/button_detection.png"
-            screenshot.save(temp_path)
-            
-            # 进行OCR识别
-            text_items = self.text_detector.detect_text_from_image(temp_path)
+            # 进行OCR识别（分块增量识别，重复检测同一页面时只识别变化区域）
+            with tracer.span('ocr'):
+                text_items = self.tiled_detector.detect(screenshot)
             
             if not text_items:
                 print("❌ 未检测到任何文字")
@@ -45,11 +75,12 @@ class ButtonDetector:
             
             print(f"📝 检测到 {len(text_items)} 个文字区域")
             
-            # 匹配目标按钮
-            matched_buttons = self.button_matcher.find_target_buttons(text_items)
-            
-            # 过滤有效按钮
-            valid_buttons = self.button_matcher.filter_valid_buttons(matched_buttons, bounds)
+            with tracer.span('match'):
+                # 匹配目标按钮
+                matched_buttons = self.button_matcher.find_target_buttons(text_items)
+                
+                # 过滤有效按钮
+                valid_buttons = self.button_matcher.filter_valid_buttons(matched_buttons, bounds)
             
             # 保存检测结果
             self.last_detection_result = {
@@ -60,12 +91,6 @@ class ButtonDetector:
                 'timestamp': time.time()
             }
             
-            # 清理临时文件
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-            
             return valid_buttons
             
         except Exception as e:
@@ -105,9 +130,6 @@ class ButtonDetector:
     def _detect_return_button_by_color_sampling(self, bounds):
         """通过多点取色检测返回按钮"""
         try:
-            from PIL import ImageGrab
-            import numpy as np
-            
             # 计算左上角返回按钮区域
             if isinstance(bounds, dict):
                 x, y, width, height = bounds['x'], bounds['y'], bounds['width'], bounds['height']
@@ -123,20 +145,16 @@ class ButtonDetector:
                 'height': 40  # 按钮区域高度
             }
             
-            # 截取返回按钮区域
-            screenshot = ImageGrab.grab(bbox=(
-                button_region['x'], button_region['y'],
-                button_region['x'] + button_region['width'],
-                button_region['y'] + button_region['height']
-            ))
+            # 截取返回按钮区域（BGR数组，亮度分析与通道顺序无关）
+            with tracer.span('capture'):
+                FRAMES_CAPTURED.inc(source='page_check')
+                pixel_array = grab_bounds(button_region)
             
             # 保存调试图片
             debug_path = "/tmp/return_button_debug.png"
-            screenshot.save(debug_path)
+            cv2.imwrite(debug_path, pixel_array)
             print(f"🔍 已保存返回按钮区域调试图片: {debug_path}")
             
-            # 转换为numpy数组进行分析
-            pixel_array = np.array(screenshot)
             height_px, width_px = pixel_array.shape[:2]
             
             # 定义多个采样点来检测返回按钮
@@ -196,7 +214,7 @@ class ButtonDetector:
             # 获取所有采样点的颜色
             colors = []
             for x, y in sample_points:
-                r, g, b = pixel_array[y, x][:3]  # 注意numpy数组的坐标顺序
+                r, g, b = (int(v) for v in pixel_array[y, x][:3])  # 注意numpy数组的坐标顺序，转为int避免uint8相加溢出
                 brightness = (r + g + b) / 3
                 colors.append((r, g, b, brightness, x, y))
             
@@ -229,7 +247,7 @@ class ButtonDetector:
             
             for x, y in arrow_points:
                 if y < len(pixel_array) and x < len(pixel_array[0]):
-                    r, g, b = pixel_array[y, x][:3]
+                    r, g, b = (int(v) for v in pixel_array[y, x][:3])
                     brightness = (r + g + b) / 3
                     if brightness < 120:  # 箭头应该是深色（黑色）
                         arrow_dark_count += 1
@@ -306,4 +324,6 @@ class ButtonDetector:
     def reset_detection_cache(self):
         """重置检测缓存"""
         self.last_detection_result = None
+        self.last_page_state = None
+        self.tiled_detector.reset()
         print("🔄 已重置按钮检测缓存") 
\ No newline at end of file
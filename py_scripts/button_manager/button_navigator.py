@@ -6,8 +6,10 @@
 """
 
 import time
-import pyautogui
 from config import CrawlerConfig
+from input_scheduler import get_input_scheduler
+from tracer import tracer
+from metrics import RETRIES
 
 
 class ButtonNavigator:
@@ -16,11 +18,12 @@ class ButtonNavigator:
     def __init__(self, window_manager):
         """初始化按钮导航器"""
         self.window_manager = window_manager
+        self.input = get_input_scheduler()
         self.navigation_history = []
         self.current_page = "主页"
     
-    def click_button(self, button, bounds):
-        """点击指定按钮"""
+    def click_button(self, button, bounds, record=True):
+        """点击指定按钮（record=False时不记录导航，用于探测点击后是否跳转）"""
         try:
             # 获取按钮的绝对点击位置
             center_x, center_y = button['center']
@@ -29,24 +32,18 @@ class ButtonNavigator:
             
             print(f"🎯 点击按钮: {button['target']} 位置: ({absolute_x}, {absolute_y})")
             
-            # 确保聚焦到小程序区域
+            # 确保聚焦到小程序区域（紧接着的点击本身会聚焦，调度器会合并掉这次聚焦点击）
             self.window_manager.focus_mini_program_area()
-            time.sleep(0.5)
             
             # 点击按钮
-            pyautogui.click(absolute_x, absolute_y)
-            time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
-            
-            # 记录导航历史
-            self.navigation_history.append({
-                'from_page': self.current_page,
-                'to_page': button['target'],
-                'button': button,
-                'timestamp': time.time()
-            })
+            with tracer.span('click', target=button['target']):
+                self.input.click(absolute_x, absolute_y)
+            with tracer.span('wait'):
+                self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
             
-            self.current_page = button['target']
-            print(f"✅ 成功进入: {button['target']}")
+            if record:
+                self.record_navigation(button)
+                print(f"✅ 成功进入: {button['target']}")
             
             return True
             
@@ -54,31 +51,47 @@ class ButtonNavigator:
             print(f"❌ 点击按钮失败: {e}")
             return False
     
+    def record_navigation(self, button, to_page=None):
+        """记录一次进入页面的导航"""
+        to_page = to_page or button['target']
+        self.navigation_history.append({
+            'from_page': self.current_page,
+            'to_page': to_page,
+            'button': button,
+            'timestamp': time.time()
+        })
+        self.current_page = to_page
+    
     def return_to_main_page(self, bounds):
         """返回主页面"""
+        return self.go_back(bounds, "主页")
+    
+    def go_back(self, bounds, to_page="主页"):
+        """点击左上角返回按钮回到上一级页面"""
         try:
             # 计算返回按钮位置（左上角）
             back_x = bounds['x'] + 25
             back_y = bounds['y'] + 35
             
-            print(f"🔙 点击返回按钮返回主页: ({back_x}, {back_y})")
+            print(f"🔙 点击返回按钮返回{to_page}: ({back_x}, {back_y})")
             
             # 确保聚焦到小程序区域
             self.window_manager.focus_mini_program_area()
-            time.sleep(0.5)
             
             # 点击返回按钮
-            pyautogui.click(back_x, back_y)
-            time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
+            with tracer.span('click', target='返回'):
+                self.input.click(back_x, back_y)
+            with tracer.span('wait'):
+                self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
             
             # 更新当前页面状态
-            self.current_page = "主页"
+            self.current_page = to_page
             
-            print("✅ 已返回主页")
+            print(f"✅ 已返回{to_page}")
             return True
             
         except Exception as e:
-            print(f"❌ 返回主页失败: {e}")
+            print(f"❌ 返回{to_page}失败: {e}")
             return False
     
     def get_current_page(self):
@@ -117,6 +130,8 @@ class ButtonNavigator:
             
             attempt += 1
             print(f"🔄 尝试返回主页 (第{attempt}次)")
+            if attempt > 1:
+                RETRIES.inc(operation='ensure_main_page')
             
             if self.return_to_main_page(bounds):
                 time.sleep(1)  # 等待页面加载
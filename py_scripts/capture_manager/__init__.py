@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图后端模块
+提供可替换的屏幕抓取后端，以及进程内共享的默认后端
+"""
+
+from config import CrawlerConfig
+from .backends import CaptureBackend, PILCaptureBackend, MSSCaptureBackend, ReplayCaptureBackend
+
+_default_backend = None
+
+
+def create_capture_backend(name=None):
+    """按名称创建截图后端（auto: 优先mss，不可用时回退到PIL）"""
+    name = name or CrawlerConfig.CAPTURE_BACKEND
+    
+    if name == 'replay':
+        return ReplayCaptureBackend(CrawlerConfig.CAPTURE_REPLAY_DIR)
+    if name == 'pil':
+        return PILCaptureBackend()
+    if name == 'mss':
+        return MSSCaptureBackend()
+    
+    try:
+        return MSSCaptureBackend()
+    except ImportError:
+        print("💡 未安装mss，截图后端回退到PIL.ImageGrab (pip install mss 可提升截图速度)")
+        return PILCaptureBackend()
+
+
+def get_capture_backend():
+    """获取默认截图后端（首次调用时创建，之后复用同一个抓屏句柄）"""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = create_capture_backend()
+        print(f"📷 截图后端: {_default_backend.name}")
+    return _default_backend
+
+
+def set_capture_backend(backend):
+    """替换默认截图后端（用于回放和模拟器）"""
+    global _default_backend
+    if _default_backend is not None and _default_backend is not backend:
+        _default_backend.close()
+    _default_backend = backend
+
+
+def grab_bounds(bounds):
+    """按小程序风格的边界字典抓取区域"""
+    return get_capture_backend().grab((
+        bounds['x'], bounds['y'],
+        bounds['x'] + bounds['width'],
+        bounds['y'] + bounds['height']
+    ))
+
+
+__all__ = [
+    'CaptureBackend',
+    'PILCaptureBackend',
+    'MSSCaptureBackend',
+    'ReplayCaptureBackend',
+    'create_capture_backend',
+    'get_capture_backend',
+    'set_capture_backend',
+    'grab_bounds'
+]
\ No newline at end of file
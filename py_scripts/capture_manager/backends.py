@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图后端
+统一的屏幕区域抓取接口，返回只读的BGR NumPy数组，避免PIL对象与OpenCV格式之间的重复拷贝
+"""
+
+import os
+import threading
+import cv2
+import numpy as np
+
+
+class CaptureBackend:
+    """截图后端基类"""
+    
+    name = 'base'
+    
+    def grab(self, bbox):
+        """抓取屏幕区域 bbox=(left, top, right, bottom)，返回只读的BGR数组 (H, W, 3)"""
+        raise NotImplementedError
+    
+    def close(self):
+        """释放后端持有的资源"""
+        pass
+    
+    @staticmethod
+    def _readonly(frame):
+        """把数组标记为只读，防止调用方修改共享缓冲区"""
+        frame.flags.writeable = False
+        return frame
+    
+    @classmethod
+    def _crop(cls, frame, origin, bbox):
+        """从左上角位于origin的整帧中裁剪屏幕区域bbox"""
+        left, top, right, bottom = bbox
+        x1, y1 = left - origin[0], top - origin[1]
+        x2, y2 = right - origin[0], bottom - origin[1]
+        height, width = frame.shape[:2]
+        
+        # 完全落在帧内时直接返回切片视图
+        if x1 >= 0 and y1 >= 0 and x2 <= width and y2 <= height:
+            return cls._readonly(frame[y1:y2, x1:x2])
+        
+        # 超出帧范围的部分以黑色填充（与真实屏幕外区域一致）
+        canvas = np.zeros((y2 - y1, x2 - x1, 3), dtype=np.uint8)
+        src_x1, src_y1 = max(0, x1), max(0, y1)
+        src_x2, src_y2 = min(width, x2), min(height, y2)
+        if src_x1 < src_x2 and src_y1 < src_y2:
+            canvas[src_y1 - y1:src_y2 - y1, src_x1 - x1:src_x2 - x1] = frame[src_y1:src_y2, src_x1:src_x2]
+        return cls._readonly(canvas)
+
+
+class PILCaptureBackend(CaptureBackend):
+    """基于PIL.ImageGrab的截图后端（兼容性最好，每帧一次拷贝）"""
+    
+    name = 'pil'
+    
+    def __init__(self):
+        from PIL import ImageGrab
+        self._image_grab = ImageGrab
+    
+    def grab(self, bbox):
+        image = self._image_grab.grab(bbox=bbox)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        # 由PIL直接按BGR顺序打包，frombuffer不再拷贝，替代 np.array + cvtColor 的两次拷贝
+        width, height = image.size
+        frame = np.frombuffer(image.tobytes('raw', 'BGR'), dtype=np.uint8).reshape(height, width, 3)
+        return self._readonly(frame)
+
+
+class MSSCaptureBackend(CaptureBackend):
+    """基于mss的截图后端（持久抓屏句柄，返回原始BGRA缓冲区上的零拷贝视图）"""
+    
+    name = 'mss'
+    
+    def __init__(self):
+        import mss
+        self._mss = mss
+        # mss句柄在部分平台上不能跨线程使用，每个线程持有自己的句柄
+        self._local = threading.local()
+    
+    def _handle(self):
+        handle = getattr(self._local, 'handle', None)
+        if handle is None:
+            handle = self._mss.mss()
+            self._local.handle = handle
+        return handle
+    
+    def grab(self, bbox):
+        left, top, right, bottom = bbox
+        width, height = right - left, bottom - top
+        shot = self._handle().grab({'left': left, 'top': top, 'width': width, 'height': height})
+        
+        # BGRA -> BGR 只是切片视图，不拷贝像素
+        frame = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)[:, :, :3]
+        
+        # Retina屏幕返回物理像素，缩放回逻辑像素以保持与检测阈值一致
+        if shot.width != width or shot.height != height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        
+        return self._readonly(frame)
+    
+    def close(self):
+        handle = getattr(self._local, 'handle', None)
+        if handle is not None:
+            handle.close()
+            self._local.handle = None
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """文件回放截图后端（从录制的截图回放，用于在Linux上进行基准测试）"""
+    
+    name = 'replay'
+    
+    def __init__(self, frames, origin=(0, 0), advance_on_grab=False):
+        """frames可以是图片目录、图片路径列表或BGR数组列表；origin为帧左上角对应的屏幕坐标"""
+        self.frames = [self._readonly(frame) for frame in self._load_frames(frames)]
+        if not self.frames:
+            raise ValueError("回放截图后端没有可用的帧")
+        
+        self.origin = origin
+        self.advance_on_grab = advance_on_grab
+        self.index = 0
+    
+    def _load_frames(self, frames):
+        """加载回放帧"""
+        if isinstance(frames, str):
+            names = sorted(name for name in os.listdir(frames) if name.lower().endswith(('.png', '.jpg', '.jpeg')))
+            frames = [os.path.join(frames, name) for name in names]
+        
+        loaded = []
+        for frame in frames:
+            if isinstance(frame, str):
+                frame = cv2.imread(frame)
+                if frame is None:
+                    continue
+            loaded.append(frame)
+        return loaded
+    
+    @property
+    def current_frame(self):
+        return self.frames[self.index]
+    
+    def advance(self):
+        """切换到下一帧（循环回放）"""
+        self.index = (self.index + 1) % len(self.frames)
+    
+    def grab(self, bbox):
+        frame = self.current_frame
+        if self.advance_on_grab:
+            self.advance()
+        return self._crop(frame, self.origin, bbox)
\ No newline at end of file
@@ -48,6 +48,9 @@ class CrawlerConfig:
     MAX_SCROLLS = 10           # 最大滚动次数
     SCROLL_DISTANCE = 3        # 滚动距离
     SIMILARITY_THRESHOLD = 0.95 # 截图相似度阈值
+    CAPTURE_QUEUE_SIZE = 4     # 滚动截图流水线中待处理原始帧的队列长度
+    CAPTURE_BACKEND = 'auto'   # 截图后端: auto(优先mss) / mss / pil / replay
+    CAPTURE_REPLAY_DIR = os.path.join(OUTPUT_DIR, "replay_frames")  # replay后端读取的录制帧目录
     
     # 返回按钮位置（相对于小程序区域）
     BACK_BUTTON_POSITIONS = [
@@ -57,12 +60,111 @@ class CrawlerConfig:
     ]
     
     # PyAutoGUI配置
-    PYAUTOGUI_PAUSE = 1.0      # PyAutoGUI操作间隔
+    PYAUTOGUI_PAUSE = 0.0      # 每次操作后的固定等待（操作间隔改由输入调度器按操作类型控制）
     PYAUTOGUI_FAILSAFE = True  # 启用安全模式
     
+    # 输入调度配置（所有鼠标键盘操作经由InputScheduler执行）
+    INPUT_MIN_GAPS = {         # 某类操作之后到下一次操作的最小间隔（秒），期间的其他等待计入间隔
+        'click': 0.2,
+        'focus': FOCUS_DELAY,
+        'scroll': 0.15,
+        'press': 0.2,
+        'drag': 0.3
+    }
+    INPUT_FOCUS_TTL = 5.0      # 无法查询前台窗口时：点击后多少秒内认为窗口仍有焦点，期间的聚焦点击直接跳过（0 表示每次都聚焦）
+    FOCUS_TRACKING_ENABLED = True  # 聚焦前查询前台应用和最前面的窗口（macOS，需要pyobjc），焦点仍在时不点击
+    WECHAT_BUNDLE_IDS = ("com.tencent.xinWeChat", "com.tencent.flue.WeChatAppEx")  # 微信主程序和小程序容器进程
+    
     # 分析配置
     ANALYSIS_TIMEOUT = 60      # 分析超时时间
+
+    # 阶段耗时追踪（每次爬取导出Chrome trace，并在报告中汇总各阶段p50/p95）
+    TRACE_ENABLED = True
+
+    # 运行指标（Prometheus文本格式HTTP端点 + 定期JSON快照）
+    METRICS_ENABLED = True
+    METRICS_HTTP_HOST = "127.0.0.1"  # 需要被其他主机抓取时改为 0.0.0.0
+    METRICS_HTTP_PORT = 9464         # 0 表示不启动HTTP端点
+    METRICS_SNAPSHOT_INTERVAL = 15   # JSON快照写出间隔（秒），0 表示不写
+    METRICS_SNAPSHOT_FILE = os.path.join(OUTPUT_DIR, "metrics_snapshot.json")
+    
+    # 常驻服务配置（本地任务API，只监听本机）
+    DAEMON_HOST = "127.0.0.1"
+    DAEMON_PORT = 8765
+    DAEMON_JOBS_DIR = os.path.join(OUTPUT_DIR, "jobs")  # 每个任务的结果目录
+    DAEMON_MAX_FINISHED_JOBS = 200   # 内存中保留的已结束任务数
+    DAEMON_TOKEN = os.environ.get("CRAWLER_DAEMON_TOKEN")  # 接口令牌，未设置时启动时随机生成并写入 DAEMON_TOKEN_FILE
+    DAEMON_TOKEN_FILE = os.path.join(OUTPUT_DIR, "daemon_token")
+    
+    # 任务可以使用的小程序启动命令（名称 -> 参数列表，不经过shell执行），任务中用 "launcher": 名称 引用，如
+    # {"weixin_link": ["open", "weixin://dl/business/?t=..."]}
+    APP_LAUNCHERS = {}
+
+    # 深度爬取配置（广度优先探测内页中的可点击目标，逐级爬取下一级页面）
+    CRAWL_MAX_DEPTH = 1              # 最大页面深度，1 表示只爬主页按钮直达的页面
+    CRAWL_MAX_PAGES = 200            # 每个小程序最多爬取的页面数
+    FRONTIER_MAX_TARGETS_PER_PAGE = 12   # 每个页面最多探测的可点击目标数
+    FRONTIER_MAX_TARGET_TEXT = 10    # 可点击目标文字的最大长度（更长的多为正文）
+    FRONTIER_SKIP_TEXTS = ("支付", "购买", "删除", "退出", "分享", "客服", "投诉")  # 不点击包含这些文字的目标
+    PAGE_STATE_MAX_HASH_DISTANCE = 4     # 视觉指纹汉明距离不超过该值视为同一页面状态
+    PAGE_STATE_MIN_TEXT_SIMILARITY = 0.8 # 识别文字集合相似度（Jaccard）不低于该值视为同一页面状态
+    
+    # 截图近重复索引配置（感知哈希BK树，跨按钮、跨运行标记近乎相同的截图）
+    PHASH_INDEX_ENABLED = True
+    PHASH_INDEX_FILE = os.path.join(OUTPUT_DIR, "phash_index.tsv")
+    PHASH_INDEX_STRUCTURE = "mih"    # 索引结构："mih"（多索引哈希表）或 "bktree"（BK树）
+    PHASH_DUPLICATE_DISTANCE = 2     # 感知哈希汉明距离不超过该值视为近重复截图
+    PHASH_SKIP_DUPLICATES = False    # True 时近重复截图不再写盘，改为引用已保存的截图
+    
+    # 截图内容寻址存储配置（相同画面只保存一份，按钮目录中的截图为指向它的硬链接）
+    BLOB_STORE_ENABLED = True
+    BLOB_STORE_DIR = os.path.join(OUTPUT_DIR, "blobs")
     
+    # 滚动截图归档配置（同一页面的滚动截图另存为 <页面>_scroll.scrl：首帧 + 每帧的滚动偏移和新露出的行）
+    SCROLL_ARCHIVE_ENABLED = False
+    
+    # 原始帧环形缓冲区配置（截图路径抓到的原始帧写入固定大小的内存映射文件，保留最近的画面供调试和出错时导出）
+    FRAME_RING_ENABLED = True
+    FRAME_RING_FILE = os.path.join(OUTPUT_DIR, "frame_ring.bin")
+    FRAME_RING_SIZE_MB = 128         # 数据区大小（稀疏文件，写满前不占满磁盘）
+    FRAME_RING_SLOTS = 512           # 最多保留的帧数
+    FRAME_RING_DUMP_SECONDS = 30     # 页面出错时自动导出的最近秒数，0 表示不自动导出
+    
+    # 爬取结果数据库配置（SQLite，跨运行查询；JSON结果文件照常写出）
+    RESULTS_DB_ENABLED = True
+    RESULTS_DB_FILE = os.path.join(OUTPUT_DIR, "crawl_results.db")
+    RESULTS_DB_BATCH_PAGES = 10      # 每攒够多少个页面在一个事务里批量写入
+    
+    # 增量爬取配置（进入页面后先比较首屏指纹，与上次运行相同时复用上次的截图和分析结果）
+    DELTA_CRAWL = False
+    DELTA_MAX_REUSE_DAYS = 7         # 页面内容最多连续复用的天数，超过后完整爬取一次（首屏以下的变化指纹看不到）
+    
+    # 按钮位置缓存配置（按小程序名称持久化主页按钮位置，跳过启动时的OCR）
+    BUTTON_CACHE_ENABLED = True
+    BUTTON_CACHE_FILE = os.path.join(OUTPUT_DIR, "button_cache.json")
+    BUTTON_CACHE_MAX_DISTANCE = 6  # 主页指纹允许的最大汉明距离（64位哈希）
+
+    # 分块增量OCR配置（页面局部变化时只重新识别变化的分块）
+    OCR_TILE_SIZE = 64               # 分块边长（像素）
+    OCR_TILE_DIFF_THRESHOLD = 6.0    # 分块平均灰度差超过该值视为变化
+    OCR_TILE_FULL_OCR_RATIO = 0.6    # 变化分块占比超过该值时直接整页识别
+    OCR_TILE_MARGIN = 12             # 变化区域向外扩展的边距，避免截断文字
+
+    # OCR进程池配置（0 表示在当前进程内识别）
+    OCR_WORKER_PROCESSES = 0         # 工作进程数，每个进程各自加载一份EasyOCR模型
+    OCR_WORKER_START_METHOD = None   # 进程启动方式（None 为平台默认：macOS为spawn，Linux为fork）
+    
+    # OCR运行配置（benchmarks/ocr_benchmark.py --write-profile 实测写出，不存在时使用默认值）
+    OCR_PROFILE_FILE = os.path.join(OUTPUT_DIR, "ocr_profile.json")
+    
+    # 滚动增量OCR配置（滚动截图时只识别新露出的底部条带）
+    INCREMENTAL_SCROLL_OCR = True
+    SCROLL_FIXED_HEADER_HEIGHT = 60  # 滚动时固定不动的顶部导航栏高度
+    SCROLL_OFFSET_MAX_ERROR = 6.0    # 滚动偏移匹配允许的最大平均灰度差
+    SCROLL_OFFSET_TIE_TOLERANCE = 0.25  # 平均灰度差与最优偏移相差不超过此值的偏移视为并列
+    SCROLL_OCR_OVERLAP = 24          # 条带向上重叠的像素，捕获被帧边界截断的文字行
+    SCROLL_OCR_DEDUPE_TOLERANCE = 16 # 整页坐标中同一文字的去重容差（像素）
+
     @classmethod
     def create_output_dirs(cls):
         """创建输出目录"""
@@ -5,8 +5,19 @@
 重构后的模块化爬虫核心，支持智能按钮识别和分类截图
 """
 
-from .main_crawler import MainCrawler
-from .page_crawler import PageCrawler
-from .smart_navigator import SmartNavigator
+from lazy_imports import lazy_exports
 
-__all__ = ['MainCrawler', 'PageCrawler', 'SmartNavigator'] 
\ No newline at end of file
+_LAZY_IMPORTS = {
+    'MainCrawler': '.main_crawler',
+    'PageCrawler': '.page_crawler',
+    'SmartNavigator': '.smart_navigator',
+    'BatchCrawler': '.batch_crawler',
+    'CrawlerDaemon': '.crawler_daemon',
+    'ForkLauncher': '.fork_launcher'
+}
+
+# 按需导入子模块，创建爬虫时才加载各组件
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS)
+
+
+__all__ = ['MainCrawler', 'PageCrawler', 'SmartNavigator', 'BatchCrawler', 'CrawlerDaemon', 'ForkLauncher'] 
\ No newline at end of file
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量爬虫器
+在同一个进程中依次爬取多个小程序，复用已初始化的爬虫组件、OCR引擎和分析会话
+"""
+
+import json
+import os
+import re
+import subprocess
+import time
+from datetime import datetime
+from config import CrawlerConfig
+
+
+class BatchCrawler:
+    """批量爬虫器类"""
+    
+    def __init__(self, crawler=None):
+        """crawler默认为新建的MainCrawler，可传入已初始化（或接入模拟环境）的实例"""
+        if crawler is None:
+            from .main_crawler import MainCrawler
+            crawler = MainCrawler()
+        self.crawler = crawler
+        self.results = []
+    
+    @staticmethod
+    def load_jobs(job_file):
+        """读取任务文件
+        
+        支持两种格式：
+        - .txt：每行一个小程序名称，#开头为注释
+        - .json：名称列表，或 {"apps": [...]}，条目可以是名称或
+          {"app_name": 名称, "launcher": APP_LAUNCHERS中的启动命令名称, "wait": 打开后等待秒数}
+        """
+        with open(job_file, 'r', encoding='utf-8') as f:
+            if job_file.lower().endswith('.json'):
+                data = json.load(f)
+                entries = data.get('apps', []) if isinstance(data, dict) else data
+            else:
+                entries = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+        
+        return [BatchCrawler.normalize_job(entry) for entry in entries]
+    
+    @staticmethod
+    def normalize_job(entry):
+        """把名称或字典统一为任务字典；启动命令只能引用 CrawlerConfig.APP_LAUNCHERS 中配置的名称"""
+        if isinstance(entry, str):
+            entry = {'app_name': entry}
+        if 'open_command' in entry:
+            raise ValueError("不再支持open_command，请在 CrawlerConfig.APP_LAUNCHERS 中配置启动命令并用 launcher 引用")
+        launcher = entry.get('launcher')
+        if launcher is not None and launcher not in CrawlerConfig.APP_LAUNCHERS:
+            raise ValueError(f"未配置的启动命令: {launcher}")
+        return {
+            'app_name': str(entry['app_name']),
+            'launcher': launcher,
+            'wait': float(entry.get('wait', 0))
+        }
+    
+    @staticmethod
+    def _safe_dirname(name):
+        safe_name = re.sub(r'[<>:"/\\|?*\s]', '_', name).strip('_')
+        return safe_name or "unknown_app"
+    
+    def run(self, jobs, output_root=None, switch_delay=0):
+        """依次爬取任务列表，每个应用的结果写入 output_root/<应用名>/，最后写出汇总"""
+        jobs = [self.normalize_job(job) for job in jobs]
+        output_root = output_root or os.path.join(
+            CrawlerConfig.OUTPUT_DIR, f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        )
+        os.makedirs(output_root, exist_ok=True)
+        
+        self.results = []
+        started = time.time()
+        
+        print(f"📦 批量爬取 {len(jobs)} 个小程序，结果目录: {output_root}")
+        for index, job in enumerate(jobs):
+            print(f"\n{'#'*55}")
+            print(f"📱 [{index + 1}/{len(jobs)}] {job['app_name']}")
+            print(f"{'#'*55}")
+            
+            if index > 0 and switch_delay:
+                time.sleep(switch_delay)
+            
+            app_dir = os.path.join(output_root, self._safe_dirname(job['app_name']))
+            self.results.append(self.crawl_app(job, app_dir))
+        
+        summary = self._build_summary(output_root, time.time() - started)
+        self._save_summary(summary, output_root)
+        self.print_summary(summary)
+        return summary
+    
+    def crawl_app(self, job, app_dir):
+        """爬取单个应用，结果写入app_dir；异常记录在返回结果中，不会中断调用方"""
+        job = self.normalize_job(job)
+        original_dirs = (CrawlerConfig.OUTPUT_DIR, CrawlerConfig.SCREENSHOTS_DIR)
+        CrawlerConfig.OUTPUT_DIR = app_dir
+        CrawlerConfig.SCREENSHOTS_DIR = os.path.join(app_dir, "screenshots")
+        
+        result = {
+            'app_name': job['app_name'],
+            'output_dir': app_dir,
+            'success': False,
+            'error': None
+        }
+        app_started = time.time()
+        
+        try:
+            self.crawler.prepare_for_next_app()
+            if job['launcher']:
+                print(f"🚪 打开小程序: {job['launcher']}")
+                subprocess.run(list(CrawlerConfig.APP_LAUNCHERS[job['launcher']]), check=True, timeout=60)
+            if job['wait']:
+                time.sleep(job['wait'])
+            
+            result['success'] = bool(self.crawler.start_crawling(job['app_name']))
+            # 第一个应用设置好窗口后，后续应用沿用同一窗口位置
+            if result['success']:
+                self.crawler.reuse_window = True
+        except Exception as e:
+            print(f"❌ 爬取 {job['app_name']} 时出错: {e}")
+            result['error'] = str(e)
+        finally:
+            CrawlerConfig.OUTPUT_DIR, CrawlerConfig.SCREENSHOTS_DIR = original_dirs
+        
+        result['cancelled'] = self.crawler.stop_event.is_set()
+        progress = self.crawler.get_crawling_progress()
+        result['pages'] = len(self.crawler.data_manager.crawl_data['pages'])
+        result['screenshots'] = progress['screenshots_taken']
+        result['duration'] = round(time.time() - app_started, 2)
+        return result
+    
+    def _build_summary(self, output_root, duration):
+        return {
+            'output_dir': output_root,
+            'finished_at': datetime.now().isoformat(),
+            'total_apps': len(self.results),
+            'succeeded': sum(1 for result in self.results if result['success']),
+            'total_pages': sum(result['pages'] for result in self.results),
+            'total_screenshots': sum(result['screenshots'] for result in self.results),
+            'duration': round(duration, 2),
+            'apps': self.results
+        }
+    
+    def _save_summary(self, summary, output_root):
+        summary_path = os.path.join(output_root, "batch_summary.json")
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 批量爬取汇总已保存: {summary_path}")
+    
+    @staticmethod
+    def print_summary(summary):
+        """打印批量爬取汇总"""
+        print(f"\n📊 批量爬取完成: 成功 {summary['succeeded']}/{summary['total_apps']}，"
+              f"共 {summary['total_pages']} 个页面，{summary['total_screenshots']} 张截图，耗时 {summary['duration']} 秒")
+        for result in summary['apps']:
+            flag = "✅" if result['success'] else "❌"
+            print(f"  {flag} {result['app_name']}: {result['pages']} 页面, "
+                  f"{result['screenshots']} 截图, {result['duration']} 秒 -> {result['output_dir']}")
\ No newline at end of file
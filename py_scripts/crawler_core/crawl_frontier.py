@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+深度爬取边界
+广度优先的待爬页面队列；每个页面状态用视觉指纹（感知哈希）+ 文字指纹（识别文字集合）标识，
+已访问或已排队的状态不再重复截图
+"""
+
+from collections import deque
+from config import CrawlerConfig
+from screenshot_manager.utils import ScreenshotUtils
+from screenshot_manager.hash_index import PerceptualHashIndex
+
+PATH_SEPARATOR = "→"
+
+
+class CrawlFrontier:
+    """广度优先爬取边界类"""
+    
+    def __init__(self, max_depth=None, max_pages=None):
+        self.max_depth = max_depth or CrawlerConfig.CRAWL_MAX_DEPTH
+        self.max_pages = max_pages or CrawlerConfig.CRAWL_MAX_PAGES
+        self.queue = deque()
+        self.visited = PerceptualHashIndex()   # 视觉指纹 -> (页面状态指纹, 页面名称)
+        self.pages_crawled = 0
+        self.stats = {'discovered': 0, 'duplicates': 0, 'non_links': 0, 'over_budget': 0}
+    
+    def __len__(self):
+        return len(self.queue)
+    
+    @property
+    def deep_crawl(self):
+        """是否需要探测内页中的可点击目标"""
+        return self.max_depth > 1
+    
+    # ---- 页面状态 ----
+    
+    @staticmethod
+    def is_same_state(state_a, state_b):
+        """视觉指纹接近且识别文字基本一致时视为同一页面状态"""
+        if state_a is None or state_b is None:
+            return False
+        distance = ScreenshotUtils.hamming_distance(state_a['phash'], state_b['phash'])
+        if distance > CrawlerConfig.PAGE_STATE_MAX_HASH_DISTANCE:
+            return False
+        
+        texts_a, texts_b = state_a['texts'], state_b['texts']
+        if not texts_a and not texts_b:
+            return True
+        similarity = len(texts_a & texts_b) / len(texts_a | texts_b)
+        return similarity >= CrawlerConfig.PAGE_STATE_MIN_TEXT_SIMILARITY
+    
+    def find_state(self, state, include_queued=True):
+        """查找已访问（或已排队）的相同页面状态，返回其页面名称"""
+        # 先按视觉指纹在BK树中取出候选，再比较识别文字
+        radius = CrawlerConfig.PAGE_STATE_MAX_HASH_DISTANCE
+        for _, _, (visited_state, name) in self.visited.query(state['phash'], radius):
+            if self.is_same_state(state, visited_state):
+                return name
+        if include_queued:
+            for entry in self.queue:
+                if self.is_same_state(state, entry['state']):
+                    return entry['name']
+        return None
+    
+    def mark_visited(self, state, name):
+        self.visited.add(state['phash'], (state, name), persist=False)
+    
+    def mark_crawled(self):
+        """记录一个爬取成功的页面（任何深度都计入页面数上限）"""
+        self.pages_crawled += 1
+    
+    # ---- 队列 ----
+    
+    @staticmethod
+    def path_name(path):
+        return PATH_SEPARATOR.join(target['target'] for target in path)
+    
+    def push(self, path, state=None):
+        """加入待爬页面（path为从主页开始依次点击的目标），重复状态或超出深度时返回False"""
+        if len(path) > self.max_depth:
+            self.stats['over_budget'] += 1
+            return False
+        
+        name = self.path_name(path)
+        if state is not None:
+            duplicate = self.find_state(state)
+            if duplicate:
+                print(f"♻️ {name} 与已发现页面 {duplicate} 相同，跳过")
+                self.stats['duplicates'] += 1
+                return False
+        
+        self.queue.append({'path': list(path), 'depth': len(path), 'name': name, 'state': state})
+        self.stats['discovered'] += 1
+        return True
+    
+    def pop(self):
+        return self.queue.popleft()
+    
+    def should_expand(self, depth):
+        """该深度的页面是否还需要探测下一级"""
+        return depth < self.max_depth
+    
+    def budget_exhausted(self):
+        return self.pages_crawled >= self.max_pages
+    
+    def get_stats(self):
+        return dict(self.stats, pages_crawled=self.pages_crawled, states_visited=len(self.visited),
+                    pending=len(self.queue), max_depth=self.max_depth, max_pages=self.max_pages)
\ No newline at end of file
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻爬虫服务
+进程常驻，保持EasyOCR读取器、截图后端和分析会话处于预热状态，通过本地HTTP接口接收爬取任务
+
+每个请求都要带接口令牌（Authorization: Bearer <令牌>），POST请求体必须是 Content-Type: application/json；
+令牌取自 DAEMON_TOKEN，未设置时启动时随机生成并写入 DAEMON_TOKEN_FILE（仅当前用户可读）
+
+接口（JSON）:
+    GET  /health                  服务状态
+    POST /jobs                    提交任务 {"app_name": ..., "launcher": ..., "wait": ...}
+    GET  /jobs                    全部任务状态
+    GET  /jobs/<id>               单个任务状态
+    POST /jobs/<id>/cancel        取消排队中或运行中的任务
+    GET  /jobs/<id>/results       爬取结果（任务结束后）
+    GET  /jobs/<id>/events        进度事件流（NDJSON，任务结束后关闭；?since=N 从第N条开始）
+"""
+
+import hmac
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import CrawlerConfig
+from capture_manager import get_capture_backend
+from metrics import metrics
+from .batch_crawler import BatchCrawler
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class CrawlJob:
+    """一个爬取任务及其进度事件"""
+    
+    def __init__(self, job):
+        self.id = uuid.uuid4().hex[:12]
+        self.job = BatchCrawler.normalize_job(job)
+        self.status = QUEUED
+        self.submitted_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        self.result = None
+        self.crawl_data = None
+        self.events = []
+        self.changed = threading.Condition()
+    
+    def add_event(self, event, data=None):
+        """追加进度事件并唤醒等待事件流的连接"""
+        with self.changed:
+            self.events.append({
+                'seq': len(self.events),
+                'time': time.time(),
+                'event': event,
+                'data': data or {}
+            })
+            self.changed.notify_all()
+    
+    def set_status(self, status, **data):
+        self.status = status
+        if status == RUNNING:
+            self.started_at = datetime.now().isoformat()
+        elif status in FINISHED_STATES:
+            self.finished_at = datetime.now().isoformat()
+        self.add_event(status, data)
+    
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'app_name': self.job['app_name'],
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'cancel_requested': self.cancel_requested,
+            'events': len(self.events),
+            'result': self.result
+        }
+
+
+class CrawlerDaemon:
+    """常驻爬虫服务：单个工作线程按提交顺序执行任务（界面自动化同一时刻只能有一个任务）"""
+    
+    def __init__(self, crawler=None, host=None, port=None, jobs_dir=None, token=None):
+        self.host = host or CrawlerConfig.DAEMON_HOST
+        self.port = CrawlerConfig.DAEMON_PORT if port is None else port
+        self.jobs_dir = jobs_dir or CrawlerConfig.DAEMON_JOBS_DIR
+        self.token = token or CrawlerConfig.DAEMON_TOKEN
+        self.batch = BatchCrawler(crawler)
+        self.crawler = self.batch.crawler
+        self.crawler.progress_callback = self._on_progress
+        
+        self.jobs = {}
+        self.pending = queue.Queue()
+        self.current_job = None
+        self._lock = threading.Lock()
+        self._server = None
+        self._worker = None
+        self.started_at = None
+    
+    # ---- 预热 ----
+    
+    def warm_up(self):
+        """启动时一次性完成首个任务才会付出的初始化开销"""
+        started = time.perf_counter()
+        print("🔥 正在预热爬虫组件...")
+        
+        get_capture_backend()
+        self.crawler.button_detector.text_detector.warm_up()
+        self.crawler.analysis_client.check_server_health()
+        metrics.start_exporters()
+        
+        print(f"✅ 预热完成，用时 {time.perf_counter() - started:.2f} 秒")
+    
+    # ---- 任务管理 ----
+    
+    def submit(self, job):
+        """提交任务，返回CrawlJob"""
+        crawl_job = CrawlJob(job)
+        with self._lock:
+            self.jobs[crawl_job.id] = crawl_job
+            self._prune_finished_jobs()
+        crawl_job.add_event(QUEUED, {'app_name': crawl_job.job['app_name']})
+        self.pending.put(crawl_job)
+        print(f"📥 收到任务 {crawl_job.id}: {crawl_job.job['app_name']}")
+        return crawl_job
+    
+    def get_job(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+    
+    def list_jobs(self):
+        with self._lock:
+            return [job.to_dict() for job in self.jobs.values()]
+    
+    def cancel(self, job_id):
+        """取消任务：排队中的任务直接跳过，运行中的任务在处理下一个按钮前停止"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            
+            # 与 _run_job 开始任务互斥：任务要么在开始前被取消，要么已是当前任务并收到停止信号
+            job.cancel_requested = True
+            if job.status == QUEUED:
+                job.set_status(CANCELLED)
+            else:
+                self.crawler.stop_event.set()
+                job.add_event('cancel_requested')
+        print(f"⏹️ 取消任务 {job.id}")
+        return job
+    
+    def _prune_finished_jobs(self):
+        """只保留最近的已结束任务，避免常驻进程内存增长"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - CrawlerConfig.DAEMON_MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+    
+    def _on_progress(self, event, data):
+        job = self.current_job
+        if job is None:
+            return
+        # prepare_for_next_app会清除停止标志，开始爬取后重新应用已收到的取消请求
+        if job.cancel_requested:
+            self.crawler.stop_event.set()
+        job.add_event(event, data)
+    
+    # ---- 工作线程 ----
+    
+    def _worker_loop(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                break
+            self._run_job(job)
+    
+    def _run_job(self, job):
+        with self._lock:
+            if job.finished:
+                return
+            self.current_job = job
+            job.set_status(RUNNING)
+        
+        try:
+            result = self.batch.crawl_app(job.job, os.path.join(self.jobs_dir, job.id))
+            job.result = result
+            job.crawl_data = self.crawler.data_manager.crawl_data
+            
+            if job.cancel_requested:
+                job.set_status(CANCELLED, pages=result['pages'])
+            elif result['success']:
+                job.set_status(SUCCEEDED, pages=result['pages'], screenshots=result['screenshots'])
+            else:
+                job.set_status(FAILED, error=result['error'])
+        except Exception as e:
+            print(f"❌ 任务 {job.id} 执行异常: {e}")
+            job.set_status(FAILED, error=str(e))
+        finally:
+            with self._lock:
+                self.current_job = None
+    
+    # ---- 启动/停止 ----
+    
+    def start(self, warm_up=True):
+        """预热组件，启动工作线程和HTTP接口（非阻塞）"""
+        if warm_up:
+            self.warm_up()
+        if not self.token:
+            self.token = self._generate_token()
+        
+        self._worker = threading.Thread(target=self._worker_loop, name="crawler-daemon-worker", daemon=True)
+        self._worker.start()
+        
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="crawler-daemon-http", daemon=True).start()
+        self.port = self._server.server_address[1]
+        self.started_at = datetime.now().isoformat()
+        print(f"🛰️ 常驻爬虫服务已启动: http://{self.host}:{self.port}")
+        return self
+    
+    def _generate_token(self):
+        """随机生成接口令牌，写入只有当前用户可读的令牌文件"""
+        token = secrets.token_urlsafe(32)
+        token_file = CrawlerConfig.DAEMON_TOKEN_FILE
+        directory = os.path.dirname(token_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(token_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(token)
+        os.chmod(token_file, 0o600)
+        print(f"🔑 接口令牌已写入: {token_file}")
+        return token
+    
+    def serve_forever(self):
+        """启动并阻塞运行，Ctrl+C退出"""
+        self.start()
+        try:
+            while self._worker.is_alive():
+                self._worker.join(1)
+        except KeyboardInterrupt:
+            print("\n👋 正在停止常驻爬虫服务...")
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """停止HTTP接口和工作线程（运行中的任务会在下一个按钮前结束）"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        job = self.current_job
+        if job is not None:
+            self.cancel(job.id)
+        self.pending.put(None)
+        metrics.stop_exporters()
+    
+    # ---- HTTP接口 ----
+    
+    def _make_handler(self):
+        daemon = self
+        
+        class JobAPIHandler(BaseHTTPRequestHandler):
+            def _send_json(self, status, body):
+                payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def _route(self):
+                path, _, query = self.path.partition('?')
+                parts = [part for part in path.split('/') if part]
+                params = dict(item.partition('=')[::2] for item in query.split('&') if item)
+                return parts, params
+            
+            def _authorized(self):
+                """校验接口令牌（Authorization: Bearer <令牌>），浏览器页面跨站提交的请求带不上令牌"""
+                scheme, _, token = self.headers.get('Authorization', '').partition(' ')
+                if scheme.lower() == 'bearer' and hmac.compare_digest(token.strip().encode(), daemon.token.encode()):
+                    return True
+                self._send_json(401, {'error': "缺少或错误的接口令牌"})
+                return False
+            
+            def _read_json(self):
+                """读取JSON请求体；Content-Type不是application/json时返回None（已回复415）"""
+                content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type != 'application/json':
+                    self._send_json(415, {'error': "请求体必须是 application/json"})
+                    return None
+                length = int(self.headers.get('Content-Length', 0))
+                return json.loads(self.rfile.read(length) or b'{}')
+            
+            def _job_or_404(self, job_id):
+                job = daemon.get_job(job_id)
+                if job is None:
+                    self._send_json(404, {'error': f"任务不存在: {job_id}"})
+                return job
+            
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                parts, params = self._route()
+                if parts == ['health']:
+                    self._send_json(200, {
+                        'status': 'ok',
+                        'started_at': daemon.started_at,
+                        'queued': daemon.pending.qsize(),
+                        'current_job': daemon.current_job.id if daemon.current_job else None
+                    })
+                elif parts == ['jobs']:
+                    self._send_json(200, {'jobs': daemon.list_jobs()})
+                elif len(parts) == 2 and parts[0] == 'jobs':
+                    job = self._job_or_404(parts[1])
+                    if job:
+                        self._send_json(200, job.to_dict())
+                elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'results':
+                    job = self._job_or_404(parts[1])
+                    if job and not job.finished:
+                        self._send_json(409, {'error': "任务尚未结束", 'status': job.status})
+                    elif job:
+                        self._send_json(200, {'job': job.to_dict(), 'crawl_data': job.crawl_data})
+                elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+                    try:
+                        since = int(params.get('since', 0) or 0)
+                    except ValueError:
+                        since = -1
+                    if since < 0:
+                        self._send_json(400, {'error': f"since必须是非负整数: {params.get('since')}"})
+                        return
+                    job = self._job_or_404(parts[1])
+                    if job:
+                        self._stream_events(job, since)
+                else:
+                    self._send_json(404, {'error': "未知接口"})
+            
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                parts, _ = self._route()
+                try:
+                    body = self._read_json()
+                except ValueError as e:
+                    self._send_json(400, {'error': f"请求体不是合法的JSON: {e}"})
+                    return
+                if body is None:
+                    return
+                
+                if parts == ['jobs']:
+                    try:
+                        job = daemon.submit(body)
+                    except (ValueError, KeyError, TypeError) as e:
+                        self._send_json(400, {'error': f"任务格式错误: {e}"})
+                        return
+                    self._send_json(201, job.to_dict())
+                elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+                    job = self._job_or_404(parts[1])
+                    if job:
+                        daemon.cancel(job.id)
+                        self._send_json(200, job.to_dict())
+                else:
+                    self._send_json(404, {'error': "未知接口"})
+            
+            def _stream_events(self, job, since):
+                """逐行输出进度事件，直到任务结束"""
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                self.close_connection = True
+                
+                position = max(0, since)
+                try:
+                    while True:
+                        with job.changed:
+                            job.changed.wait_for(lambda: len(job.events) > position or job.finished, timeout=15)
+                            events = job.events[position:]
+                            finished = job.finished
+                        for event in events:
+                            self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode('utf-8'))
+                        self.wfile.flush()
+                        position += len(events)
+                        if finished and position >= len(job.events):
+                            break
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return JobAPIHandler
\ No newline at end of file
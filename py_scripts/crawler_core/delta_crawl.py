@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量爬取
+每天重复爬取同一小程序时，大部分页面没有变化：进入页面后只截一帧首屏计算指纹，
+与结果数据库中上次完成的运行里同一页面的指纹比较，一致时直接复用上次的截图（硬链接，失败时复制）和分析结果，
+不再滚动截图、识别和分析；变化或新增的页面完整爬取并记录变化，爬取耗时随变化页面数增长而不是随应用规模增长
+"""
+
+import copy
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+from config import CrawlerConfig
+from metrics import DELTA_PAGES
+from screenshot_manager.utils import ScreenshotUtils
+from .crawl_frontier import PATH_SEPARATOR
+
+# 需要记录到page_changes表的比较结果
+CHANGE_STATUSES = ('new', 'changed', 'removed')
+
+
+def compute_fingerprint(frame):
+    """首屏指纹：感知哈希用于衡量变化大小，内容摘要判断是否完全一致；crawled_at为页面内容实际截取的时间"""
+    return {
+        'phash': f"{ScreenshotUtils.calculate_perceptual_hash(frame):016x}",
+        'digest': ScreenshotUtils.calculate_content_digest(frame),
+        'crawled_at': datetime.now().isoformat()
+    }
+
+
+def _link_or_copy(source, target):
+    """优先创建硬链接（不占额外磁盘），跨文件系统等情况下复制"""
+    if os.path.exists(target):
+        if os.path.samefile(source, target):
+            return
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class DeltaCrawl:
+    """增量爬取基线类：按页面路径名称（主页→…→页面）索引上次完成运行的页面"""
+    
+    def __init__(self, results_store, app_name, blob_store=None):
+        self.results_store = results_store
+        self.app_name = app_name
+        self.blob_store = blob_store
+        self.baseline_run = None
+        self.baseline = {}      # 页面路径名称 -> {'id': 页面ID, 'data': 页面数据}
+        self.seen = set()
+        self.failed = set()
+        self.changes = []
+        self.stats = {'unchanged': 0, 'changed': 0, 'new': 0, 'refresh': 0, 'removed': 0, 'unknown': 0}
+        self._load()
+    
+    def _load(self):
+        try:
+            self.baseline_run, pages = self.results_store.get_baseline_pages(self.app_name)
+        except sqlite3.Error as e:
+            print(f"⚠️ 读取增量爬取基线失败，本次完整爬取: {e}")
+            return
+        
+        for page in pages:
+            self.baseline[page['name']] = {'id': page['id'], 'data': page['data']}
+        if self.baseline_run is None:
+            print(f"🆕 {self.app_name} 没有已完成的运行，本次完整爬取并作为增量基线")
+        else:
+            print(f"🔁 增量爬取: 以运行 #{self.baseline_run} 为基线（{len(self.baseline)} 个页面）")
+    
+    def compare(self, page_name, fingerprint):
+        """比较页面首屏指纹与基线，返回比较记录（status为 unchanged/changed/new/refresh）"""
+        self.seen.add(page_name)
+        record = {'page': page_name, 'baseline_run': self.baseline_run}
+        previous = self.baseline.get(page_name)
+        if previous is None:
+            record['status'] = 'new'
+            return record
+        
+        record['baseline_page'] = previous['id']
+        old = previous['data'].get('fingerprint')
+        if not old:
+            record.update(status='refresh', reason='no_fingerprint')
+            return record
+        
+        record['phash_distance'] = ScreenshotUtils.hamming_distance(int(old['phash'], 16), int(fingerprint['phash'], 16))
+        if old['digest'] != fingerprint['digest']:
+            record['status'] = 'changed'
+        elif datetime.now() - datetime.fromisoformat(old['crawled_at']) > timedelta(days=CrawlerConfig.DELTA_MAX_REUSE_DAYS):
+            record.update(status='refresh', reason='expired')
+        else:
+            record['status'] = 'unchanged'
+        return record
+    
+    def child_targets(self, record):
+        """首屏未变化的页面在基线中探测到的下一级页面目标，基线没有完整探测过该页面时返回None"""
+        previous = self.baseline.get(record['page'])
+        if previous is None or previous['data'].get('child_targets') is None:
+            return None
+        return copy.deepcopy(previous['data']['child_targets'])
+    
+    def reuse_page(self, record, button_dir):
+        """把基线页面的截图链接到本次的页面目录（在内容寻址存储中时增加引用），返回复用的页面数据；
+        截图缺失时返回None（改为完整爬取）
+        """
+        previous = self.baseline[record['page']]
+        page_data = copy.deepcopy(previous['data'])
+        names = page_data.get('screenshots', {}).get('scroll_sequence', [])
+        try:
+            sources = [shot['path'] for shot in self.results_store.get_screenshots(previous['id'])]
+        except sqlite3.Error as e:
+            print(f"⚠️ 读取基线截图失败: {e}")
+            return None
+        if not names or len(sources) != len(names) or not all(os.path.exists(path) for path in sources):
+            print(f"⚠️ 基线截图缺失，完整爬取: {record['page']}")
+            return None
+        
+        # 基线中近重复而跳过保存的帧引用其他页面的文件（绝对路径），复用后都链接到本页面目录
+        names = [os.path.basename(name) for name in names]
+        try:
+            for source, name in zip(sources, names):
+                target = os.path.join(button_dir, name)
+                if self.blob_store is None or not self.blob_store.link(source, target):
+                    _link_or_copy(source, target)
+        except OSError as e:
+            print(f"⚠️ 复用基线截图失败，完整爬取: {e}")
+            return None
+        
+        # 滚动截图归档不在内容寻址存储中，直接链接；缺失时本次结果不带归档
+        archive = page_data['screenshots'].pop('archive', None)
+        source = os.path.join(previous['data'].get('screenshot_directory') or '', archive or '')
+        if archive and os.path.isfile(source):
+            try:
+                _link_or_copy(source, os.path.join(button_dir, archive))
+                page_data['screenshots']['archive'] = archive
+            except OSError as e:
+                print(f"⚠️ 复用基线滚动截图归档失败: {e}")
+        
+        page_data['screenshots']['scroll_sequence'] = names
+        page_data['screenshots']['main_screenshot'] = names[0]
+        page_data['screenshots']['duplicates'] = []
+        page_data['timestamp'] = datetime.now().isoformat()
+        page_data['screenshot_directory'] = button_dir
+        return page_data
+    
+    def record(self, record):
+        """记录一个页面的最终比较结果（没有基线的首次运行不产生变化记录）"""
+        self.stats[record['status']] += 1
+        DELTA_PAGES.inc(status=record['status'])
+        if record['status'] in CHANGE_STATUSES and self.baseline_run is not None:
+            self.changes.append(record)
+    
+    def mark_failed(self, page_name):
+        """记录导航或爬取失败的页面：它和它的下级页面本次无法确认是否还存在"""
+        self.failed.add(page_name)
+    
+    def _is_unreached(self, page_name):
+        """页面本身或它的某个上级页面处理失败"""
+        return any(page_name == failed or page_name.startswith(failed + PATH_SEPARATOR) for failed in self.failed)
+    
+    def finish(self, complete=True):
+        """结束本次增量爬取，返回汇总；完整遍历了全部页面时，基线中没有访问到的页面记为消失，
+        因自身或上级页面处理失败而没有访问到的记为未知
+        """
+        if complete and self.baseline_run is not None:
+            for page_name, previous in self.baseline.items():
+                if page_name in self.seen:
+                    continue
+                status = 'unknown' if self._is_unreached(page_name) else 'removed'
+                self.record({'page': page_name, 'status': status, 'baseline_run': self.baseline_run,
+                             'baseline_page': previous['id']})
+        
+        summary = {'baseline_run': self.baseline_run, 'stats': dict(self.stats), 'changes': self.changes}
+        print(f"🔁 增量爬取: 未变化 {self.stats['unchanged']}，变化 {self.stats['changed']}，新增 {self.stats['new']}，"
+              f"重新爬取 {self.stats['refresh']}，消失 {self.stats['removed']}，未知 {self.stats['unknown']}")
+        return summary
\ No newline at end of file
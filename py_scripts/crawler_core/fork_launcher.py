@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fork启动器
+父进程只加载一次EasyOCR模型，然后fork出多个爬虫工作进程，模型权重以写时复制方式共享；
+结束后输出每个工作进程的独占内存（USS），估算一台主机能同时运行的爬虫数量
+
+注意：
+- 需要支持fork的平台（Linux/macOS）；父进程在fork前不启动任何线程，也不做OCR推理
+  （torch的线程池在fork后不可用），首次推理由各工作进程自行完成
+- macOS上子进程使用AppKit前需设置环境变量 OBJC_DISABLE_INITIALIZE_FORK_SAFETY=YES
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import queue
+import time
+from config import CrawlerConfig
+from process_memory import get_process_memory, get_available_memory, format_bytes
+from .batch_crawler import BatchCrawler
+
+
+def _worker_main(index, jobs, output_root, crawler_factory, results, switch_delay=0):
+    """工作进程：创建爬虫（复用继承的OCR模型）并依次爬取分配到的任务"""
+    worker_dir = os.path.join(output_root, f"worker_{index}")
+    CrawlerConfig.METRICS_SNAPSHOT_FILE = os.path.join(worker_dir, "metrics_snapshot.json")
+    CrawlerConfig.FRAME_RING_FILE = os.path.join(worker_dir, "frame_ring.bin")
+    if CrawlerConfig.METRICS_HTTP_PORT:
+        # 每个工作进程使用独立的指标端口
+        CrawlerConfig.METRICS_HTTP_PORT += index + 1
+    
+    summary = None
+    try:
+        crawler = crawler_factory() if crawler_factory else None
+        summary = BatchCrawler(crawler).run(jobs, output_root=worker_dir, switch_delay=switch_delay)
+    except Exception as e:
+        print(f"❌ 工作进程 {index} 异常: {e}")
+    finally:
+        results.put((index, summary, get_process_memory()))
+
+
+class ForkLauncher:
+    """加载模型后fork多个爬虫工作进程"""
+    
+    def __init__(self, workers, crawler_factory=None, sample_interval=1.0):
+        """crawler_factory在工作进程中调用，返回MainCrawler实例（默认新建）"""
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("当前平台不支持fork，无法共享OCR模型")
+        self.workers = max(1, workers)
+        self.crawler_factory = crawler_factory
+        self.sample_interval = sample_interval
+        self.context = multiprocessing.get_context('fork')
+    
+    def preload(self):
+        """在父进程加载OCR模型，返回加载后的父进程内存"""
+        from ocr_manager import TextDetector
+        
+        if CrawlerConfig.OCR_WORKER_PROCESSES > 0:
+            print("⚠️ 已启用OCR进程池，模型在进程池中加载，fork共享不生效")
+        else:
+            started = time.perf_counter()
+            if TextDetector.preload_reader() is None:
+                raise RuntimeError("OCR模型加载失败")
+            print(f"✅ OCR模型已在父进程加载，用时 {time.perf_counter() - started:.2f} 秒")
+        
+        # 把已有对象移入永久代，子进程的垃圾回收不再遍历（写入）这些对象所在的页面
+        gc.collect()
+        gc.freeze()
+        return get_process_memory()
+    
+    def run(self, jobs, output_root=None, switch_delay=0):
+        """把任务轮流分配给各工作进程并等待完成，返回内存报告；switch_delay为每个工作进程两个应用之间等待的秒数"""
+        jobs = [BatchCrawler.normalize_job(job) for job in jobs]
+        output_root = output_root or os.path.join(
+            CrawlerConfig.OUTPUT_DIR, f"fork_{time.strftime('%Y%m%d_%H%M%S')}"
+        )
+        os.makedirs(output_root, exist_ok=True)
+        
+        parent_memory = self.preload()
+        available_before = get_available_memory()
+        
+        results = self.context.Queue()
+        processes = []
+        for index in range(min(self.workers, len(jobs))):
+            process = self.context.Process(
+                target=_worker_main,
+                args=(index, jobs[index::self.workers], output_root, self.crawler_factory, results, switch_delay),
+                name=f"crawler-worker-{index}"
+            )
+            process.start()
+            processes.append(process)
+        gc.unfreeze()
+        print(f"🍴 已fork {len(processes)} 个爬虫工作进程，共 {len(jobs)} 个任务")
+        
+        reports, peaks = self._wait(processes, results)
+        for process in processes:
+            process.join()
+        
+        report = self._build_report(parent_memory, available_before, processes, reports, peaks)
+        with open(os.path.join(output_root, "memory_report.json"), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.print_report(report)
+        return report
+    
+    def _wait(self, processes, results):
+        """等待各工作进程回报结果，期间定期采样独占内存峰值"""
+        reports = {}
+        peaks = {process.pid: 0 for process in processes}
+        while len(reports) < len(processes):
+            try:
+                index, summary, memory = results.get(timeout=self.sample_interval)
+                reports[index] = (summary, memory)
+                continue
+            except queue.Empty:
+                pass
+            
+            for process in processes:
+                if not process.is_alive():
+                    continue
+                try:
+                    uss = get_process_memory(process.pid)['uss']
+                except (FileNotFoundError, ProcessLookupError):
+                    # 检查存活之后工作进程刚好退出，/proc/<pid> 已不存在，跳过这次采样
+                    continue
+                peaks[process.pid] = max(peaks[process.pid], uss or 0)
+            if not any(process.is_alive() for process in processes) and results.empty():
+                # 有工作进程异常退出且没有回报
+                break
+        return reports, peaks
+    
+    def _build_report(self, parent_memory, available_before, processes, reports, peaks):
+        workers = []
+        for index, process in enumerate(processes):
+            summary, memory = reports.get(index, (None, {}))
+            workers.append({
+                'worker': index,
+                'pid': process.pid,
+                'exitcode': process.exitcode,
+                'apps': summary['total_apps'] if summary else 0,
+                'succeeded': summary['succeeded'] if summary else 0,
+                'rss': memory.get('rss'),
+                'pss': memory.get('pss'),
+                'uss': memory.get('uss'),
+                'peak_uss': max(peaks.get(process.pid, 0), memory.get('uss') or 0) or None
+            })
+        
+        report = {'parent': parent_memory, 'available_before_fork': available_before, 'workers': workers}
+        
+        measured = [worker for worker in workers if worker['uss'] and worker['rss']]
+        if measured and available_before:
+            mean_rss = sum(worker['rss'] for worker in measured) / len(measured)
+            mean_uss = sum(worker['peak_uss'] for worker in measured) / len(measured)
+            # 各自加载模型时每个爬虫约占一个完整RSS；fork共享时模型只在父进程占一份，每个爬虫只多占USS
+            report['capacity'] = {
+                'independent': int((available_before + (parent_memory['rss'] or 0)) // mean_rss),
+                'shared': int(available_before // mean_uss)
+            }
+        return report
+    
+    @staticmethod
+    def print_report(report):
+        """打印每个工作进程的内存占用"""
+        parent = report['parent']
+        print(f"\n🧠 fork共享内存报告 (父进程 {parent['pid']}: RSS {format_bytes(parent['rss'])}, "
+              f"USS {format_bytes(parent['uss'])})")
+        print(f"{'进程':<8} {'PID':>8} {'任务':>6} {'RSS':>10} {'PSS':>10} {'USS':>10} {'USS峰值':>10}")
+        for worker in report['workers']:
+            print(f"{'worker_' + str(worker['worker']):<8} {worker['pid']:>8} {worker['succeeded']:>3}/{worker['apps']:<2} "
+                  f"{format_bytes(worker['rss']):>10} {format_bytes(worker['pss']):>10} "
+                  f"{format_bytes(worker['uss']):>10} {format_bytes(worker['peak_uss']):>10}")
+        
+        capacity = report.get('capacity')
+        if capacity:
+            print(f"📈 按fork前可用内存 {format_bytes(report['available_before_fork'])} 估算可同时运行的爬虫: "
+                  f"各自加载 {capacity['independent']} 个，fork共享 {capacity['shared']} 个")
+        elif parent['uss'] is None:
+            print("💡 当前平台无法读取USS，安装psutil后可获得完整报告")
\ No newline at end of file
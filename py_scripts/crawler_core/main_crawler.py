@@ -5,17 +5,24 @@
 负责整体的爬取流程控制和协调各个子模块
 """
 
+import os
+import threading
 import time
 from datetime import datetime
 from config import CrawlerConfig
+from tracer import tracer
+from metrics import metrics, PAGES_CRAWLED, PAGE_FAILURES, LAST_PROGRESS, RETRIES
 from wechat_window_manager import WeChatWindowManager
 from screenshot_manager import ScreenshotManager
 from analysis_client import AnalysisClient
 from data_manager import DataManager
 from directory_manager import DirectoryManager
 from button_manager import ButtonDetector, ButtonNavigator
+from ocr_manager import ScrollTextExtractor
 from .page_crawler import PageCrawler
 from .smart_navigator import SmartNavigator
+from .crawl_frontier import CrawlFrontier
+from .delta_crawl import DeltaCrawl, compute_fingerprint
 
 
 class MainCrawler:
@@ -23,6 +30,16 @@ class MainCrawler:
     
     def __init__(self):
         """初始化主爬虫器"""
+        self.app_name = None
+        # 批量模式下为True：沿用上一个应用设置好的微信窗口
+        self.reuse_window = False
+        # 置位后在处理下一个按钮前停止爬取（常驻服务取消任务时使用）
+        self.stop_event = threading.Event()
+        # 进度回调 callback(event, data)，常驻服务用来推送进度事件
+        self.progress_callback = None
+        # 增量爬取基线（DELTA_CRAWL开启时每次爬取开始时加载）
+        self.delta = None
+        
         # 基础组件
         self.window_manager = WeChatWindowManager()
         self.analysis_client = AnalysisClient()
@@ -36,12 +53,18 @@ class MainCrawler:
         self.button_detector = ButtonDetector()
         self.button_navigator = ButtonNavigator(self.window_manager)
         
+        # 滚动增量文字提取器（复用按钮检测器的OCR引擎）
+        self.text_extractor = None
+        if CrawlerConfig.INCREMENTAL_SCROLL_OCR:
+            self.text_extractor = ScrollTextExtractor(self.button_detector.text_detector)
+        
         # 专用爬虫器
         self.page_crawler = PageCrawler(
             self.window_manager, 
             self.screenshot_manager, 
             self.analysis_client,
-            self.directory_manager
+            self.directory_manager,
+            self.text_extractor
         )
         
         self.smart_navigator = SmartNavigator(
@@ -60,15 +83,51 @@ class MainCrawler:
         print(f"🚀 开始智能爬取微信小程序: {app_name}")
         
         # 设置应用名称
+        self.app_name = app_name
         self.data_manager.set_app_name(app_name)
+        tracer.reset()
+        self.button_navigator.input.reset_stats()
+        metrics.start_exporters()
+        self._emit_progress('crawl_started', app_name=app_name)
         
+        try:
+            with tracer.span('crawl', category='flow', app=app_name):
+                return self._run_crawling()
+        finally:
+            self.data_manager.close_run('cancelled' if self.stop_event.is_set() else 'failed')
+            self._export_trace()
+            metrics.flush_snapshot()
+    
+    def prepare_for_next_app(self):
+        """重置每个应用独立的爬取状态，保留OCR引擎、分析会话和窗口信息（批量模式使用）"""
+        self.app_name = None
+        self.data_manager.close()
+        self.data_manager = DataManager()
+        self.directory_manager.reset(CrawlerConfig.SCREENSHOTS_DIR)
+        self.smart_navigator.reset_navigation_state()
+        self.smart_navigator.main_page_buttons = []
+        self.stop_event.clear()
+        self.delta = None
+        CrawlerConfig.create_output_dirs()
+    
+    def _emit_progress(self, event, **data):
+        """通知进度回调，回调出错不影响爬取"""
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(event, data)
+        except Exception as e:
+            print(f"⚠️ 进度回调失败: {e}")
+    
+    def _run_crawling(self):
+        """执行爬取流程"""
         # 检查服务器连接
         if not self.analysis_client.check_server_health():
             print("❌ 无法连接到MCP服务器，请确保服务器正在运行")
             return False
         
         # 设置小程序环境
-        if not self.window_manager.setup_mini_program_environment():
+        if not self.window_manager.setup_mini_program_environment(reuse_window=self.reuse_window):
             print("❌ 无法设置小程序环境，请确保微信已打开")
             return False
         
@@ -87,10 +146,13 @@ class MainCrawler:
                 return True
             else:
                 print("❌ 爬取失败")
+                if not self.stop_event.is_set():
+                    self.screenshot_manager.dump_recent_frames(self.app_name or "crawl")
                 return False
                 
         except Exception as e:
             print(f"❌ 爬取过程出错: {e}")
+            self.screenshot_manager.dump_recent_frames(self.app_name or "crawl")
             return False
     
     def _start_smart_crawling(self, bounds):
@@ -98,85 +160,219 @@ class MainCrawler:
         print("🧠 开始智能按钮识别和分类爬取...")
         
         # 检测主页面按钮
-        target_buttons = self.smart_navigator.detect_main_page_buttons(bounds)
+        target_buttons = self.smart_navigator.detect_main_page_buttons(bounds, self.app_name)
         
         if not target_buttons:
             print("❌ 未检测到任何目标按钮")
             return False
         
         print(f"🎯 检测到 {len(target_buttons)} 个目标按钮")
+        self._emit_progress('buttons_detected', total=len(target_buttons),
+                            buttons=[button['target'] for button in target_buttons])
+        
+        # 广度优先爬取：主页按钮直达的页面为第一层，深度爬取时各页面中发现的下一级页面依次入队
+        frontier = CrawlFrontier()
+        for button in target_buttons:
+            frontier.push([button])
+        if frontier.deep_crawl:
+            main_state, _ = self.button_detector.capture_page_state(bounds)
+            frontier.mark_visited(main_state, "主页")
+            print(f"🌐 深度爬取: 最大深度 {frontier.max_depth}，最多 {frontier.max_pages} 个页面")
+        self.delta = self._load_delta_baseline()
         
-        # 逐个处理按钮
-        for i, button in enumerate(target_buttons):
+        processed = 0
+        while frontier:
+            if self.stop_event.is_set():
+                print("⏹️ 爬取已取消")
+                self._emit_progress('cancelled', completed=processed, total=processed + len(frontier))
+                return False
+            if frontier.budget_exhausted():
+                print(f"⚠️ 已达到页面数上限 {frontier.max_pages}，剩余 {len(frontier)} 个页面不再爬取")
+                break
+            
+            entry = frontier.pop()
+            processed += 1
+            total = processed + len(frontier)
+            
             print(f"\n{'='*50}")
-            print(f"🎯 处理按钮 {i+1}/{len(target_buttons)}: {button['target']}")
+            print(f"🎯 处理页面 {processed}/{total}: {entry['name']} (深度 {entry['depth']})")
             print(f"{'='*50}")
             
-            success = self._process_single_button(button, bounds)
+            with tracer.span('button', category='flow', target=entry['name']):
+                success = self._process_single_button(entry, bounds, frontier)
+            
+            if success is None:
+                self._emit_progress('page_skipped', index=processed, total=processed + len(frontier),
+                                    target=entry['name'], depth=entry['depth'])
+                continue
+            
+            if success:
+                frontier.mark_crawled()
+                PAGES_CRAWLED.inc()
+                LAST_PROGRESS.set(time.time())
+            else:
+                PAGE_FAILURES.inc()
+                if self.delta is not None:
+                    self.delta.mark_failed(entry['name'])
+            
+            total = processed + len(frontier)
+            self._emit_progress('button_finished', index=processed, total=total,
+                                target=entry['name'], depth=entry['depth'], success=success)
             
             if not success:
-                print(f"⚠️ 按钮 {button['target']} 处理失败，继续下一个")
+                print(f"⚠️ 页面 {entry['name']} 处理失败，继续下一个")
                 continue
             
             # 进度显示
-            progress = (i + 1) / len(target_buttons) * 100
-            print(f"📊 整体进度: {progress:.1f}% ({i+1}/{len(target_buttons)})")
+            progress = processed / total * 100
+            print(f"📊 整体进度: {progress:.1f}% ({processed}/{total})")
         
-        print("\n🎉 所有按钮处理完成！")
+        self.data_manager.set_frontier_stats(frontier.get_stats())
+        if self.delta is not None:
+            # 页面数达到上限提前结束时，没访问到的页面不能算作消失
+            self.data_manager.set_delta_summary(self.delta.finish(complete=not frontier))
+        print("\n🎉 所有页面处理完成！")
         return True
     
-    def _process_single_button(self, button, bounds):
-        """处理单个按钮的完整流程"""
+    def _load_delta_baseline(self):
+        """增量爬取时从结果数据库加载上次完成的运行作为基线，未开启或没有结果数据库时返回None"""
+        if not CrawlerConfig.DELTA_CRAWL:
+            return None
+        if self.data_manager.results_store is None:
+            print("⚠️ 增量爬取需要结果数据库（RESULTS_DB_ENABLED），本次完整爬取")
+            return None
+        return DeltaCrawl(self.data_manager.results_store, self.app_name, blob_store=self.screenshot_manager.blob_store)
+    
+    def _process_single_button(self, entry, bounds, frontier):
+        """处理单个待爬页面的完整流程，返回是否成功（与已访问页面相同而跳过时返回None）"""
+        name = entry['name']
+        depth = entry['depth']
         try:
-            print(f"\n🔧 准备处理按钮: {button['target']}")
+            print(f"\n🔧 准备处理页面: {name}")
             
-            # 在处理每个按钮前，重新确认环境状态
+            # 在处理每个页面前，重新确认环境状态
             self._ensure_environment_ready(bounds)
             
-            # 1. 创建按钮专用目录
-            button_dir = self.directory_manager.create_button_directory(button['target'])
-            if not button_dir:
+            # 1. 从主页依次点击，导航到页面
+            print(f"🧭 导航到页面: {name}")
+            with tracer.span('navigate', category='flow', target=name):
+                navigated = self.smart_navigator.navigate_to_path(entry['path'], bounds)
+            if not navigated:
+                print(f"❌ 导航到页面失败: {name}")
+                self.screenshot_manager.dump_recent_frames(name)
+                self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 2)
                 return False
             
-            # 2. 导航到按钮页面
-            print(f"🧭 导航到按钮页面: {button['target']}")
-            if not self.smart_navigator.navigate_to_button_page(button, bounds):
-                print(f"❌ 导航到按钮页面失败: {button['target']}")
-                return False
-            
-            # 3. 等待页面稳定
+            # 2. 等待页面稳定
             print(f"⏳ 等待页面稳定...")
-            time.sleep(2)
+            with tracer.span('wait'):
+                time.sleep(2)
+            
+            # 3. 首屏指纹（一次截图，不做OCR）：记录到页面数据，增量爬取时与基线比较
+            fingerprint = compute_fingerprint(self.button_detector.capture_bounds(bounds))
+            change = self.delta.compare(name, fingerprint) if self.delta is not None else None
+            
+            # 4. 深度爬取：跳过已访问的页面状态，探测下一级页面（增量爬取时首屏未变化的页面沿用基线中的下一级页面）
+            state = None
+            child_targets = None
+            if frontier.deep_crawl:
+                state, text_items = self.button_detector.capture_page_state(bounds)
+                duplicate = frontier.find_state(state, include_queued=False)
+                if duplicate:
+                    print(f"♻️ {name} 与已爬取页面 {duplicate} 相同，跳过截图")
+                    frontier.stats['duplicates'] += 1
+                    self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 2)
+                    return None
+                frontier.mark_visited(state, name)
+                
+                if frontier.should_expand(depth):
+                    if change is not None and change['status'] == 'unchanged':
+                        child_targets = self.delta.child_targets(change)
+                    if child_targets is not None:
+                        print(f"♻️ {name} 首屏未变化，沿用基线中的 {len(child_targets)} 个下一级页面，不再探测")
+                        for target in child_targets:
+                            frontier.push(entry['path'] + [target])
+                        stayed = True
+                    else:
+                        child_targets = []
+                        with tracer.span('discover', category='flow', target=name):
+                            stayed = self.smart_navigator.discover_child_pages(entry, state, text_items, bounds,
+                                                                               frontier, discovered=child_targets)
+                    if not stayed:
+                        # 探测后没能回到当前页面，重新导航；探测不完整，不记录下一级页面
+                        child_targets = None
+                        self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 3)
+                        if not self.smart_navigator.navigate_to_path(entry['path'], bounds):
+                            print(f"❌ 重新导航到页面失败: {name}")
+                            self.screenshot_manager.dump_recent_frames(name)
+                            return False
+                        time.sleep(2)
             
-            # 4. 爬取内页
-            print(f"📄 开始爬取内页内容: {button['target']}")
-            page_data = self.page_crawler.crawl_inner_page(button['target'])
+            # 5. 创建页面专用目录
+            button_dir = self.directory_manager.create_button_directory(name)
+            if not button_dir:
+                self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 2)
+                return False
+            
+            # 6. 爬取内页（增量爬取时首屏未变化的页面直接复用基线的截图和分析结果）
+            page_data = None
+            if change is not None and change['status'] == 'unchanged':
+                page_data = self.delta.reuse_page(change, button_dir)
+                if page_data is not None:
+                    print(f"♻️ {name} 首屏与运行 #{change['baseline_run']} 一致，复用上次的截图和分析结果")
+                else:
+                    change.update(status='refresh', reason='missing_screenshots')
+            if page_data is None:
+                print(f"📄 开始爬取内页内容: {name}")
+                with tracer.span('crawl_page', category='flow', target=name):
+                    page_data = self.page_crawler.crawl_inner_page(name)
+                if page_data:
+                    page_data['fingerprint'] = fingerprint
             if not page_data:
-                print(f"❌ 内页爬取失败: {button['target']}")
+                print(f"❌ 内页爬取失败: {name}")
+                self.screenshot_manager.dump_recent_frames(name)
                 # 即使爬取失败，也尝试返回主页
-                self.smart_navigator.return_to_main_page(bounds)
+                self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 2)
                 return False
             
-            # 5. 返回主页
+            page_data['depth'] = depth
+            page_data['path'] = [target['target'] for target in entry['path']]
+            if state is not None:
+                page_data['page_state'] = {'phash': f"{state['phash']:016x}", 'texts': len(state['texts'])}
+            page_data.pop('child_targets', None)
+            if child_targets is not None:
+                # 只保留重放点击需要的字段
+                page_data['child_targets'] = [
+                    {'target': target['target'], 'center': [int(value) for value in target['center']]}
+                    for target in child_targets
+                ]
+            if change is not None:
+                self.delta.record(change)
+                page_data['delta'] = change
+            
+            # 7. 返回主页
             print(f"🔙 返回主页...")
-            return_success = self.smart_navigator.return_to_main_page(bounds)
+            with tracer.span('return', category='flow', target=name):
+                return_success = self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 2)
             if not return_success:
                 print(f"⚠️ 返回主页失败，尝试重新设置环境")
+                RETRIES.inc(operation='setup_environment')
                 # 重新设置环境以准备处理下一个按钮
                 self.window_manager.setup_mini_program_environment()
                 time.sleep(2)
             
-            # 6. 记录数据
+            # 8. 记录数据
             self.data_manager.add_page_data(page_data)
             
-            print(f"✅ 按钮 {button['target']} 处理完成")
+            print(f"✅ 页面 {name} 处理完成")
             return True
             
         except Exception as e:
-            print(f"❌ 处理按钮 {button['target']} 时出错: {e}")
+            print(f"❌ 处理页面 {name} 时出错: {e}")
+            self.screenshot_manager.dump_recent_frames(name)
             # 发生异常时，尝试返回主页
             try:
-                self.smart_navigator.return_to_main_page(bounds)
+                self.smart_navigator.return_to_main_page(bounds, max_attempts=depth + 2)
             except:
                 pass
             return False
@@ -191,14 +387,13 @@ class MainCrawler:
                 print(f"⚠️ 小程序环境丢失，重新设置...")
                 self.window_manager.setup_mini_program_environment()
             
-            # 确保聚焦到正确位置
+            # 确保聚焦到正确位置（聚焦后的等待由输入调度器在下一次操作前补足）
             self.window_manager.focus_mini_program_area()
             
             # 重置截图管理器的检测缓存
             if hasattr(self.screenshot_manager, 'detection_strategy'):
                 print(f"🔄 重置检测缓存...")
             
-            time.sleep(1)
             print(f"✅ 环境状态检查完成")
             
         except Exception as e:
@@ -212,7 +407,11 @@ class MainCrawler:
         
         # 保存结果
         self.data_manager.finalize_crawl_data()
-        self.data_manager.save_results()
+        if tracer.enabled:
+            self.data_manager.set_stage_stats(tracer.get_stage_stats(category='stage'))
+        self.data_manager.set_input_stats(self.button_navigator.input.get_summary())
+        with tracer.span('write_results'):
+            self.data_manager.save_results()
         
         # 清理空目录
         self.directory_manager.cleanup_empty_directories()
@@ -228,6 +427,14 @@ class MainCrawler:
         print(f"📸 保存 {dir_summary['total_screenshots']} 张截图")
         print(f"🧭 访问 {nav_summary['total_navigations']} 个页面")
         print(f"⏱️ 总耗时 {stats.get('duration', 0)} 秒")
+        self.button_navigator.input.print_summary()
+        if self.screenshot_manager.blob_store is not None:
+            storage = self.screenshot_manager.blob_store.get_summary()
+            print(f"🧱 截图存储: {storage['refs']} 张截图共用 {storage['blobs']} 个画面，"
+                  f"占用 {storage['stored_bytes'] / 1024 / 1024:.1f}MB（逻辑大小 {storage['logical_bytes'] / 1024 / 1024:.1f}MB）")
+        if self.smart_navigator.button_cache:
+            cache_stats = self.smart_navigator.button_cache.get_cache_stats()
+            print(f"🗂️ 按钮缓存: 命中 {cache_stats['hits']} 次, 未命中 {cache_stats['misses']} 次")
         
         # 显示目录摘要
         if dir_summary['directories']:
@@ -235,6 +442,21 @@ class MainCrawler:
             for dir_name, count in dir_summary['directories'].items():
                 print(f"  📂 {dir_name}: {count} 张截图")
     
+    def _export_trace(self):
+        """导出本次爬取的Chrome trace（chrome://tracing 或 ui.perfetto.dev 打开）"""
+        if not tracer.enabled or not tracer.events:
+            return
+        
+        try:
+            trace_path = os.path.join(
+                CrawlerConfig.OUTPUT_DIR,
+                CrawlerConfig.get_timestamp_filename("crawl_trace", ".json")
+            )
+            tracer.export_chrome_trace(trace_path)
+            print(f"⏱️ 阶段耗时追踪已保存: {trace_path}")
+        except Exception as e:
+            print(f"⚠️ 保存阶段耗时追踪失败: {e}")
+    
     def get_crawling_progress(self):
         """获取爬取进度"""
         nav_summary = self.button_navigator.get_navigation_summary()
@@ -6,19 +6,19 @@
 """
 
 import os
-import time
 from datetime import datetime
 
 
 class PageCrawler:
     """页面爬虫器类"""
     
-    def __init__(self, window_manager, screenshot_manager, analysis_client, directory_manager):
+    def __init__(self, window_manager, screenshot_manager, analysis_client, directory_manager, text_extractor=None):
         """初始化页面爬虫器"""
         self.window_manager = window_manager
         self.screenshot_manager = screenshot_manager
         self.analysis_client = analysis_client
         self.directory_manager = directory_manager
+        self.text_extractor = text_extractor
     
     def crawl_inner_page(self, page_name):
         """爬取内页面（滚动截图）"""
@@ -38,12 +38,15 @@ class PageCrawler:
         # 确保聚焦到小程序区域
         print(f"🎯 聚焦到小程序区域...")
         self.window_manager.focus_mini_program_area()
-        time.sleep(1)
         
         try:
             # 开始滚动截图
             print(f"📸 开始执行滚动截图...")
-            scroll_screenshots = self.screenshot_manager.take_scrolling_screenshot(page_name)
+            if self.text_extractor:
+                self.text_extractor.start_page(page_name)
+            scroll_screenshots = self.screenshot_manager.take_scrolling_screenshot(
+                page_name, text_extractor=self.text_extractor
+            )
             
             if not scroll_screenshots:
                 print(f"❌ 滚动截图失败: {page_name}")
@@ -69,26 +72,42 @@ class PageCrawler:
                 print(f"❌ 页面分析失败: {page_name}")
                 analysis_data = {}
             
-            # 构建页面数据
+            # 构建页面数据；本页面目录中的截图记录文件名，近重复而跳过保存的帧引用其他页面的文件，记录绝对路径
+            screenshot_directory = self.directory_manager.current_button_dir
+            def screenshot_ref(path):
+                if screenshot_directory and os.path.dirname(os.path.abspath(path)) == os.path.abspath(screenshot_directory):
+                    return os.path.basename(path)
+                return os.path.abspath(path)
+            
             page_data = {
                 'page_name': page_name,
                 'timestamp': datetime.now().isoformat(),
                 'is_main_page': False,
                 'is_inner_page': True,
                 'screenshots': {
-                    'scroll_sequence': [os.path.basename(path) for path in scroll_screenshots],
-                    'main_screenshot': os.path.basename(main_screenshot),
-                    'total_screenshots': len(scroll_screenshots)
+                    'scroll_sequence': [screenshot_ref(path) for path in scroll_screenshots],
+                    'main_screenshot': screenshot_ref(main_screenshot),
+                    'total_screenshots': len(scroll_screenshots),
+                    'duplicates': self.screenshot_manager.last_duplicates
                 },
                 'analysis': analysis_data,
                 'extracted_features': self.analysis_client.extract_page_features(analysis_data) if analysis_data else {},
                 'mini_program_bounds': current_bounds,
-                'screenshot_directory': self.directory_manager.current_button_dir
+                'screenshot_directory': screenshot_directory
             }
             
+            # 滚动截图的增量归档（CrawlerConfig.SCROLL_ARCHIVE_ENABLED）
+            if self.screenshot_manager.last_archive:
+                page_data['screenshots']['archive'] = os.path.basename(self.screenshot_manager.last_archive)
+            
+            # 本地增量OCR得到的整页文字（坐标为整页坐标）
+            if self.text_extractor:
+                page_data['local_ocr_text'] = self.text_extractor.get_page_text()
+                page_data['local_ocr_stats'] = self.text_extractor.get_stats()
+            
             print(f"✅ 内页爬取完成: {page_name}")
             return page_data
-            
+        
         except Exception as e:
             print(f"❌ 内页爬取失败: {e}")
             import traceback
@@ -116,4 +135,4 @@ class PageCrawler:
         if success_rate >= 0.8:  # 80%以上成功率认为合格
             return True, f"截图质量良好 ({valid_count}/{total_count})"
         else:
-            return False, f"截图质量不佳 ({valid_count}/{total_count})" 
\ No newline at end of file
+            return False, f"截图质量不佳 ({valid_count}/{total_count})"
\ No newline at end of file
@@ -6,19 +6,30 @@
 """
 
 import time
+from config import CrawlerConfig
+from button_manager import ButtonCache
+from metrics import RETRIES
+from .crawl_frontier import CrawlFrontier
 
 
 class SmartNavigator:
     """智能导航器类"""
     
-    def __init__(self, button_detector, button_navigator, window_manager):
+    def __init__(self, button_detector, button_navigator, window_manager, button_cache=None):
         """初始化智能导航器"""
         self.button_detector = button_detector
         self.button_navigator = button_navigator
         self.window_manager = window_manager
+        
+        # 主页按钮位置缓存
+        if button_cache is None and CrawlerConfig.BUTTON_CACHE_ENABLED:
+            button_cache = ButtonCache()
+        self.button_cache = button_cache
+        self.current_app_name = None
+        self.main_page_buttons = []
     
-    def detect_main_page_buttons(self, bounds):
-        """检测主页面的目标按钮"""
+    def detect_main_page_buttons(self, bounds, app_name=None):
+        """检测主页面的目标按钮（优先复用按钮位置缓存）"""
         print("🔍 开始检测主页面按钮...")
         
         # 确保在主页面
@@ -30,10 +41,26 @@ class SmartNavigator:
         
         # 确保聚焦到小程序区域
         self.window_manager.focus_mini_program_area()
-        time.sleep(1)
+        
+        self.current_app_name = app_name
+        screenshot = self.button_detector.capture_bounds(bounds)
+        fingerprint = self.button_detector.compute_page_fingerprint(screenshot)
+        
+        # 主页指纹匹配时直接复用缓存的按钮位置
+        if self.button_cache and app_name:
+            cached_buttons = self.button_cache.lookup(app_name, fingerprint, bounds)
+            if cached_buttons:
+                print(f"✅ 复用缓存的 {len(cached_buttons)} 个按钮位置，跳过OCR")
+                self.main_page_buttons = cached_buttons
+                return cached_buttons
         
         # 检测按钮
-        target_buttons = self.button_detector.detect_buttons_in_bounds(bounds)
+        target_buttons = self.button_detector.detect_buttons_in_bounds(bounds, screenshot)
+        
+        if target_buttons and self.button_cache and app_name:
+            self.button_cache.store(app_name, fingerprint, bounds, target_buttons)
+        
+        self.main_page_buttons = target_buttons
         
         if target_buttons:
             print(f"✅ 在主页面检测到 {len(target_buttons)} 个目标按钮:")
@@ -68,6 +95,13 @@ class SmartNavigator:
                 if not is_still_main_page:
                     print(f"✅ 成功进入内页: {button['target']}")
                     return True
+                elif button.get('from_cache'):
+                    # 缓存位置点击无效，说明主页布局已变化，重新OCR后再试一次
+                    print(f"⚠️ 缓存的按钮位置点击无效: {button['target']}，重新检测按钮")
+                    RETRIES.inc(operation='cached_button_click')
+                    if self._refresh_cached_buttons(bounds):
+                        return self.navigate_to_button_page(button, bounds)
+                    return False
                 else:
                     print(f"⚠️ 返回按钮检测认为仍在主页，但强制继续执行内页截图")
                     print(f"📸 点击已执行，假设成功进入内页: {button['target']}")
@@ -81,8 +115,52 @@ class SmartNavigator:
             print(f"❌ 导航失败: {e}")
             return False
     
-    def return_to_main_page(self, bounds):
-        """返回主页面"""
+    def navigate_to_path(self, path, bounds):
+        """从主页依次点击路径上的目标，进入深层页面"""
+        if not self.navigate_to_button_page(path[0], bounds):
+            return False
+        
+        for target in path[1:]:
+            print(f"🧭 进入下一级页面: {target['target']}")
+            if not self.button_navigator.click_button(target, bounds):
+                return False
+        return True
+    
+    def discover_child_pages(self, entry, state, text_items, bounds, frontier, discovered=None):
+        """在当前页面逐个点击候选目标，跳转到新页面的加入待爬队列，随后返回当前页面
+        
+        加入队列的目标同时追加到discovered（增量爬取时记录到页面数据，下次首屏未变化时不再探测）；
+        返回是否仍停留在当前页面（返回失败时调用方需要重新导航）
+        """
+        targets = self.button_detector.button_matcher.find_click_targets(
+            text_items, min_y=CrawlerConfig.SCROLL_FIXED_HEADER_HEIGHT, exclude=[entry['path'][-1]['target']]
+        )
+        print(f"🔎 探测 {entry['name']} 中的 {len(targets)} 个候选目标")
+        
+        for target in targets:
+            self.button_navigator.click_button(target, bounds, record=False)
+            child_state, _ = self.button_detector.capture_page_state(bounds)
+            if CrawlFrontier.is_same_state(child_state, state):
+                frontier.stats['non_links'] += 1
+                continue
+            
+            self.button_navigator.record_navigation(target)
+            if frontier.push(entry['path'] + [target], child_state):
+                print(f"🆕 发现下一级页面: {frontier.path_name(entry['path'] + [target])}")
+                if discovered is not None:
+                    discovered.append(target)
+            
+            # 返回当前页面并确认
+            self.button_navigator.go_back(bounds, entry['name'])
+            back_state, _ = self.button_detector.capture_page_state(bounds)
+            if not CrawlFrontier.is_same_state(back_state, state):
+                print(f"⚠️ 探测 {target['target']} 后未能返回 {entry['name']}，停止探测")
+                RETRIES.inc(operation='probe_return')
+                return False
+        return True
+    
+    def return_to_main_page(self, bounds, max_attempts=3):
+        """返回主页面（深层页面需要多次返回，max_attempts应不小于页面深度）"""
         print("🔙 返回主页面...")
         
         try:
@@ -92,10 +170,10 @@ class SmartNavigator:
                 return True
             
             # 尝试多种返回方法
-            max_attempts = 3
-            
             for attempt in range(max_attempts):
                 print(f"🔄 返回尝试 {attempt + 1}/{max_attempts}")
+                if attempt > 0:
+                    RETRIES.inc(operation='return_to_main')
                 
                 # 方法1: 点击返回按钮
                 if self.button_navigator.return_to_main_page(bounds):
@@ -131,6 +209,34 @@ class SmartNavigator:
             print(f"❌ 返回主页失败: {e}")
             return False
     
+    def _refresh_cached_buttons(self, bounds):
+        """缓存失效时重新OCR检测主页按钮，并原地更新已下发的按钮位置"""
+        if self.button_cache and self.current_app_name:
+            self.button_cache.invalidate(self.current_app_name)
+        
+        # 点击无效时仍停留在主页，但导航器已记为进入内页
+        self.button_navigator.current_page = "主页"
+        
+        screenshot = self.button_detector.capture_bounds(bounds)
+        fresh_buttons = self.button_detector.detect_buttons_in_bounds(bounds, screenshot)
+        if not fresh_buttons:
+            print("❌ 重新检测未找到任何按钮")
+            return False
+        
+        if self.button_cache and self.current_app_name:
+            fingerprint = self.button_detector.compute_page_fingerprint(screenshot)
+            self.button_cache.store(self.current_app_name, fingerprint, bounds, fresh_buttons)
+        
+        fresh_by_target = {button['target']: button for button in fresh_buttons}
+        for button in self.main_page_buttons:
+            fresh = fresh_by_target.get(button['target'])
+            if fresh:
+                button.update(fresh)
+            button['from_cache'] = False
+        
+        print(f"🔄 已刷新 {len(fresh_buttons)} 个按钮位置")
+        return True
+    
     def _try_click_back_area(self, bounds):
         """尝试点击返回区域"""
         try:
@@ -142,8 +248,7 @@ class SmartNavigator:
             print(f"🎯 尝试点击返回区域: ({back_x}, {back_y})")
             
             # 点击左上角区域
-            import pyautogui
-            pyautogui.click(back_x, back_y)
+            self.button_navigator.input.click(back_x, back_y)
             
         except Exception as e:
             print(f"⚠️ 点击返回区域失败: {e}")
@@ -174,7 +279,6 @@ class SmartNavigator:
         
         # 2. 确保聚焦到小程序
         self.window_manager.focus_mini_program_area()
-        time.sleep(1)
         
         # 3. 重置检测缓存
         self.button_detector.reset_detection_cache()
@@ -7,14 +7,16 @@
 
 import json
 import os
+import sqlite3
 import time
 from datetime import datetime
 from config import CrawlerConfig
+from results_store import get_results_store
 
 class DataManager:
     """数据管理器"""
     
-    def __init__(self):
+    def __init__(self, results_store=None):
         self.crawl_data = {
             "crawl_info": {
                 "start_time": datetime.now().isoformat(),
@@ -29,14 +31,55 @@ class DataManager:
         }
         self.visited_buttons = set()
         self.start_time = time.time()
+        self.stage_stats = {}
+        
+        # 结果数据库（与JSON结果文件并存，写入失败不影响爬取）
+        self.results_store = results_store if results_store is not None else get_results_store()
+    
+    def _store_call(self, method, *args, **kwargs):
+        """调用结果数据库，出错时停用数据库并继续爬取"""
+        if self.results_store is None:
+            return None
+        try:
+            return getattr(self.results_store, method)(*args, **kwargs)
+        except sqlite3.Error as e:
+            print(f"⚠️ 写入结果数据库失败，本次运行只保存JSON: {e}")
+            self.results_store = None
+            return None
+    
+    def close(self):
+        """关闭结果数据库连接"""
+        if self.results_store is not None:
+            self.results_store.close()
+            self.results_store = None
     
     def set_app_name(self, app_name):
-        """设置应用名称"""
+        """设置应用名称，同时在结果数据库中开始一次运行"""
         self.crawl_data['crawl_info']['app_name'] = app_name
+        if self.results_store is not None and self.results_store.run_id is None:
+            self._store_call('begin_run', app_name, self.crawl_data['crawl_info']['start_time'])
     
     def add_page_data(self, page_data):
         """添加页面数据"""
         self.crawl_data['pages'].append(page_data)
+        self._store_call('add_page', page_data)
+    
+    def set_stage_stats(self, stage_stats):
+        """设置各阶段耗时统计（来自追踪器）"""
+        self.stage_stats = stage_stats
+        self.crawl_data['stage_timings'] = stage_stats
+    
+    def set_input_stats(self, input_stats):
+        """设置输入调度统计（各操作次数、等待时间、省掉的聚焦点击次数和秒数）"""
+        self.crawl_data['input'] = input_stats
+    
+    def set_frontier_stats(self, frontier_stats):
+        """设置深度爬取边界统计（发现/跳过的页面数等）"""
+        self.crawl_data['frontier'] = frontier_stats
+    
+    def set_delta_summary(self, delta_summary):
+        """设置增量爬取汇总（基线运行、各比较结果的页面数和变化记录）"""
+        self.crawl_data['delta'] = delta_summary
     
     def add_navigation_mapping(self, button_text, page_name):
         """添加导航映射"""
@@ -57,10 +100,19 @@ class DataManager:
         self.crawl_data['crawl_info']['crawl_duration'] = round(end_time - self.start_time, 2)
         self.crawl_data['crawl_info']['total_pages'] = len(self.crawl_data['pages'])
         self.crawl_data['crawl_info']['total_buttons'] = len(self.visited_buttons)
+        self.crawl_data['crawl_info'].setdefault('status', 'completed')
         
         # 生成功能总结
         self._generate_feature_summary()
     
+    def close_run(self, status):
+        """爬取被取消或中途失败、没有保存结果时，在结果数据库中结束本次运行（已保存的页面保留）"""
+        if self.results_store is None or self.results_store.run_id is None:
+            return
+        self.crawl_data['crawl_info']['status'] = status
+        self.crawl_data['crawl_info']['total_pages'] = len(self.crawl_data['pages'])
+        self._store_call('finish_run', self.crawl_data)
+    
     def _generate_feature_summary(self):
         """生成功能总结"""
         summary = {
@@ -134,9 +186,13 @@ class DataManager:
         with open(report_path, 'w', encoding='utf-8') as f:
             f.write(self._generate_text_report())
         
+        run_id = self._store_call('finish_run', self.crawl_data, json_path)
+        
         print(f"💾 爬取结果已保存:")
         print(f"   📄 完整数据: {json_path}")
         print(f"   📋 文本报告: {report_path}")
+        if run_id is not None:
+            print(f"   🗄️ 结果数据库: {self.results_store.db_file} (运行 #{run_id})")
         
         return json_path, report_path
     
@@ -155,6 +211,18 @@ class DataManager:
         report.append(f"爬取耗时: {info['crawl_duration']}秒")
         report.append("")
         
+        # 增量爬取
+        delta = self.crawl_data.get('delta')
+        if delta:
+            stats = delta['stats']
+            baseline = f"基线运行 #{delta['baseline_run']}" if delta['baseline_run'] is not None else "无基线，完整爬取"
+            report.append(f"增量爬取（{baseline}）:")
+            report.append(f"  未变化 {stats['unchanged']}，变化 {stats['changed']}，新增 {stats['new']}，"
+                          f"重新爬取 {stats['refresh']}，消失 {stats['removed']}，未知 {stats.get('unknown', 0)}")
+            for change in delta['changes']:
+                report.append(f"    - [{change['status']}] {change['page']}")
+            report.append("")
+        
         # 功能总结
         summary = self.crawl_data['feature_summary']
         report.append("功能总结:")
@@ -163,6 +231,25 @@ class DataManager:
             report.append(f"    - {func_type}: {count}个")
         report.append("")
         
+        # 阶段耗时
+        if self.stage_stats:
+            report.append("阶段耗时:")
+            report.append(f"  {'阶段':<14}{'次数':>6}{'p50(ms)':>12}{'p95(ms)':>12}{'总计(ms)':>14}")
+            for name, stage in self.stage_stats.items():
+                report.append(
+                    f"  {name:<14}{stage['count']:>6}{stage['p50_ms']:>12.2f}{stage['p95_ms']:>12.2f}{stage['total_ms']:>14.1f}"
+                )
+            report.append("")
+        
+        # 输入和焦点
+        if 'input' in self.crawl_data:
+            focus = self.crawl_data['input']['focus']
+            report.append("输入和焦点:")
+            report.append(f"  聚焦点击: {focus['clicks']}次")
+            report.append(f"  省掉聚焦点击: {focus['clicks_saved']}次（焦点仍在 {focus['skipped']}，与点击合并 {focus['merged']}）")
+            report.append(f"  节省时间: {focus['seconds_saved']:.1f}秒")
+            report.append("")
+        
         # 页面详情
         report.append("页面详情:")
         for page in self.crawl_data['pages']:
@@ -20,6 +20,12 @@ class DirectoryManager:
         self.current_button_dir = None
         self.created_dirs = []
     
+    def reset(self, base_screenshots_dir=None):
+        """切换到新的截图根目录并清空已创建目录记录（批量模式每个应用调用一次）"""
+        self.base_screenshots_dir = base_screenshots_dir or CrawlerConfig.SCREENSHOTS_DIR
+        self.current_button_dir = None
+        self.created_dirs = []
+    
     def create_button_directory(self, button_name):
         """为指定按钮创建目录"""
         # 清理按钮名称，确保可以作为目录名
@@ -17,7 +17,8 @@ def setup_torch_for_apple_silicon():
     # 设置环境变量
     os.environ['PYTORCH_ENABLE_MPS_FALLBACK'] = '1'
     os.environ['TORCH_DEVICE'] = 'cpu'
-    os.environ['OMP_NUM_THREADS'] = '1'
+    # 未显式设置时才限制为单线程；实测的推理线程数由OCR运行配置（ocr_profile.json）在运行时设置
+    os.environ.setdefault('OMP_NUM_THREADS', '1')
     
     # 过滤警告
     warnings.filterwarnings('ignore', category=UserWarning, module='torch')
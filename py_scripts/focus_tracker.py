@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+焦点状态跟踪
+聚焦点击前先查询前台应用、它最前面的窗口和聚焦点处最上层窗口的所属应用（NSWorkspace + CGWindowList，约1毫秒），
+微信在前台、聚焦点落在它最前面的窗口内且没有被其他应用的窗口挡住时不再点击；确认焦点已丢失时才重新聚焦
+"""
+
+import threading
+import time
+from config import CrawlerConfig
+from metrics import FOCUS_CHECKS
+
+FOCUSED = 'focused'
+LOST = 'lost'
+UNKNOWN = 'unknown'
+
+
+def _contains(window, x, y):
+    return window[0] <= x < window[0] + window[2] and window[1] <= y < window[1] + window[3]
+
+
+def macos_focus_probe(x, y):
+    """查询前台应用、它最前面的普通窗口和点(x, y)处最上层普通窗口的所属应用，
+    返回 {'bundle_id', 'name', 'window': (x, y, 宽, 高) 或 None, 'owner': 所属应用的bundle id 或 None}
+    """
+    from AppKit import NSRunningApplication, NSWorkspace
+    from Quartz import (CGWindowListCopyWindowInfo, kCGNullWindowID,
+                        kCGWindowListExcludeDesktopElements, kCGWindowListOptionOnScreenOnly)
+    
+    app = NSWorkspace.sharedWorkspace().frontmostApplication()
+    if app is None:
+        return None
+    pid = app.processIdentifier()
+    
+    window = None
+    owner_pid = None
+    # 窗口按从前到后的顺序返回，第0层为普通窗口（菜单栏、Dock等不在第0层）；
+    # 其他应用的窗口可能排在前台应用的窗口前面（如置顶的浮动窗口），不能只看第一个窗口
+    for info in CGWindowListCopyWindowInfo(kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements,
+                                           kCGNullWindowID) or []:
+        if info.get('kCGWindowLayer', 0) != 0:
+            continue
+        bounds = info.get('kCGWindowBounds', {})
+        frame = (bounds.get('X', 0), bounds.get('Y', 0), bounds.get('Width', 0), bounds.get('Height', 0))
+        if window is None and info.get('kCGWindowOwnerPID') == pid:
+            window = frame
+        if owner_pid is None and _contains(frame, x, y):
+            owner_pid = info.get('kCGWindowOwnerPID')
+        if window is not None and owner_pid is not None:
+            break
+    
+    owner = None
+    if owner_pid is not None:
+        owner_app = NSRunningApplication.runningApplicationWithProcessIdentifier_(owner_pid)
+        owner = owner_app.bundleIdentifier() if owner_app is not None else None
+    return {'bundle_id': app.bundleIdentifier(), 'name': app.localizedName(), 'window': window, 'owner': owner}
+
+
+class FocusTracker:
+    """焦点状态跟踪类：查询失败（非macOS或缺少pyobjc）时返回未知，由调用方退回按时间判断"""
+    
+    def __init__(self, probe=None):
+        self.probe = probe or macos_focus_probe
+        self.stats = {FOCUSED: 0, LOST: 0, UNKNOWN: 0, 'check_time': 0.0}
+        self._available = CrawlerConfig.FOCUS_TRACKING_ENABLED
+        self._lock = threading.Lock()
+    
+    def check(self, x, y):
+        """聚焦点(x, y)所在的微信窗口是否已有焦点，返回 FOCUSED / LOST / UNKNOWN"""
+        if not self._available:
+            return self._count(UNKNOWN, 0.0)
+        
+        started = time.perf_counter()
+        try:
+            state = self.probe(x, y)
+        except ImportError as e:
+            print(f"💡 无法查询前台应用，焦点状态改按点击时间判断: {e}")
+            self._available = False
+            state = None
+        except Exception as e:
+            print(f"⚠️ 查询前台应用失败: {e}")
+            state = None
+        seconds = time.perf_counter() - started
+        
+        if state is None:
+            return self._count(UNKNOWN, seconds)
+        if state['bundle_id'] not in CrawlerConfig.WECHAT_BUNDLE_IDS:
+            return self._count(LOST, seconds)
+        if state['owner'] not in CrawlerConfig.WECHAT_BUNDLE_IDS:
+            # 微信在前台，但聚焦点处是其他应用的窗口（或没有窗口），点击不会落到小程序上
+            return self._count(LOST, seconds)
+        window = state['window']
+        if window is not None and not _contains(window, x, y):
+            # 微信在前台，但最前面的是其他微信窗口（如聊天窗口挡在小程序前面）
+            return self._count(LOST, seconds)
+        return self._count(FOCUSED, seconds)
+    
+    def _count(self, result, seconds):
+        with self._lock:
+            self.stats[result] += 1
+            self.stats['check_time'] += seconds
+        FOCUS_CHECKS.inc(result=result)
+        return result
+    
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {FOCUSED: 0, LOST: 0, UNKNOWN: 0, 'check_time': 0.0}
\ No newline at end of file
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输入调度器
+所有鼠标键盘操作经由同一个调度器执行，取代每次操作后固定等待的 pyautogui.PAUSE：
+按上一次操作的类型只补足还没过去的最小间隔（中间的页面加载等待、截图和识别耗时都计入间隔），
+只在焦点确实丢失时聚焦点击（FocusTracker查询前台窗口；查询不可用时按最近点击时间判断并与紧接着的点击合并），
+并分别统计执行输入、间隔等待和等待界面响应的时间，以及省掉的聚焦点击次数和秒数
+"""
+
+import threading
+import time
+import pyautogui
+from config import CrawlerConfig
+from metrics import INPUT_ACTIONS, INPUT_SECONDS, WAIT_TIME_SAVED
+from focus_tracker import FocusTracker, FOCUSED, LOST
+
+
+class InputScheduler:
+    """输入调度器类（线程安全，进程内共用一个，见 get_input_scheduler）"""
+    
+    def __init__(self, min_gaps=None, focus_ttl=None, clock=None, focus_tracker=None):
+        """clock为单调时钟函数（模拟环境传入虚拟时钟），focus_tracker为焦点状态跟踪器（模拟环境传入模拟的前台窗口查询）"""
+        self.min_gaps = dict(CrawlerConfig.INPUT_MIN_GAPS, **(min_gaps or {}))
+        self.focus_ttl = CrawlerConfig.INPUT_FOCUS_TTL if focus_ttl is None else focus_ttl
+        self.clock = clock or time.monotonic
+        self.focus_tracker = focus_tracker or FocusTracker()
+        self._lock = threading.RLock()
+        self._last_action = None     # (操作类型, 完成时间)
+        self._focused_at = None      # 最近一次点击（窗口获得焦点）的时间
+        self._pending_focus = None   # 挂起的聚焦点击坐标
+        self._avoided_focus_at = None  # 上一次操作之后最早省掉聚焦点击的时间
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.stats = {'actions': {}, 'focus_skipped': 0, 'focus_merged': 0, 'focus_seconds_saved': 0.0,
+                      'input_time': 0.0, 'gap_time': 0.0, 'settle_time': 0.0}
+        self.focus_tracker.reset_stats()
+    
+    # ---- 操作 ----
+    
+    def click(self, x, y):
+        """点击；挂起的聚焦点击被这次点击取代"""
+        with self._lock:
+            if self._pending_focus is not None:
+                self._pending_focus = None
+                self._focus_avoided('focus_merged')
+            self._perform('click', pyautogui.click, x, y)
+            self._focused_at = self.clock()
+    
+    def focus(self, x, y):
+        """聚焦点击，返回是否需要聚焦：
+        焦点仍在(x, y)所在的微信窗口时跳过；确认已丢失时立即点击（非活动窗口上的第一次点击可能只激活窗口，不能与后面的点击合并）；
+        无法查询时，INPUT_FOCUS_TTL 秒内点击过就跳过，否则挂起，下一次操作是点击时合并掉，是滚动、按键或拖动时先执行
+        """
+        with self._lock:
+            state = self.focus_tracker.check(x, y)
+            if state == FOCUSED:
+                self._pending_focus = None
+                self._focus_avoided('focus_skipped')
+                return False
+            if state == LOST:
+                self._pending_focus = (x, y)
+                self.flush()
+                return True
+            
+            if self._focused_at is not None and self.clock() - self._focused_at <= self.focus_ttl:
+                self._focus_avoided('focus_skipped')
+                return False
+            self._pending_focus = (x, y)
+            return True
+    
+    def scroll(self, clicks, x, y):
+        with self._lock:
+            self.flush()
+            self._perform('scroll', pyautogui.scroll, clicks, x=x, y=y)
+    
+    def press(self, key):
+        with self._lock:
+            self.flush()
+            self._perform('press', pyautogui.press, key)
+    
+    def drag(self, start_x, start_y, end_x, end_y, duration=0.5):
+        """从起点按住拖动到终点"""
+        def drag_to():
+            pyautogui.moveTo(start_x, start_y)
+            pyautogui.drag(end_x - start_x, end_y - start_y, duration=duration)
+        
+        with self._lock:
+            self.flush()
+            self._perform('drag', drag_to)
+    
+    def flush(self):
+        """立即执行挂起的聚焦点击"""
+        with self._lock:
+            if self._pending_focus is None:
+                return
+            x, y = self._pending_focus
+            self._pending_focus = None
+            self._perform('focus', pyautogui.click, x, y)
+            self._focused_at = self.clock()
+    
+    def wait(self, seconds):
+        """操作后等待界面响应（页面加载、滚动惯性），计入响应等待时间；下一次操作的最小间隔从中扣除"""
+        if seconds <= 0:
+            return
+        time.sleep(seconds)
+        with self._lock:
+            self.stats['settle_time'] += seconds
+        INPUT_SECONDS.inc(seconds, phase='settle')
+    
+    # ---- 内部 ----
+    
+    def _perform(self, action, operation, *args, **kwargs):
+        """补足与上一次操作的最小间隔后执行操作"""
+        gap = 0.0
+        if self._last_action is not None:
+            previous, finished_at = self._last_action
+            gap = max(0.0, self.min_gaps.get(previous, 0) - (self.clock() - finished_at))
+            if gap > 0:
+                time.sleep(gap)
+                self.stats['gap_time'] += gap
+                INPUT_SECONDS.inc(gap, phase='gap')
+        
+        if self._avoided_focus_at is not None:
+            # 执行了聚焦点击的话，这次操作要等到聚焦间隔结束；扣除已经过去的时间和本来就要等的间隔才是实际省下的
+            would_wait = self.min_gaps.get('focus', 0) - (self.clock() - gap - self._avoided_focus_at)
+            saved = max(0.0, would_wait - gap)
+            self._avoided_focus_at = None
+            self.stats['focus_seconds_saved'] += saved
+            WAIT_TIME_SAVED.inc(saved, reason='focus_avoided')
+        
+        started = time.perf_counter()
+        try:
+            operation(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            self._last_action = (action, self.clock())
+            self.stats['input_time'] += seconds
+            self.stats['actions'][action] = self.stats['actions'].get(action, 0) + 1
+            INPUT_SECONDS.inc(seconds, phase='input')
+            INPUT_ACTIONS.inc(action=action, result='executed')
+    
+    def _focus_avoided(self, kind):
+        """记录一次省掉的聚焦点击（kind: focus_skipped 焦点仍在 / focus_merged 与紧接着的点击合并）"""
+        self.stats[kind] += 1
+        INPUT_ACTIONS.inc(action='focus', result=kind[len('focus_'):])
+        if self._avoided_focus_at is None:
+            self._avoided_focus_at = self.clock()
+    
+    def get_summary(self):
+        """本次爬取的输入统计；省掉的秒数为下一次操作实际少等的聚焦间隔，并扣除查询焦点状态的耗时"""
+        with self._lock:
+            checks = dict(self.focus_tracker.stats)
+            clicks_saved = self.stats['focus_skipped'] + self.stats['focus_merged']
+            seconds_saved = self.stats['focus_seconds_saved'] - checks.pop('check_time')
+            return {
+                'actions': dict(self.stats['actions']),
+                'input_time': round(self.stats['input_time'], 3),
+                'gap_time': round(self.stats['gap_time'], 3),
+                'settle_time': round(self.stats['settle_time'], 3),
+                'focus': {
+                    'checks': checks,
+                    'clicks': self.stats['actions'].get('focus', 0),
+                    'skipped': self.stats['focus_skipped'],
+                    'merged': self.stats['focus_merged'],
+                    'clicks_saved': clicks_saved,
+                    'seconds_saved': round(seconds_saved, 3)
+                }
+            }
+    
+    def print_summary(self):
+        summary = self.get_summary()
+        focus = summary['focus']
+        actions = "，".join(f"{action} {count}" for action, count in summary['actions'].items())
+        print(f"⌨️ 输入调度: {actions or '无操作'}，执行 {summary['input_time']:.1f}s，"
+              f"间隔等待 {summary['gap_time']:.1f}s，响应等待 {summary['settle_time']:.1f}s")
+        print(f"🎯 焦点: 聚焦点击 {focus['clicks']} 次，省掉 {focus['clicks_saved']} 次（焦点仍在 {focus['skipped']}，"
+              f"与点击合并 {focus['merged']}），节省 {focus['seconds_saved']:.1f}s；"
+              f"前台查询 {focus['checks']['focused']}/{focus['checks']['lost']}/{focus['checks']['unknown']}（有焦点/已丢失/未知）")
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_input_scheduler():
+    """获取进程内共用的输入调度器（首次调用时创建）"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = InputScheduler()
+        return _scheduler
+
+
+def set_input_scheduler(scheduler):
+    """替换进程内共用的输入调度器（模拟环境使用虚拟时钟）；传入None时下次使用重新创建"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
\ No newline at end of file
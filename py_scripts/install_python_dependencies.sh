@@ -34,6 +34,11 @@ echo ""
 echo "🤖 安装自动化依赖..."
 python3 -m pip install pyautogui
 
+# 安装高速截图依赖（可选，未安装时回退到PIL.ImageGrab）
+echo ""
+echo "📷 安装高速截图依赖..."
+python3 -m pip install mss
+
 # 安装Mac系统集成依赖
 echo ""
 echo "🍎 安装Mac系统集成依赖..."
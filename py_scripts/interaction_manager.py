@@ -5,15 +5,15 @@
 负责小程序内的点击、返回等交互操作
 """
 
-import time
-import pyautogui
 from config import CrawlerConfig
+from input_scheduler import get_input_scheduler
 
 class InteractionManager:
     """交互管理器"""
     
     def __init__(self, window_manager):
         self.window_manager = window_manager
+        self.input = get_input_scheduler()
     
     def click_in_mini_program(self, relative_x, relative_y):
         """在小程序区域内点击指定相对坐标"""
@@ -30,8 +30,8 @@ class InteractionManager:
         if (0 <= relative_x <= bounds['width'] and 
             0 <= relative_y <= bounds['height']):
             try:
-                pyautogui.click(abs_x, abs_y)
-                time.sleep(CrawlerConfig.CLICK_DELAY)
+                self.input.click(abs_x, abs_y)
+                self.input.wait(CrawlerConfig.CLICK_DELAY)
                 print(f"👆 在小程序内点击: 相对坐标({relative_x}, {relative_y}) -> 绝对坐标({abs_x}, {abs_y})")
                 return True
             except Exception as e:
@@ -51,7 +51,7 @@ class InteractionManager:
             # 使用小程序专用点击方法
             success = self.click_in_mini_program(x, y)
             if success:
-                time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
+                self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
                 return True
             else:
                 print(f"❌ 按钮点击失败: {button_info['text']}")
@@ -69,7 +69,7 @@ class InteractionManager:
         for pos in CrawlerConfig.BACK_BUTTON_POSITIONS:
             print(f"🔙 尝试点击返回按钮位置: {pos}")
             if self.click_in_mini_program(pos[0], pos[1]):
-                time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
+                self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
                 return True
         
         # 方法2: 使用手势滑动返回（从左边缘向右滑动）
@@ -96,8 +96,8 @@ class InteractionManager:
             end_y = start_y
             
             print(f"👈 尝试手势滑动返回: ({start_x}, {start_y}) -> ({end_x}, {end_y})")
-            pyautogui.drag(start_x, start_y, end_x, end_y, duration=0.5)
-            time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
+            self.input.drag(start_x, start_y, end_x, end_y, duration=0.5)
+            self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
             return True
             
         except Exception as e:
@@ -108,8 +108,8 @@ class InteractionManager:
         """尝试使用ESC键返回"""
         try:
             print("⌨️ 尝试使用ESC键返回")
-            pyautogui.press('escape')
-            time.sleep(CrawlerConfig.CLICK_DELAY)
+            self.input.press('escape')
+            self.input.wait(CrawlerConfig.CLICK_DELAY)
             return True
         except Exception as e:
             print(f"❌ ESC键返回失败: {e}")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+包的按需导入
+各包的 __init__ 只声明导出名 -> 子模块的映射，第一次访问某个名字时才导入对应子模块（PEP 562）
+"""
+
+import importlib
+
+
+def lazy_exports(package, namespace, lazy_imports):
+    """返回包模块的 __getattr__ 和 __dir__
+    
+    package: 包名（__name__）；namespace: 包的 globals()，导入过的名字缓存在其中；
+    lazy_imports: 导出名 -> 相对子模块名（如 '.core'）
+    """
+    def __getattr__(name):
+        module_name = lazy_imports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        namespace[name] = value
+        return value
+    
+    def __dir__():
+        return sorted(set(namespace) | set(lazy_imports))
+    
+    return __getattr__, __dir__
\ No newline at end of file
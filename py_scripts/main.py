@@ -5,6 +5,8 @@
 直接对当前已打开的小程序进行截图和按钮点击操作
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 import warnings
@@ -16,57 +18,36 @@ os.environ['TORCH_DEVICE'] = 'cpu'
 # 过滤PyTorch相关警告
 warnings.filterwarnings('ignore', category=UserWarning, module='torch')
 
-import pyautogui
-from smart_crawler import CrawlerCore
+# pyautogui和爬虫组件（OpenCV、EasyOCR/torch）在真正需要时才导入，保证启动和依赖检查足够快
 from config import CrawlerConfig
 from app_config import get_app_name_from_config, get_preset_apps, is_verbose_logging
 
+# (模块名, pip包名, 说明)
+REQUIRED_DEPENDENCIES = [
+    ('pyautogui', 'pyautogui', '自动化操作库'),
+    ('cv2', 'opencv-python', '图像处理库'),
+    ('PIL', 'pillow', '图像处理库'),
+    ('skimage', 'scikit-image', '图像分析库'),
+    ('AppKit', 'pyobjc-framework-Cocoa', 'Mac系统集成'),
+    ('pygetwindow', 'pygetwindow', '系统窗口检测')
+]
+
 def check_dependencies():
-    """检查依赖库是否正确安装"""
+    """检查依赖库是否正确安装（只查找模块，不实际导入，避免拖慢启动）"""
     print("🔍 正在检查依赖库...")
     missing_deps = []
     
-    try:
-        import pyautogui
-        print("✅ pyautogui - 自动化操作库")
-    except ImportError:
-        missing_deps.append("pyautogui")
-        print("❌ pyautogui - 自动化操作库")
-    
-    try:
-        import cv2
-        print("✅ opencv-python - 图像处理库")
-    except ImportError:
-        missing_deps.append("opencv-python")
-        print("❌ opencv-python - 图像处理库")
-    
-    try:
-        from PIL import Image
-        print("✅ pillow - 图像处理库")
-    except ImportError:
-        missing_deps.append("pillow")
-        print("❌ pillow - 图像处理库")
-    
-    try:
-        from skimage.metrics import structural_similarity
-        print("✅ scikit-image - 图像分析库")
-    except ImportError:
-        missing_deps.append("scikit-image")
-        print("❌ scikit-image - 图像分析库")
-    
-    try:
-        from AppKit import NSWorkspace
-        print("✅ pyobjc-framework-Cocoa - Mac系统集成")
-    except ImportError:
-        missing_deps.append("pyobjc-framework-Cocoa")
-        print("❌ pyobjc-framework-Cocoa - Mac系统集成")
-    
-    try:
-        import pygetwindow as gw
-        print("✅ pygetwindow - 系统窗口检测")
-    except ImportError:
-        missing_deps.append("pygetwindow")
-        print("❌ pygetwindow - 系统窗口检测")
+    for module_name, package_name, description in REQUIRED_DEPENDENCIES:
+        try:
+            found = importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            found = False
+        
+        if found:
+            print(f"✅ {package_name} - {description}")
+        else:
+            missing_deps.append(package_name)
+            print(f"❌ {package_name} - {description}")
     
     if missing_deps:
         print(f"\n❌ 缺少 {len(missing_deps)} 个依赖库")
@@ -79,9 +60,11 @@ def check_dependencies():
 
 def setup_pyautogui():
     """设置PyAutoGUI配置"""
+    import pyautogui
+    
     pyautogui.FAILSAFE = CrawlerConfig.PYAUTOGUI_FAILSAFE
     pyautogui.PAUSE = CrawlerConfig.PYAUTOGUI_PAUSE
-    print(f"⚙️ PyAutoGUI配置完成 (PAUSE={CrawlerConfig.PYAUTOGUI_PAUSE}s)")
+    print(f"⚙️ PyAutoGUI配置完成 (PAUSE={CrawlerConfig.PYAUTOGUI_PAUSE}s，操作间隔由输入调度器控制)")
 
 def show_preset_options():
     """显示预设选项"""
@@ -170,8 +153,97 @@ def get_app_name():
     
     return default_name
 
+def parse_args(argv=None):
+    """解析命令行参数（不带参数时为交互模式）"""
+    parser = argparse.ArgumentParser(description="微信小程序自动化爬虫")
+    parser.add_argument('--apps', nargs='+', help="批量模式：依次爬取的小程序名称（不再交互输入）")
+    parser.add_argument('--job-file', help="批量模式：任务文件（.txt每行一个名称，或.json）")
+    parser.add_argument('--output-dir', help="批量模式结果根目录（默认 crawl_results/batch_<时间>）")
+    parser.add_argument('--switch-delay', type=float, default=0, help="批量模式：两个应用之间等待的秒数（--workers 时为每个工作进程内两个应用之间）")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="批量模式：并发爬虫进程数，大于1时先加载OCR模型再fork工作进程共享模型内存")
+    parser.add_argument('--max-depth', type=int, default=CrawlerConfig.CRAWL_MAX_DEPTH,
+                        help="最大页面深度（1为只爬主页按钮直达的页面，更大时广度优先探测内页中的可点击目标）")
+    parser.add_argument('--max-pages', type=int, default=CrawlerConfig.CRAWL_MAX_PAGES, help="每个小程序最多爬取的页面数")
+    parser.add_argument('--delta', action='store_true',
+                        help="增量爬取：首屏与上次完成的运行一致的页面复用上次的截图和分析结果，只完整爬取变化的页面")
+    parser.add_argument('--daemon', action='store_true', help="常驻服务模式：通过本地HTTP接口接收爬取任务")
+    parser.add_argument('--host', default=CrawlerConfig.DAEMON_HOST, help="常驻服务监听地址")
+    parser.add_argument('--port', type=int, default=CrawlerConfig.DAEMON_PORT, help="常驻服务监听端口")
+    parser.add_argument('--search', metavar='TEXT', help="在结果数据库中搜索文字（空格分隔的多个词需同时出现），不进行爬取")
+    parser.add_argument('--search-app', help="搜索：只搜索指定小程序")
+    parser.add_argument('--search-run', type=int, help="搜索：只搜索指定运行ID")
+    parser.add_argument('--latest', action='store_true', help="搜索：每个小程序只搜索最近一次运行")
+    parser.add_argument('--limit', type=int, default=20, help="搜索：最多显示的结果数")
+    parser.add_argument('--dump-frames', metavar='DIR', help="把原始帧环形缓冲区中的帧导出为PNG到指定目录，不进行爬取")
+    parser.add_argument('--dump-last', type=float, metavar='SECONDS', help="导出：只导出最新一帧之前这么多秒内的帧")
+    parser.add_argument('--dump-seq', type=int, nargs=2, metavar=('FIRST', 'LAST'), help="导出：只导出帧序号范围内的帧")
+    parser.add_argument('--frame-ring', default=CrawlerConfig.FRAME_RING_FILE, help="导出：原始帧环形缓冲区文件")
+    return parser.parse_args(argv)
+
+def run_search(args):
+    """搜索模式：在结果数据库中按相关度列出包含指定文字的页面和截图"""
+    from results_store import ResultsStore
+    
+    if not os.path.exists(CrawlerConfig.RESULTS_DB_FILE):
+        print(f"❌ 结果数据库不存在: {CrawlerConfig.RESULTS_DB_FILE}")
+        return False
+    
+    hits = ResultsStore().search(args.search, app_name=args.search_app, run_id=args.search_run,
+                                 latest_only=args.latest, limit=args.limit)
+    print(f"🔍 \"{args.search}\" 共 {len(hits)} 条结果")
+    for hit in hits:
+        page = "→".join(hit['page_path']) if hit['page_path'] else hit['page_name']
+        print(f"  [{hit['score']:.2f}] {hit['app_name']} / 运行#{hit['run_id']} ({hit['run_started_at'][:19]}) / {page}")
+        print(f"      {hit['source']}: {hit['text']}  框: {hit['bbox']}")
+        if hit['screenshot']:
+            print(f"      截图: {hit['screenshot']}")
+    return True
+
+def run_dump_frames(args):
+    """导出模式：把原始帧环形缓冲区中的一段帧导出为PNG（可在爬虫运行时或崩溃后执行）"""
+    from screenshot_manager.frame_ring import dump_frames
+    
+    if not os.path.exists(args.frame_ring):
+        print(f"❌ 原始帧环形缓冲区不存在: {args.frame_ring}")
+        return False
+    
+    count = dump_frames(args.frame_ring, args.dump_frames, last_seconds=args.dump_last, seq_range=args.dump_seq)
+    print(f"🎞️ 已导出 {count} 帧到 {args.dump_frames}（索引见 frames.json）")
+    return count > 0
+
+def run_batch(args):
+    """批量模式：一个进程内依次爬取多个小程序，返回是否全部成功"""
+    from crawler_core import BatchCrawler
+    
+    jobs = list(args.apps or [])
+    if args.job_file:
+        jobs.extend(BatchCrawler.load_jobs(args.job_file))
+    if not jobs:
+        print("❌ 批量模式没有任何待爬取的小程序")
+        return False
+    
+    if args.workers > 1:
+        from crawler_core import ForkLauncher
+        report = ForkLauncher(args.workers).run(jobs, output_root=args.output_dir, switch_delay=args.switch_delay)
+        return all(worker['succeeded'] == worker['apps'] for worker in report['workers'])
+    
+    summary = BatchCrawler().run(jobs, output_root=args.output_dir, switch_delay=args.switch_delay)
+    return summary['succeeded'] == summary['total_apps']
+
 def main():
     """主函数"""
+    args = parse_args()
+    CrawlerConfig.CRAWL_MAX_DEPTH = max(1, args.max_depth)
+    CrawlerConfig.CRAWL_MAX_PAGES = args.max_pages
+    CrawlerConfig.DELTA_CRAWL = CrawlerConfig.DELTA_CRAWL or args.delta
+    
+    # 搜索模式：只查询结果数据库，不需要截图和界面自动化依赖
+    if args.search:
+        sys.exit(0 if run_search(args) else 1)
+    if args.dump_frames:
+        sys.exit(0 if run_dump_frames(args) else 1)
+    
     print("🤖 微信小程序自动化爬虫 v2.1 (模块化版本)")
     print("=" * 55)
     print("🎯 直接对当前已打开的小程序进行截图和按钮点击")
@@ -188,6 +260,16 @@ def main():
     # 设置PyAutoGUI
     setup_pyautogui()
     
+    # 常驻服务模式：预热后等待任务
+    if args.daemon:
+        from crawler_core import CrawlerDaemon
+        CrawlerDaemon(host=args.host, port=args.port).serve_forever()
+        return
+    
+    # 批量模式：不交互，直接依次爬取
+    if args.apps or args.job_file:
+        sys.exit(0 if run_batch(args) else 1)
+    
     # 使用说明
     print("\n📋 使用说明:")
     print("1. 请确保微信小程序已经打开并显示在屏幕上")
@@ -212,6 +294,7 @@ def main():
     
     # 创建爬虫实例并开始爬取
     try:
+        from smart_crawler import CrawlerCore
         crawler = CrawlerCore()
         success = crawler.start_crawling(app_name)
         
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行指标
+计数器/仪表/直方图注册表，通过本地HTTP端点以Prometheus文本格式暴露，并定期写出JSON快照
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import CrawlerConfig
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + (list(extra) if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metric:
+    """指标基类，按标签组合保存多条序列"""
+    
+    type_name = 'untyped'
+    
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def render(self):
+        """Prometheus文本格式"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, value in sorted(self._series.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+    
+    def snapshot(self):
+        with self._lock:
+            return [{'labels': dict(key), 'value': value} for key, value in sorted(self._series.items())]
+
+
+class Counter(Metric):
+    """只增计数器"""
+    
+    type_name = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """可任意设置的仪表"""
+    
+    type_name = 'gauge'
+    
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[_label_key(labels)] = value
+    
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """分桶直方图"""
+    
+    type_name = 'histogram'
+    
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+    
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {round(series['sum'], 6)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+    
+    def snapshot(self):
+        with self._lock:
+            return [
+                {
+                    'labels': dict(key),
+                    'count': series['count'],
+                    'sum': round(series['sum'], 6),
+                    'buckets': dict(zip([str(bound) for bound in self.buckets], series['counts']))
+                }
+                for key, series in sorted(self._series.items())
+            ]
+
+
+class MetricsRegistry:
+    """指标注册表"""
+    
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._snapshot_thread = None
+        self._snapshot_stop = threading.Event()
+    
+    def _register(self, metric):
+        with self._lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+    
+    def gauge(self, name, help_text):
+        return self._register(Gauge(name, help_text))
+    
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, buckets))
+    
+    def render_prometheus(self):
+        """渲染全部指标（Prometheus文本格式 0.0.4）"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self):
+        """全部指标的JSON快照"""
+        return {
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+            'metrics': {
+                name: {'type': metric.type_name, 'help': metric.help_text, 'series': metric.snapshot()}
+                for name, metric in list(self.metrics.items())
+            }
+        }
+    
+    def write_snapshot(self, filepath=None):
+        """原子写出JSON快照（先写临时文件再替换，读取方不会读到半个文件）"""
+        filepath = filepath or CrawlerConfig.METRICS_SNAPSHOT_FILE
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        temp_path = f"{filepath}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, filepath)
+        return filepath
+    
+    # ---- 导出 ----
+    
+    def start_exporters(self):
+        """启动HTTP端点和定期快照线程（重复调用无副作用）"""
+        if not CrawlerConfig.METRICS_ENABLED:
+            return
+        if self._server is None and CrawlerConfig.METRICS_HTTP_PORT:
+            self._start_http_server(CrawlerConfig.METRICS_HTTP_HOST, CrawlerConfig.METRICS_HTTP_PORT)
+        if self._snapshot_thread is None and CrawlerConfig.METRICS_SNAPSHOT_INTERVAL:
+            self._snapshot_stop.clear()
+            self._snapshot_thread = threading.Thread(target=self._snapshot_loop, name="metrics-snapshot", daemon=True)
+            self._snapshot_thread.start()
+    
+    def stop_exporters(self):
+        """停止HTTP端点和快照线程，并写出最后一次快照"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._snapshot_thread is not None:
+            self._snapshot_stop.set()
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+            self.flush_snapshot()
+    
+    def _start_http_server(self, host, port):
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] == '/metrics':
+                    body = registry.render_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path.split('?')[0] == '/metrics.json':
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        try:
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"⚠️ 指标HTTP端点启动失败 ({host}:{port}): {e}")
+            return
+        
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"📈 指标端点: http://{host}:{self._server.server_address[1]}/metrics")
+    
+    def _snapshot_loop(self):
+        # 用Event.wait计时，不受time.sleep替换的影响
+        while not self._snapshot_stop.wait(CrawlerConfig.METRICS_SNAPSHOT_INTERVAL):
+            self.flush_snapshot()
+    
+    def flush_snapshot(self):
+        """写出快照，失败只打印警告"""
+        try:
+            self.write_snapshot()
+        except Exception as e:
+            print(f"⚠️ 写出指标快照失败: {e}")
+
+
+# 进程内共享的指标注册表
+metrics = MetricsRegistry()
+
+FRAMES_CAPTURED = metrics.counter('crawler_frames_captured_total', "已抓取的屏幕帧数")
+OCR_LATENCY = metrics.histogram('crawler_ocr_latency_seconds', "单次OCR调用耗时（秒）")
+ANALYSIS_LATENCY = metrics.histogram('crawler_analysis_latency_seconds', "截图分析请求耗时（秒）")
+QUEUE_DEPTH = metrics.gauge('crawler_queue_depth', "工作队列中等待处理的条目数")
+WAIT_TIME_SAVED = metrics.counter('crawler_wait_time_saved_seconds_total', "UI线程实际少等的时间（秒）：后台处理耗时扣除UI线程等待后台的时间、被省掉的聚焦间隔扣除实际等待的间隔")
+RETRIES = metrics.counter('crawler_retries_total', "重试的界面操作次数")
+PAGES_CRAWLED = metrics.counter('crawler_pages_crawled_total', "已爬取的内页数")
+PAGE_FAILURES = metrics.counter('crawler_page_failures_total', "爬取失败的按钮页面数")
+DUPLICATE_FRAMES = metrics.counter('crawler_duplicate_frames_total', "与已保存截图近乎相同的截图数")
+BLOB_WRITES = metrics.counter('crawler_blob_writes_total', "截图内容寻址存储的写入次数（新画面写盘或与已有画面去重）")
+BLOB_BYTES_WRITTEN = metrics.counter('crawler_blob_bytes_written_total', "截图内容寻址存储实际写盘的字节数")
+DELTA_PAGES = metrics.counter('crawler_delta_pages_total', "增量爬取中按首屏指纹比较结果分类的页面数")
+INPUT_ACTIONS = metrics.counter('crawler_input_actions_total', "输入调度器处理的鼠标键盘操作数（执行或被合并）")
+INPUT_SECONDS = metrics.counter('crawler_input_seconds_total', "输入调度器中执行操作、补足操作间隔和等待界面响应的时间（秒）")
+FOCUS_CHECKS = metrics.counter('crawler_focus_checks_total', "聚焦前查询前台窗口的次数（按有焦点/已丢失/未知分类）")
+LAST_PROGRESS = metrics.gauge('crawler_last_progress_timestamp_seconds', "最近一次完成页面或截图的Unix时间，用于发现卡顿")
\ No newline at end of file
@@ -5,7 +5,19 @@ OCR管理器模块
 负责图像文字识别和按钮文案匹配
 """
 
-from .text_detector import TextDetector
-from .button_matcher import ButtonMatcher
+from lazy_imports import lazy_exports
 
-__all__ = ['TextDetector', 'ButtonMatcher'] 
\ No newline at end of file
+_LAZY_IMPORTS = {
+    'TextDetector': '.text_detector',
+    'ButtonMatcher': '.button_matcher',
+    'TiledTextDetector': '.tiled_detector',
+    'ScrollTextExtractor': '.scroll_text_extractor',
+    'OCRWorkerPool': '.ocr_pool',
+    'get_ocr_pool': '.ocr_pool'
+}
+
+# 按需导入子模块，EasyOCR（以及torch）推迟到真正使用OCR时才加载
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS)
+
+
+__all__ = ['TextDetector', 'ButtonMatcher', 'TiledTextDetector', 'ScrollTextExtractor', 'OCRWorkerPool', 'get_ocr_pool'] 
\ No newline at end of file
@@ -7,6 +7,7 @@
 
 import re
 from difflib import SequenceMatcher
+from config import CrawlerConfig
 
 
 class ButtonMatcher:
@@ -109,6 +110,33 @@ class ButtonMatcher:
         
         return unmatched
     
+    def find_click_targets(self, text_items, min_y=0, exclude=()):
+        """从内页文字中找出可能可点击的短文字标签（深度爬取时逐个探测）"""
+        seen = {self._clean_text(text) for text in exclude}
+        targets = []
+        
+        # 按从上到下、从左到右的顺序
+        for item in sorted(text_items, key=lambda item: (item['center'][1], item['center'][0])):
+            text = self._clean_text(item['text'])
+            if item['center'][1] < min_y or text in seen:
+                continue
+            if not 2 <= len(text) <= CrawlerConfig.FRONTIER_MAX_TARGET_TEXT:
+                continue
+            if any(word in text for word in CrawlerConfig.FRONTIER_SKIP_TEXTS):
+                continue
+            
+            seen.add(text)
+            targets.append({
+                'target': text,
+                'matched_text': item['text'],
+                'center': item['center'],
+                'confidence': item['confidence'],
+                'similarity': 1.0,
+                'bbox': item['bbox']
+            })
+        
+        return targets[:CrawlerConfig.FRONTIER_MAX_TARGETS_PER_PAGE]
+    
     def validate_button_position(self, button, bounds):
         """验证按钮位置是否在有效范围内"""
         center_x, center_y = button['center']
@@ -140,4 +168,4 @@ class ButtonMatcher:
         absolute_x = bounds['x'] + center_x
         absolute_y = bounds['y'] + center_y
         
-        return (absolute_x, absolute_y) 
\ No newline at end of file
+        return (absolute_x, absolute_y)
\ No newline at end of file
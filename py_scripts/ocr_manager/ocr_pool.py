@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR进程池
+每个工作进程只加载一次EasyOCR读取器；图像通过 multiprocessing.shared_memory 传递，
+只有共享内存名称和形状经过进程间管道，像素数据不做pickle
+"""
+
+import atexit
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from config import CrawlerConfig
+from .ocr_profile import load_ocr_profile, apply_thread_count, readtext
+
+# 工作进程内的EasyOCR读取器和运行配置（每个进程初始化一次）
+_worker_reader = None
+_worker_profile = None
+
+
+def _init_worker(languages, gpu):
+    """工作进程初始化：加载EasyOCR读取器和本机OCR运行配置"""
+    global _worker_reader, _worker_profile
+    import easyocr
+    _worker_reader = easyocr.Reader(languages, gpu=gpu, verbose=False)
+    _worker_profile = load_ocr_profile()
+    apply_thread_count(_worker_profile['threads'])
+
+
+def _recognize_shared(name, shape, dtype, scale=1.0):
+    """工作进程：从共享内存读取图像，按scale缩放后识别，返回(结果, 推理秒数)"""
+    # 共享内存由主进程创建和释放，工作进程只映射和关闭，不做unlink
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        image = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        started = time.perf_counter()
+        results = readtext(_worker_reader, image, scale, _worker_profile['batch_size'])
+        elapsed = time.perf_counter() - started
+        del image
+    finally:
+        segment.close()
+    
+    # 转为纯Python类型，避免把numpy对象传回主进程
+    return [
+        ([[float(x), float(y)] for x, y in bbox], text, float(confidence))
+        for bbox, text, confidence in results
+    ], elapsed
+
+
+def _warm_up_worker():
+    """工作进程：触发读取器初始化并跑一次推理"""
+    _worker_reader.readtext(np.full((32, 96, 3), 255, dtype=np.uint8))
+    return multiprocessing.current_process().pid
+
+
+class OCRWorkerPool:
+    """OCR工作进程池"""
+    
+    def __init__(self, processes, languages=('ch_sim', 'en'), gpu=False, start_method=None):
+        context = multiprocessing.get_context(start_method) if start_method else None
+        # 工作进程映射共享内存时也会登记到资源跟踪器；先启动主进程的跟踪器，fork出的工作进程与主进程共用
+        # （否则各自启动跟踪器，退出时清理已被主进程释放的共享内存并告警），登记随主进程unlink一并注销
+        resource_tracker.ensure_running()
+        self.processes = processes
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(list(languages), gpu)
+        )
+        self.submitted = 0
+        atexit.register(self.shutdown)
+    
+    def submit(self, image, scale=1.0):
+        """提交一张BGR图像（识别前按scale缩放），返回Future，结果为(EasyOCR原始结果, 推理秒数)"""
+        image = np.ascontiguousarray(image)
+        segment = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+        try:
+            np.ndarray(image.shape, dtype=image.dtype, buffer=segment.buf)[...] = image
+            future = self.executor.submit(_recognize_shared, segment.name, image.shape, image.dtype.str, scale)
+        except Exception:
+            self._release(segment)
+            raise
+        
+        # 识别完成（或失败）后再释放共享内存
+        future.add_done_callback(lambda _: self._release(segment))
+        self.submitted += 1
+        return future
+    
+    @staticmethod
+    def _release(segment):
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def warm_up(self):
+        """让每个工作进程都完成读取器加载和首次推理，返回工作进程PID列表"""
+        futures = [self.executor.submit(_warm_up_worker) for _ in range(self.processes)]
+        return sorted({future.result() for future in futures})
+    
+    def shutdown(self, wait=True):
+        """关闭工作进程"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
+
+
+_default_pool = None
+
+
+def get_ocr_pool():
+    """获取进程内共享的OCR进程池（OCR_WORKER_PROCESSES为0时返回None）"""
+    global _default_pool
+    if _default_pool is None and CrawlerConfig.OCR_WORKER_PROCESSES > 0:
+        _default_pool = OCRWorkerPool(
+            CrawlerConfig.OCR_WORKER_PROCESSES,
+            start_method=CrawlerConfig.OCR_WORKER_START_METHOD
+        )
+    return _default_pool
\ No newline at end of file
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR运行配置
+由 benchmarks/ocr_benchmark.py 在本机实测后写出（推理线程数、输入缩放比例、识别批大小），
+TextDetector和OCR工作进程启动时读取
+"""
+
+import json
+import os
+import cv2
+from config import CrawlerConfig
+
+DEFAULT_PROFILE = {
+    'threads': None,      # torch推理线程数（None 为torch默认）
+    'scale': 1.0,         # 整帧识别前把图像缩放到的比例（局部区域和条带不缩放）
+    'batch_size': 1       # EasyOCR识别阶段的批大小
+}
+
+
+def load_ocr_profile(filepath=None):
+    """读取OCR运行配置，文件不存在或损坏时返回默认值"""
+    filepath = filepath or CrawlerConfig.OCR_PROFILE_FILE
+    profile = dict(DEFAULT_PROFILE)
+    if not filepath or not os.path.exists(filepath):
+        return profile
+    
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        profile.update({key: saved[key] for key in DEFAULT_PROFILE if key in saved})
+    except (OSError, ValueError) as e:
+        print(f"⚠️ OCR运行配置读取失败，使用默认值: {e}")
+    return profile
+
+
+def save_ocr_profile(profile, filepath=None, **extra):
+    """写出OCR运行配置，extra（实测吞吐量、召回率等）一并保存供查看"""
+    filepath = filepath or CrawlerConfig.OCR_PROFILE_FILE
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    data = {key: profile.get(key, DEFAULT_PROFILE[key]) for key in DEFAULT_PROFILE}
+    data.update(extra)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return filepath
+
+
+def apply_thread_count(threads):
+    """设置torch推理线程数（已由EasyOCR导入torch时才生效）"""
+    if not threads:
+        return False
+    try:
+        import torch
+        torch.set_num_threads(int(threads))
+        return True
+    except ImportError:
+        return False
+
+
+def readtext(reader, image, scale=1.0, batch_size=1):
+    """按配置缩放后识别，识别框坐标换算回原图"""
+    if scale and scale != 1.0:
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        results = reader.readtext(small, batch_size=batch_size)
+        return [
+            ([[x / scale, y / scale] for x, y in bbox], text, confidence)
+            for bbox, text, confidence in results
+        ]
+    return reader.readtext(image, batch_size=batch_size)
\ No newline at end of file
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动增量文字提取器
+滚动截图时根据实测滚动偏移只识别新露出的底部条带，并换算为整页坐标去重
+"""
+
+from collections import deque
+from config import CrawlerConfig
+from screenshot_manager.scroll_tracker import ScrollTracker
+
+
+class ScrollTextExtractor:
+    """滚动增量文字提取器类"""
+    
+    def __init__(self, text_detector, tracker=None):
+        """初始化滚动文字提取器"""
+        self.text_detector = text_detector
+        self.tracker = tracker or ScrollTracker()
+        self.overlap = CrawlerConfig.SCROLL_OCR_OVERLAP
+        self.dedupe_tolerance = CrawlerConfig.SCROLL_OCR_DEDUPE_TOLERANCE
+        self.start_page()
+    
+    def start_page(self, page_name=None):
+        """开始新页面，清空已识别的文字"""
+        self.page_name = page_name
+        self.previous_frame = None
+        self.page_top = 0        # 当前帧顶部在整页中的纵坐标
+        self.expected_offset = None  # 本页上一次实测的滚动偏移，内容平坦无法区分偏移时按此判断
+        self.frame_index = 0
+        self.page_items = []
+        self.pending = deque()   # 已提交、尚未合并的条带识别 (future, 帧序号, 帧顶部整页坐标, 识别行数, 帧高)
+        self.seen_text = {}      # 清理后的文字 -> 已出现的整页纵坐标列表
+        self.stats = {'frames': 0, 'total_rows': 0, 'ocr_rows': 0, 'unmatched_frames': 0}
+    
+    def add_frame(self, frame):
+        """加入一帧滚动截图（BGR）并提交新露出条带的识别
+        
+        识别可能在OCR进程池中异步进行，返回值为已按顺序合并完成的帧中新增的文字
+        """
+        height, width = frame.shape[:2]
+        header = min(self.tracker.fixed_header, height)
+        
+        if self.previous_frame is None:
+            strip_top = 0
+        else:
+            offset = self.tracker.estimate_offset(self.previous_frame, frame, expected=self.expected_offset)
+            if offset is None:
+                # 无法匹配时按整屏滚动处理，整帧重新识别，依靠文字去重避免重复
+                self.stats['unmatched_frames'] += 1
+                self.page_top += height - header
+                strip_top = header
+            elif offset == 0:
+                self._finish_frame(frame, height, 0)
+                return self._collect()
+            else:
+                self.expected_offset = offset
+                self.page_top += offset
+                strip_top = max(header, height - offset - self.overlap)
+        
+        future = self.text_detector.submit(frame, roi=(0, strip_top, width, height - strip_top))
+        self.pending.append((future, self.frame_index, self.page_top, header, height - strip_top, height))
+        
+        self._finish_frame(frame, height, height - strip_top)
+        return self._collect()
+    
+    def flush(self):
+        """等待所有已提交的条带识别完成并合并，返回新增的文字"""
+        return self._collect(wait=True)
+    
+    def _collect(self, wait=False):
+        """按提交顺序合并已完成的识别结果，保证去重结果与逐帧串行识别一致"""
+        new_items = []
+        while self.pending and (wait or self.pending[0][0].done()):
+            future, frame_index, page_top, header, ocr_rows, height = self.pending.popleft()
+            try:
+                text_items = future.result()
+            except Exception as e:
+                print(f"⚠️ 第 {frame_index + 1} 帧文字识别失败: {e}")
+                text_items = []
+            
+            frame_items = []
+            for item in text_items:
+                # 固定导航栏只在第一帧中识别
+                if frame_index > 0 and item['center'][1] < header:
+                    continue
+                
+                page_item = self._to_page_item(item, frame_index, page_top)
+                if self._is_duplicate(page_item):
+                    continue
+                
+                self._remember(page_item)
+                frame_items.append(page_item)
+            
+            print(f"📝 第 {frame_index + 1} 帧识别 {ocr_rows}/{height} 行，新增 {len(frame_items)} 条文字")
+            new_items.extend(frame_items)
+        return new_items
+    
+    def get_page_text(self):
+        """获取整页去重后的文字（可JSON序列化）"""
+        self.flush()
+        return [
+            {
+                'text': item['text'],
+                'confidence': round(float(item['confidence']), 3),
+                'page_center': [int(v) for v in item['page_center']],
+                'page_bbox': [[int(x), int(y)] for x, y in item['page_bbox']],
+                'frame_index': item['frame_index']
+            }
+            for item in self.page_items
+        ]
+    
+    def get_stats(self):
+        """获取识别行数统计"""
+        stats = dict(self.stats)
+        total = stats['total_rows']
+        stats['ocr_row_ratio'] = round(stats['ocr_rows'] / total, 3) if total else 0
+        stats['page_height'] = self.page_top + (self.previous_frame.shape[0] if self.previous_frame is not None else 0)
+        return stats
+    
+    def _finish_frame(self, frame, height, ocr_rows):
+        """记录本帧统计并保存为下一帧的参考"""
+        self.previous_frame = frame
+        self.frame_index += 1
+        self.stats['frames'] += 1
+        self.stats['total_rows'] += height
+        self.stats['ocr_rows'] += ocr_rows
+    
+    def _to_page_item(self, item, frame_index, page_top):
+        """把帧内坐标换算为整页坐标"""
+        page_item = dict(item)
+        page_item['page_center'] = (item['center'][0], item['center'][1] + page_top)
+        page_item['page_bbox'] = [[x, y + page_top] for x, y in item['bbox']]
+        page_item['frame_index'] = frame_index
+        return page_item
+    
+    def _is_duplicate(self, page_item):
+        """同一文字在整页坐标中位置相近即视为重复（来自重叠区域）"""
+        key = self.text_detector.clean_text(page_item['text'])
+        page_y = page_item['page_center'][1]
+        return any(abs(page_y - seen_y) <= self.dedupe_tolerance for seen_y in self.seen_text.get(key, []))
+    
+    def _remember(self, page_item):
+        """记录已识别的文字"""
+        key = self.text_detector.clean_text(page_item['text'])
+        self.seen_text.setdefault(key, []).append(page_item['page_center'][1])
+        self.page_items.append(page_item)
\ No newline at end of file
@@ -7,64 +7,121 @@
 
 import cv2
 import numpy as np
-from PIL import Image, ImageGrab
-import easyocr
+from capture_manager import grab_bounds
 import re
+import time
+from concurrent.futures import Future
+from metrics import OCR_LATENCY
+from .ocr_pool import get_ocr_pool
+from .ocr_profile import load_ocr_profile, apply_thread_count, readtext
 
 
 class TextDetector:
     """文字检测器类"""
     
+    # 进程内共享的EasyOCR读取器；fork启动器在父进程预先加载，子进程写时复制共享模型权重
+    _shared_reader = None
+    
     def __init__(self):
         """初始化OCR检测器"""
         self.reader = None
-        self._init_ocr_reader()
+        # 本机实测的线程数/缩放比例/批大小（见 benchmarks/ocr_benchmark.py）
+        self.profile = load_ocr_profile()
+        # 启用OCR进程池时，模型只在工作进程中加载
+        self.pool = get_ocr_pool()
+        if self.pool is None:
+            self._init_ocr_reader()
+        else:
+            print(f"✅ OCR进程池已启用 ({self.pool.processes} 个工作进程)")
+    
+    @property
+    def available(self):
+        return self.reader is not None or self.pool is not None
+    
+    @property
+    def full_frame_scale(self):
+        """整帧识别的输入缩放比例（本机调优结果只在整张截图上评估过召回率）"""
+        return self.profile['scale']
     
     def _init_ocr_reader(self):
-        """初始化EasyOCR读取器"""
+        """初始化EasyOCR读取器（同一进程内只加载一次）"""
+        if TextDetector._shared_reader is not None:
+            self.reader = TextDetector._shared_reader
+            print("♻️ 复用已加载的OCR引擎")
+        else:
+            self.reader = TextDetector.preload_reader()
+            if self.reader is not None:
+                print("✅ OCR引擎初始化成功 (CPU模式)")
+        
+        if self.reader is not None and apply_thread_count(self.profile['threads']):
+            print(f"⚙️ OCR运行配置: {self.profile['threads']} 线程, 缩放 {self.profile['scale']}, "
+                  f"批大小 {self.profile['batch_size']}")
+    
+    @classmethod
+    def preload_reader(cls):
+        """加载进程内共享的EasyOCR读取器，失败时返回None"""
+        if cls._shared_reader is not None:
+            return cls._shared_reader
         try:
+            # EasyOCR会连带导入torch，推迟到创建读取器时再导入
+            import easyocr
+            
             # 支持中文和英文，强制使用CPU避免MPS警告
-            self.reader = easyocr.Reader(['ch_sim', 'en'], gpu=False, verbose=False)
-            print("✅ OCR引擎初始化成功 (CPU模式)")
+            cls._shared_reader = easyocr.Reader(['ch_sim', 'en'], gpu=False, verbose=False)
         except Exception as e:
             print(f"❌ OCR引擎初始化失败: {e}")
             print("💡 请安装easyocr: pip install easyocr")
-            self.reader = None
+        return cls._shared_reader
+    
+    def warm_up(self):
+        """用一张空白小图跑一次识别，提前完成模型的首次推理开销（常驻服务启动时调用）"""
+        if not self.available:
+            return False
+        try:
+            if self.pool is not None:
+                pids = self.pool.warm_up()
+                print(f"✅ OCR工作进程已就绪: {pids}")
+            else:
+                self.reader.readtext(np.full((32, 96, 3), 255, dtype=np.uint8))
+            return True
+        except Exception as e:
+            print(f"⚠️ OCR预热失败: {e}")
+            return False
     
     def detect_text_from_image(self, image_path):
         """从图片文件检测文字"""
-        if not self.reader:
+        if not self.available:
+            print("❌ OCR引擎未初始化")
+            return []
+        
+        # 读取图片
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"❌ 无法读取图片: {image_path}")
+            return []
+        
+        return self.detect_text_from_array(image, scale=self.full_frame_scale)
+    
+    def detect_text_from_array(self, image, offset=(0, 0), scale=1.0):
+        """从内存中的BGR图像检测文字
+        
+        offset为图像左上角在完整画面中的坐标，用于把局部区域的识别结果换算回完整画面坐标；
+        scale为识别前的缩放比例，整帧识别传入full_frame_scale，局部区域和滚动条带保持原尺寸（缩小后小字无法识别）
+        """
+        if not self.available:
             print("❌ OCR引擎未初始化")
             return []
         
         try:
-            # 读取图片
-            image = cv2.imread(image_path)
-            if image is None:
-                print(f"❌ 无法读取图片: {image_path}")
-                return []
-            
-            # 进行OCR识别
-            results = self.reader.readtext(image)
-            
-            # 解析结果
-            text_items = []
-            for (bbox, text, confidence) in results:
-                if confidence > 0.5:  # 置信度过滤
-                    # 计算边界框中心点
-                    x_coords = [point[0] for point in bbox]
-                    y_coords = [point[1] for point in bbox]
-                    center_x = int(sum(x_coords) / len(x_coords))
-                    center_y = int(sum(y_coords) / len(y_coords))
-                    
-                    text_items.append({
-                        'text': text.strip(),
-                        'confidence': confidence,
-                        'bbox': bbox,
-                        'center': (center_x, center_y),
-                        'width': max(x_coords) - min(x_coords),
-                        'height': max(y_coords) - min(y_coords)
-                    })
+            if self.pool is not None:
+                # 交给工作进程识别，当前线程只等待结果
+                text_items = self._submit_to_pool(image, offset, scale).result()
+            else:
+                # 进行OCR识别
+                started = time.perf_counter()
+                results = readtext(self.reader, image, scale, self.profile['batch_size'])
+                OCR_LATENCY.observe(time.perf_counter() - started)
+                text_items = self._parse_results(results, offset)
             
             print(f"🔍 检测到 {len(text_items)} 个文字区域")
             return text_items
@@ -73,22 +130,73 @@ class TextDetector:
             print(f"❌ 文字检测失败: {e}")
             return []
     
+    def submit(self, frame, roi=None):
+        """异步识别frame中roi=(x, y, width, height)区域的文字
+        
+        返回Future，结果与detect_text_from_array相同（坐标为frame坐标）。
+        启用进程池时识别在工作进程中进行，否则在当前线程同步完成后返回已完成的Future；
+        只有整帧识别按full_frame_scale缩放
+        """
+        offset = (0, 0)
+        scale = self.full_frame_scale
+        if roi is not None:
+            x, y, width, height = roi
+            frame = frame[y:y + height, x:x + width]
+            offset = (x, y)
+            scale = 1.0
+        
+        if self.pool is None:
+            future = Future()
+            future.set_result(self.detect_text_from_array(frame, offset, scale))
+            return future
+        return self._submit_to_pool(frame, offset, scale)
+    
+    def _submit_to_pool(self, image, offset, scale=1.0):
+        """提交到OCR进程池，在主进程中解析结果"""
+        future = Future()
+        
+        def finish(pool_future):
+            try:
+                results, elapsed = pool_future.result()
+                OCR_LATENCY.observe(elapsed)
+                future.set_result(self._parse_results(results, offset))
+            except Exception as e:
+                future.set_exception(e)
+        
+        self.pool.submit(image, scale).add_done_callback(finish)
+        return future
+    
+    def _parse_results(self, results, offset=(0, 0)):
+        """解析EasyOCR结果为统一的text_items结构"""
+        offset_x, offset_y = offset
+        text_items = []
+        
+        for (bbox, text, confidence) in results:
+            if confidence > 0.5:  # 置信度过滤
+                bbox = [[point[0] + offset_x, point[1] + offset_y] for point in bbox]
+                
+                # 计算边界框中心点
+                x_coords = [point[0] for point in bbox]
+                y_coords = [point[1] for point in bbox]
+                center_x = int(sum(x_coords) / len(x_coords))
+                center_y = int(sum(y_coords) / len(y_coords))
+                
+                text_items.append({
+                    'text': text.strip(),
+                    'confidence': confidence,
+                    'bbox': bbox,
+                    'center': (center_x, center_y),
+                    'width': max(x_coords) - min(x_coords),
+                    'height': max(y_coords) - min(y_coords)
+                })
+        
+        return text_items
+    
     def detect_text_from_bounds(self, bounds):
         """从指定区域截图并检测文字"""
         try:
-            # 截取指定区域
-            screenshot = ImageGrab.grab(bbox=(
-                bounds['x'], bounds['y'],
-                bounds['x'] + bounds['width'],
-                bounds['y'] + bounds['height']
-            ))
-            
-            # 保存临时图片
-            temp_path = "/tmp/ocr_temp.png"
-            screenshot.save(temp_path)
-            
-            # 检测文字
-            return self.detect_text_from_image(temp_path)
+            # 截取指定区域并直接在内存中检测文字
+            return self.detect_text_from_array(grab_bounds(bounds), scale=self.full_frame_scale)
             
         except Exception as e:
             print(f"❌ 区域文字检测失败: {e}")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块增量文字检测器
+保留各分块上次识别时的画面和分块OCR结果，页面局部变化时只对变化的分块重新识别
+"""
+
+import cv2
+import numpy as np
+from config import CrawlerConfig
+
+
+class TiledTextDetector:
+    """分块增量文字检测器类"""
+    
+    def __init__(self, text_detector, tile_size=None, diff_threshold=None):
+        """初始化分块检测器"""
+        self.text_detector = text_detector
+        self.tile_size = tile_size or CrawlerConfig.OCR_TILE_SIZE
+        self.diff_threshold = diff_threshold or CrawlerConfig.OCR_TILE_DIFF_THRESHOLD
+        self.full_ocr_ratio = CrawlerConfig.OCR_TILE_FULL_OCR_RATIO
+        self.margin = CrawlerConfig.OCR_TILE_MARGIN
+        
+        # 各区域最后一次OCR时的灰度画面：逐帧缓慢变化（淡入、慢动画）累计超过阈值后也会重新识别
+        self.reference_gray = None
+        self.tile_items = {}  # (行, 列) -> 中心点落在该分块内的文字
+        self.stats = {
+            'frames': 0,
+            'full_ocr': 0,
+            'partial_ocr': 0,
+            'unchanged': 0,
+            'total_pixels': 0,
+            'ocr_pixels': 0
+        }
+    
+    def reset(self):
+        """清空参考画面和分块结果"""
+        self.reference_gray = None
+        self.tile_items = {}
+    
+    def detect(self, image):
+        """检测BGR图像中的文字，返回与TextDetector相同结构的text_items"""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape
+        self.stats['frames'] += 1
+        self.stats['total_pixels'] += height * width
+        
+        if self.reference_gray is None or self.reference_gray.shape != gray.shape:
+            return self._full_detect(image, gray)
+        
+        dirty_tiles = self._find_dirty_tiles(gray)
+        dirty_ratio = dirty_tiles.mean()
+        
+        if dirty_ratio == 0:
+            print("🧩 画面无变化，复用上次OCR结果")
+            self.stats['unchanged'] += 1
+            return self.get_text_items()
+        
+        if dirty_ratio >= self.full_ocr_ratio:
+            print(f"🧩 变化分块占比 {dirty_ratio:.0%}，执行整页OCR")
+            return self._full_detect(image, gray)
+        
+        regions = self._build_dirty_regions(dirty_tiles, width, height)
+        print(f"🧩 变化分块占比 {dirty_ratio:.0%}，仅重新识别 {len(regions)} 个区域")
+        
+        # 保留未落入变化区域的旧结果，变化区域内的结果全部重新识别
+        kept_items = [
+            item for item in self.get_text_items()
+            if not any(self._point_in_region(item['center'], region) for region in regions)
+        ]
+        
+        new_items = []
+        for x1, y1, x2, y2 in regions:
+            crop = image[y1:y2, x1:x2]
+            self.stats['ocr_pixels'] += (x2 - x1) * (y2 - y1)
+            new_items.extend(self.text_detector.detect_text_from_array(crop, offset=(x1, y1)))
+            # 只有重新识别过的区域更新参考画面，其余分块继续与它们上次识别时的画面比较
+            self.reference_gray[y1:y2, x1:x2] = gray[y1:y2, x1:x2]
+        
+        self.stats['partial_ocr'] += 1
+        self._store_items(kept_items + new_items)
+        return self.get_text_items()
+    
+    def get_text_items(self):
+        """合并所有分块的文字结果（按阅读顺序排列）"""
+        items = [item for tile_items in self.tile_items.values() for item in tile_items]
+        items.sort(key=lambda item: (item['center'][1], item['center'][0]))
+        return items
+    
+    def get_stats(self):
+        """获取OCR面积统计"""
+        stats = dict(self.stats)
+        total = stats['total_pixels']
+        stats['ocr_area_ratio'] = round(stats['ocr_pixels'] / total, 3) if total else 0
+        return stats
+    
+    def _full_detect(self, image, gray):
+        """整页识别并重建分块结果"""
+        height, width = gray.shape
+        text_items = self.text_detector.detect_text_from_array(image, scale=self.text_detector.full_frame_scale)
+        
+        self.stats['full_ocr'] += 1
+        self.stats['ocr_pixels'] += height * width
+        self.reference_gray = gray
+        self._store_items(text_items)
+        return self.get_text_items()
+    
+    def _store_items(self, text_items):
+        """按中心点把文字归入分块"""
+        self.tile_items = {}
+        for item in text_items:
+            center_x, center_y = item['center']
+            tile = (int(center_y) // self.tile_size, int(center_x) // self.tile_size)
+            self.tile_items.setdefault(tile, []).append(item)
+    
+    def _find_dirty_tiles(self, gray):
+        """计算每个分块与参考画面的平均像素差，返回超过阈值的分块掩码"""
+        height, width = gray.shape
+        rows = (height + self.tile_size - 1) // self.tile_size
+        cols = (width + self.tile_size - 1) // self.tile_size
+        
+        diff = cv2.absdiff(gray, self.reference_gray).astype(np.float32)
+        
+        # 补齐到分块整数倍后按块求均值
+        padded = np.zeros((rows * self.tile_size, cols * self.tile_size), dtype=np.float32)
+        padded[:height, :width] = diff
+        tile_means = padded.reshape(rows, self.tile_size, cols, self.tile_size).mean(axis=(1, 3))
+        
+        return tile_means > self.diff_threshold
+    
+    def _build_dirty_regions(self, dirty_tiles, width, height):
+        """把相邻的变化分块合并为矩形区域，并扩展边距以覆盖被分块边界截断的文字"""
+        mask = dirty_tiles.astype(np.uint8)
+        count, _, tile_stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        
+        regions = []
+        for label in range(1, count):
+            col, row, cols, rows = (int(value) for value in tile_stats[label][:4])
+            regions.append(self._clip_region((
+                col * self.tile_size - self.margin,
+                row * self.tile_size - self.margin,
+                (col + cols) * self.tile_size + self.margin,
+                (row + rows) * self.tile_size + self.margin
+            ), width, height))
+        
+        # 与变化区域相交的旧文字需要完整地包含在内，否则会被截断后重新识别
+        for item in self.get_text_items():
+            item_box = self._item_box(item)
+            for index, region in enumerate(regions):
+                if self._boxes_intersect(item_box, region):
+                    regions[index] = self._clip_region(self._union_box(region, item_box), width, height)
+        
+        return self._merge_overlapping(regions)
+    
+    def _merge_overlapping(self, regions):
+        """合并相互重叠的区域，避免重复识别"""
+        merged = []
+        for region in sorted(regions):
+            for index, existing in enumerate(merged):
+                if self._boxes_intersect(region, existing):
+                    merged[index] = self._union_box(region, existing)
+                    break
+            else:
+                merged.append(region)
+        
+        if len(merged) < len(regions):
+            return self._merge_overlapping(merged)
+        return merged
+    
+    def _item_box(self, item):
+        """文字的外接矩形"""
+        x_coords = [point[0] for point in item['bbox']]
+        y_coords = [point[1] for point in item['bbox']]
+        return (int(min(x_coords)), int(min(y_coords)), int(max(x_coords)) + 1, int(max(y_coords)) + 1)
+    
+    def _clip_region(self, region, width, height):
+        """将区域裁剪到画面范围内"""
+        x1, y1, x2, y2 = region
+        return (max(0, x1), max(0, y1), min(width, x2), min(height, y2))
+    
+    def _union_box(self, box1, box2):
+        """两个矩形的并集外接矩形"""
+        return (min(box1[0], box2[0]), min(box1[1], box2[1]),
+                max(box1[2], box2[2]), max(box1[3], box2[3]))
+    
+    def _boxes_intersect(self, box1, box2):
+        """判断两个矩形是否相交"""
+        return box1[0] < box2[2] and box2[0] < box1[2] and box1[1] < box2[3] and box2[1] < box1[3]
+    
+    def _point_in_region(self, point, region):
+        """判断点是否落在区域内"""
+        x, y = point
+        return region[0] <= x < region[2] and region[1] <= y < region[3]
\ No newline at end of file
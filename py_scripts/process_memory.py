@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内存统计
+读取进程的RSS/PSS/USS（独占内存），用于衡量fork后各工作进程实际多占用的内存
+"""
+
+import os
+
+_SMAPS_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Private_Clean': 'private_clean',
+    'Private_Dirty': 'private_dirty'
+}
+
+
+def _read_smaps(pid):
+    """Linux：从 /proc/<pid>/smaps_rollup（旧内核为smaps）汇总，单位字节"""
+    totals = dict.fromkeys(_SMAPS_FIELDS.values(), 0)
+    for name in ('smaps_rollup', 'smaps'):
+        path = f"/proc/{pid}/{name}"
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in _SMAPS_FIELDS:
+                    totals[_SMAPS_FIELDS[key]] += int(rest.split()[0]) * 1024
+        return totals
+    return None
+
+
+def get_process_memory(pid=None):
+    """返回 {'pid', 'rss', 'pss', 'uss'}（字节），无法获取的项为None
+    
+    USS为进程独占的页面（私有干净页 + 私有脏页），即结束该进程能释放的内存；
+    与父进程共享、尚未写时复制的模型权重只计入RSS和PSS
+    """
+    pid = pid or os.getpid()
+    usage = {'pid': pid, 'rss': None, 'pss': None, 'uss': None}
+    
+    smaps = _read_smaps(pid)
+    if smaps is not None:
+        usage.update(
+            rss=smaps['rss'],
+            pss=smaps['pss'],
+            uss=smaps['private_clean'] + smaps['private_dirty']
+        )
+        return usage
+    
+    # 非Linux平台：安装了psutil时用它读取USS
+    try:
+        import psutil
+        info = psutil.Process(pid).memory_full_info()
+        usage.update(rss=info.rss, pss=getattr(info, 'pss', None), uss=info.uss)
+    except ImportError:
+        if pid == os.getpid():
+            import resource
+            import sys
+            # macOS上ru_maxrss单位为字节，Linux上为KB；只能得到峰值RSS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            usage['rss'] = maxrss if sys.platform == 'darwin' else maxrss * 1024
+    except Exception as e:
+        print(f"⚠️ 读取进程 {pid} 内存失败: {e}")
+    return usage
+
+
+def get_available_memory():
+    """主机当前可用内存（字节），无法获取时返回None"""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        return None
+
+
+def format_bytes(value):
+    """字节数格式化为MB"""
+    return "-" if value is None else f"{value / 1024 / 1024:.1f}MB"
\ No newline at end of file
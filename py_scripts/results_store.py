@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取结果数据库
+把应用、运行、页面、截图、文字元素和按钮写入带索引的SQLite数据库（WAL模式，批量插入），
+跨运行的查询（如"应用X最近30次运行的全部页面"）直接走索引，不再逐个解析 crawl_results_*.json；
+OCR文字、分析文字和按钮文字建有FTS5全文索引（按字切分，任意长度的中文子串都能命中）；
+增量爬取以应用最近一次完成的运行为基线，页面的新增、变化和消失记录在page_changes表
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from config import CrawlerConfig
+
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    first_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    app_id INTEGER NOT NULL REFERENCES apps(id),
+    started_at TEXT NOT NULL,
+    ended_at TEXT,
+    status TEXT NOT NULL,
+    duration REAL,
+    total_pages INTEGER,
+    total_buttons INTEGER,
+    json_path TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    app_id INTEGER NOT NULL REFERENCES apps(id),
+    name TEXT NOT NULL,
+    path TEXT,
+    depth INTEGER,
+    crawled_at TEXT,
+    screenshot_dir TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS screenshots (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    is_main INTEGER NOT NULL DEFAULT 0,
+    duplicate_of TEXT
+);
+CREATE TABLE IF NOT EXISTS text_elements (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    text TEXT NOT NULL,
+    x INTEGER,
+    y INTEGER,
+    confidence REAL
+);
+CREATE TABLE IF NOT EXISTS buttons (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    app_id INTEGER NOT NULL REFERENCES apps(id),
+    page_id INTEGER NOT NULL REFERENCES pages(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    text TEXT NOT NULL,
+    target_page TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_app ON runs(app_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_pages_run ON pages(run_id);
+CREATE INDEX IF NOT EXISTS idx_pages_app_name ON pages(app_id, name, run_id);
+CREATE INDEX IF NOT EXISTS idx_screenshots_page ON screenshots(page_id);
+CREATE INDEX IF NOT EXISTS idx_text_page ON text_elements(page_id);
+CREATE INDEX IF NOT EXISTS idx_text_text ON text_elements(text);
+CREATE INDEX IF NOT EXISTS idx_buttons_run ON buttons(run_id);
+CREATE INDEX IF NOT EXISTS idx_buttons_app_text ON buttons(app_id, text);
+"""
+
+# v2：文字元素记录所在截图序号和识别框，建全文索引（rowid与text_elements.id一致）
+TEXT_SEARCH_COLUMNS = (('screenshot_seq', 'INTEGER'), ('bbox', 'TEXT'))
+TEXT_SEARCH_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_screenshots_page_seq ON screenshots(page_id, seq);
+"""
+# v3：增量爬取的页面变化记录
+PAGE_CHANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_changes (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    app_id INTEGER NOT NULL REFERENCES apps(id),
+    page TEXT NOT NULL,
+    change TEXT NOT NULL,
+    baseline_run INTEGER,
+    baseline_page INTEGER,
+    phash_distance INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_page_changes_app ON page_changes(app_id, run_id);
+"""
+TEXT_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS text_fts USING fts5(tokens, content='', tokenize='unicode61')"
+
+
+def search_tokens(text):
+    """全文索引的分词：全角转半角、转小写后逐字以空格分隔
+    
+    中文没有词边界，unicode61会把整段中文当成一个词；逐字切分后用短语查询即可匹配任意子串
+    """
+    normalized = unicodedata.normalize('NFKC', text or '').lower()
+    return ' '.join(char for char in normalized if not char.isspace())
+
+
+def _match_expression(query):
+    """空格分隔的每个词转为一个FTS5短语，词之间为AND；只含标点的词忽略"""
+    phrases = []
+    for term in query.split():
+        tokens = search_tokens(term)
+        if any(char.isalnum() for char in tokens):
+            phrases.append('"' + tokens.replace('"', '""') + '"')
+    return ' AND '.join(phrases)
+
+
+def _escape_like(term):
+    """转义LIKE通配符，查询中的%和_按字面匹配"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _position_xy(position):
+    """分析服务返回的position（{'x','y'}或[x, y]）转换为整数坐标"""
+    if isinstance(position, dict) and 'x' in position and 'y' in position:
+        return int(position['x']), int(position['y'])
+    if isinstance(position, (list, tuple)) and len(position) >= 2:
+        return int(position[0]), int(position[1])
+    return None, None
+
+
+class ResultsStore:
+    """SQLite爬取结果库类
+    
+    DataManager在设置应用名称时开始一次运行，页面先在内存中缓冲，
+    每 RESULTS_DB_BATCH_PAGES 个页面在一个事务里批量写入，结束运行时写入剩余页面和汇总
+    """
+    
+    def __init__(self, db_file=None):
+        self.db_file = db_file or CrawlerConfig.RESULTS_DB_FILE
+        self.batch_pages = CrawlerConfig.RESULTS_DB_BATCH_PAGES
+        self.conn = None
+        self.run_id = None
+        self.app_id = None
+        self.pending_pages = []
+        self.fts_enabled = False
+        self._lock = threading.Lock()
+    
+    # ---- 连接 ----
+    
+    def connect(self):
+        """打开数据库（首次使用时建表）；连接延迟到第一次写入，fork前创建的对象不持有连接"""
+        if self.conn is not None:
+            return self.conn
+        
+        db_dir = os.path.dirname(self.db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # 同一主机的多个爬虫进程可能同时写入：WAL模式下读不阻塞写，写冲突时等待而不是报错
+        conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.create_function("search_tokens", 1, search_tokens, deterministic=True)
+        
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._migrate(conn)
+        self.fts_enabled = self._create_fts(conn)
+        self.conn = conn
+        return conn
+    
+    @staticmethod
+    def _execute_script(conn, script):
+        """逐条执行建表脚本（executescript会先提交当前事务，不能用在迁移事务里）"""
+        for statement in script.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+    
+    def _migrate(self, conn):
+        """在写事务中升级表结构
+        
+        多个爬虫进程可能同时打开旧版本的库：BEGIN IMMEDIATE 先拿到写锁，
+        再重新读取版本号，后拿到锁的进程看到已升级的版本就什么也不做
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                self._execute_script(conn, SCHEMA)
+            if version < 2:
+                columns = {row['name'] for row in conn.execute("PRAGMA table_info(text_elements)")}
+                for name, column_type in TEXT_SEARCH_COLUMNS:
+                    if name not in columns:
+                        conn.execute(f"ALTER TABLE text_elements ADD COLUMN {name} {column_type}")
+                self._execute_script(conn, TEXT_SEARCH_SCHEMA)
+            if version < 3:
+                self._execute_script(conn, PAGE_CHANGES_SCHEMA)
+            if version < SCHEMA_VERSION:
+                conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _create_fts(self, conn):
+        """建立全文索引并补齐旧数据；SQLite未编译FTS5时退回LIKE扫描
+        
+        和迁移一样在写锁内重新检查，避免两个进程都建表并重复补齐旧数据
+        """
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'text_fts'").fetchone():
+            return True
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'text_fts'").fetchone():
+                    conn.execute(TEXT_FTS_SCHEMA)
+                    conn.execute("INSERT INTO text_fts (rowid, tokens) SELECT id, search_tokens(text) FROM text_elements")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite不支持FTS5，文字搜索退回逐行匹配: {e}")
+            return False
+    
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+    
+    # ---- 写入 ----
+    
+    def begin_run(self, app_name, started_at=None):
+        """开始一次运行，返回运行ID"""
+        started_at = started_at or datetime.now().isoformat()
+        with self._lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO apps (name, first_seen) VALUES (?, ?)", (app_name, started_at))
+                self.app_id = conn.execute("SELECT id FROM apps WHERE name = ?", (app_name,)).fetchone()[0]
+                cursor = conn.execute(
+                    "INSERT INTO runs (app_id, started_at, status) VALUES (?, ?, 'running')",
+                    (self.app_id, started_at)
+                )
+            self.run_id = cursor.lastrowid
+            self.pending_pages = []
+        return self.run_id
+    
+    def add_page(self, page_data):
+        """缓冲一个页面，攒满一批后写入"""
+        if self.run_id is None:
+            return
+        with self._lock:
+            self.pending_pages.append(page_data)
+            if len(self.pending_pages) >= self.batch_pages:
+                self._flush_pages()
+    
+    def finish_run(self, crawl_data, json_path=None):
+        """写入剩余页面、运行汇总和增量爬取的页面变化记录"""
+        if self.run_id is None:
+            return None
+        info = crawl_data['crawl_info']
+        summary = {key: value for key, value in crawl_data.items() if key != 'pages'}
+        
+        with self._lock:
+            self._flush_pages()
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE runs SET ended_at = ?, status = ?, duration = ?, total_pages = ?, total_buttons = ?, "
+                    "json_path = ?, summary = ? WHERE id = ?",
+                    (info.get('end_time'), info.get('status', 'completed'), info.get('crawl_duration'), info.get('total_pages'),
+                     info.get('total_buttons'), json_path, json.dumps(summary, ensure_ascii=False, default=str),
+                     self.run_id)
+                )
+                self.conn.executemany(
+                    "INSERT INTO page_changes (run_id, app_id, page, change, baseline_run, baseline_page, phash_distance) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(self.run_id, self.app_id, change['page'], change['status'], change.get('baseline_run'),
+                      change.get('baseline_page'), change.get('phash_distance'))
+                     for change in (crawl_data.get('delta') or {}).get('changes', [])]
+                )
+            run_id, self.run_id = self.run_id, None
+        return run_id
+    
+    def _flush_pages(self):
+        """在一个事务中写入缓冲的页面及其截图、文字元素和按钮（调用方持有锁）"""
+        if not self.pending_pages:
+            return
+        screenshots, texts, buttons = [], [], []
+        with self.conn:
+            for page in self.pending_pages:
+                cursor = self.conn.execute(
+                    "INSERT INTO pages (run_id, app_id, name, path, depth, crawled_at, screenshot_dir, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.run_id, self.app_id, page.get('page_name', ''),
+                     json.dumps(page['path'], ensure_ascii=False) if page.get('path') else None,
+                     page.get('depth', 1), page.get('timestamp'), page.get('screenshot_directory'),
+                     json.dumps(page, ensure_ascii=False, default=str))
+                )
+                page_id = cursor.lastrowid
+                screenshots.extend(self._screenshot_rows(page_id, page))
+                texts.extend(self._text_rows(page_id, page))
+                # 进入该页面时点击的目标，以及分析服务在页面上识别出的按钮
+                clicked = page['path'][-1] if page.get('path') else page.get('page_name', '')
+                buttons.append((self.run_id, self.app_id, page_id, 'navigation', clicked, page.get('page_name')))
+                buttons.extend(
+                    (self.run_id, self.app_id, page_id, 'analysis', button.get('text', ''), None)
+                    for button in (page.get('extracted_features') or {}).get('buttons', [])
+                )
+            
+            self.conn.executemany(
+                "INSERT INTO screenshots (page_id, seq, path, is_main, duplicate_of) VALUES (?, ?, ?, ?, ?)", screenshots
+            )
+            # 已持有写锁，本批文字元素的ID都大于当前最大ID
+            last_text_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM text_elements").fetchone()[0]
+            self.conn.executemany(
+                "INSERT INTO text_elements (page_id, source, text, x, y, confidence, screenshot_seq, bbox) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", texts
+            )
+            if self.fts_enabled:
+                self.conn.execute(
+                    "INSERT INTO text_fts (rowid, tokens) SELECT id, search_tokens(text) FROM text_elements WHERE id > ?",
+                    (last_text_id,)
+                )
+            self.conn.executemany(
+                "INSERT INTO buttons (run_id, app_id, page_id, source, text, target_page) VALUES (?, ?, ?, ?, ?, ?)", buttons
+            )
+        self.pending_pages = []
+    
+    def _screenshot_rows(self, page_id, page):
+        info = page.get('screenshots') or {}
+        directory = page.get('screenshot_directory') or ''
+        # 截图记录为页面目录中的文件名或其他页面文件的绝对路径；近重复截图：被跳过保存的引用原截图本身，仅被标记的记录原截图路径
+        skipped = {os.path.normpath(dup['duplicate_of']) for dup in info.get('duplicates', []) if dup.get('skipped')}
+        flagged = {os.path.normpath(dup['path']): dup['duplicate_of']
+                   for dup in info.get('duplicates', []) if not dup.get('skipped')}
+        
+        rows = []
+        for seq, name in enumerate(info.get('scroll_sequence', [])):
+            path = os.path.normpath(os.path.join(directory, name))
+            rows.append((page_id, seq, path, int(name == info.get('main_screenshot')),
+                         path if path in skipped else flagged.get(path)))
+        return rows
+    
+    def _text_rows(self, page_id, page):
+        """本地OCR文字（整页坐标，所在滚动截图序号）、分析服务识别的文字和按钮（主截图，即序号0）"""
+        rows = []
+        for item in page.get('local_ocr_text') or []:
+            x, y = _position_xy(item.get('page_center'))
+            rows.append((page_id, 'ocr', item['text'], x, y, item.get('confidence'),
+                         item.get('frame_index'), json.dumps(item.get('page_bbox'))))
+        
+        features = page.get('extracted_features') or {}
+        for source, items in (('analysis', features.get('text_elements', [])), ('button', features.get('buttons', []))):
+            for item in items:
+                if item.get('text'):
+                    x, y = _position_xy(item.get('position'))
+                    rows.append((page_id, source, item['text'], x, y, item.get('confidence'),
+                                 0, json.dumps(item.get('position'), ensure_ascii=False)))
+        return rows
+    
+    # ---- 查询 ----
+    
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self.connect().execute(sql, params).fetchall()]
+    
+    def list_apps(self):
+        return self._query(
+            "SELECT a.name, a.first_seen, COUNT(r.id) AS runs, MAX(r.started_at) AS last_run "
+            "FROM apps a LEFT JOIN runs r ON r.app_id = a.id GROUP BY a.id ORDER BY last_run DESC"
+        )
+    
+    def list_runs(self, app_name=None, limit=30):
+        """最近的运行（可按应用过滤），新的在前"""
+        sql = ("SELECT r.id, a.name AS app_name, r.started_at, r.ended_at, r.status, r.duration, "
+               "r.total_pages, r.total_buttons, r.json_path FROM runs r JOIN apps a ON a.id = r.app_id")
+        params = []
+        if app_name:
+            sql += " WHERE a.name = ?"
+            params.append(app_name)
+        sql += " ORDER BY r.started_at DESC LIMIT ?"
+        params.append(limit)
+        return self._query(sql, params)
+    
+    def get_pages(self, app_name, last_runs=30, page_name=None, include_data=False):
+        """应用最近last_runs次运行的全部页面（可只取某个页面的历史），新的运行在前"""
+        columns = "p.id, p.run_id, r.started_at, p.name, p.path, p.depth, p.crawled_at, p.screenshot_dir"
+        if include_data:
+            columns += ", p.data"
+        sql = (f"SELECT {columns} FROM pages p JOIN runs r ON r.id = p.run_id "
+               "WHERE p.run_id IN (SELECT id FROM runs WHERE app_id = (SELECT id FROM apps WHERE name = ?) "
+               "ORDER BY started_at DESC LIMIT ?)")
+        params = [app_name, last_runs]
+        if page_name:
+            sql += " AND p.name = ?"
+            params.append(page_name)
+        sql += " ORDER BY r.started_at DESC, p.id"
+        
+        pages = self._query(sql, params)
+        for page in pages:
+            page['path'] = json.loads(page['path']) if page['path'] else None
+            if include_data:
+                page['data'] = json.loads(page['data'])
+        return pages
+    
+    def get_baseline_pages(self, app_name):
+        """应用最近一次完成的运行及其全部页面（含页面数据），没有时返回 (None, [])"""
+        runs = self._query(
+            "SELECT r.id FROM runs r JOIN apps a ON a.id = r.app_id WHERE a.name = ? AND r.status = 'completed' "
+            "ORDER BY r.started_at DESC, r.id DESC LIMIT 1", (app_name,)
+        )
+        if not runs:
+            return None, []
+        run_id = runs[0]['id']
+        pages = self._query("SELECT id, name, path, data FROM pages WHERE run_id = ? ORDER BY id", (run_id,))
+        for page in pages:
+            page['path'] = json.loads(page['path']) if page['path'] else None
+            page['data'] = json.loads(page['data'])
+        return run_id, pages
+    
+    def get_changes(self, app_name, last_runs=30):
+        """应用最近last_runs次运行的页面变化记录（new/changed/removed），新的运行在前"""
+        return self._query(
+            "SELECT c.run_id, r.started_at, c.page, c.change, c.baseline_run, c.phash_distance FROM page_changes c "
+            "JOIN runs r ON r.id = c.run_id WHERE c.run_id IN (SELECT id FROM runs WHERE app_id = "
+            "(SELECT id FROM apps WHERE name = ?) ORDER BY started_at DESC LIMIT ?) ORDER BY r.started_at DESC, c.id",
+            (app_name, last_runs)
+        )
+    
+    def get_screenshots(self, page_id):
+        return self._query("SELECT seq, path, is_main, duplicate_of FROM screenshots WHERE page_id = ? ORDER BY seq",
+                           (page_id,))
+    
+    def search(self, query, app_name=None, run_id=None, latest_only=False, limit=20):
+        """全文搜索文字元素，返回按相关度排序的命中（含应用、运行、页面、截图和识别框）
+        
+        query中空格分隔的多个词需同时出现在同一文字元素中；文字与查询完全相同的排在最前。
+        单个字的查询几乎命中所有页面，按相关度排序需要给全部命中打分，改为直接按索引倒序取最新的命中
+        """
+        match = _match_expression(query)
+        if not match:
+            return []
+        
+        columns = ("a.name AS app_name, p.run_id, r.started_at AS run_started_at, p.id AS page_id, "
+                   "p.name AS page_name, p.path AS page_path, t.source, t.text, t.confidence, t.x, t.y, t.bbox, "
+                   "t.screenshot_seq, s.path AS screenshot")
+        joins = ("JOIN pages p ON p.id = t.page_id JOIN runs r ON r.id = p.run_id JOIN apps a ON a.id = p.app_id "
+                 "LEFT JOIN screenshots s ON s.page_id = t.page_id AND s.seq = t.screenshot_seq")
+        with self._lock:
+            self.connect()
+        order = " ORDER BY (t.text = ?) DESC, score, r.started_at DESC LIMIT ?"
+        if self.fts_enabled:
+            sql = (f"SELECT {columns}, bm25(text_fts) AS score FROM text_fts "
+                   f"JOIN text_elements t ON t.id = text_fts.rowid {joins} WHERE text_fts MATCH ?")
+            params = [match]
+            if sum(char.isalnum() for char in search_tokens(query)) <= 1:
+                order = " ORDER BY text_fts.rowid DESC LIMIT ?"
+        else:
+            terms = query.split()
+            sql = f"SELECT {columns}, 0.0 AS score FROM text_elements t {joins} WHERE " + \
+                  " AND ".join("t.text LIKE ? ESCAPE '\\'" for _ in terms)
+            params = [f"%{_escape_like(term)}%" for term in terms]
+        
+        if app_name:
+            sql += " AND a.name = ?"
+            params.append(app_name)
+        if run_id:
+            sql += " AND p.run_id = ?"
+            params.append(run_id)
+        if latest_only:
+            sql += " AND p.run_id IN (SELECT MAX(id) FROM runs GROUP BY app_id)"
+        sql += order
+        if '(t.text = ?)' in order:
+            params.append(query.strip())
+        params.append(limit)
+        
+        hits = self._query(sql, params)
+        for hit in hits:
+            hit['page_path'] = json.loads(hit['page_path']) if hit['page_path'] else None
+            hit['bbox'] = json.loads(hit['bbox']) if hit['bbox'] else None
+            hit['score'] = round(-hit['score'], 3)
+        return hits
+    
+    def export_run(self, run_id):
+        """按 crawl_results_*.json 的格式导出一次运行"""
+        runs = self._query("SELECT summary FROM runs WHERE id = ?", (run_id,))
+        if not runs:
+            return None
+        crawl_data = json.loads(runs[0]['summary']) if runs[0]['summary'] else {}
+        crawl_data['pages'] = [
+            json.loads(row['data'])
+            for row in self._query("SELECT data FROM pages WHERE run_id = ? ORDER BY id", (run_id,))
+        ]
+        return crawl_data
+
+
+def get_results_store():
+    """按配置创建结果库，未启用时返回None"""
+    if not CrawlerConfig.RESULTS_DB_ENABLED:
+        return None
+    return ResultsStore()
\ No newline at end of file
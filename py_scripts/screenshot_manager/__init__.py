@@ -5,20 +5,41 @@
 负责截图、滚动截图、图片处理等功能
 """
 
-from .core import ScreenshotManager
-from .system_detector import SystemWindowDetector
-from .edge_detector import EdgeDetector
-from .content_detector import ContentDetector
-from .validator import ScreenshotValidator
-from .utils import ScreenshotUtils
-from .window_analyzer import WindowContentAnalyzer
-from .detection_strategy import DetectionStrategy
-from .quality_checker import QualityChecker
-from .content_analysis import ContentAnalyzer
-from .content_region_selector import ContentRegionSelector
-from .edge_analysis import EdgeAnalyzer
-from .contour_processor import ContourProcessor
-from .ui_feature_detector import UIFeatureDetector
+from lazy_imports import lazy_exports
+
+_LAZY_IMPORTS = {
+    'ScreenshotManager': '.core',
+    'SystemWindowDetector': '.system_detector',
+    'EdgeDetector': '.edge_detector',
+    'ContentDetector': '.content_detector',
+    'ScreenshotValidator': '.validator',
+    'ScreenshotUtils': '.utils',
+    'WindowContentAnalyzer': '.window_analyzer',
+    'DetectionStrategy': '.detection_strategy',
+    'QualityChecker': '.quality_checker',
+    'ContentAnalyzer': '.content_analysis',
+    'ContentRegionSelector': '.content_region_selector',
+    'EdgeAnalyzer': '.edge_analysis',
+    'ContourProcessor': '.contour_processor',
+    'UIFeatureDetector': '.ui_feature_detector',
+    'ScrollTracker': '.scroll_tracker',
+    'ScrollCapturePipeline': '.capture_pipeline',
+    'PerceptualHashIndex': '.hash_index',
+    'get_hash_index': '.hash_index',
+    'BlobStore': '.blob_store',
+    'get_blob_store': '.blob_store',
+    'ScrollArchive': '.scroll_archive',
+    'ScrollArchiveWriter': '.scroll_archive',
+    'iter_archive_frames': '.scroll_archive',
+    'FrameRing': '.frame_ring',
+    'FrameRingReader': '.frame_ring',
+    'get_frame_ring': '.frame_ring',
+    'dump_frames': '.frame_ring'
+}
+
+# 按需导入子模块，导入包时不加载OpenCV、PIL和pyautogui
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS)
+
 
 __all__ = [
     'ScreenshotManager',
@@ -34,7 +55,20 @@ __all__ = [
     'ContentRegionSelector',
     'EdgeAnalyzer',
     'ContourProcessor',
-    'UIFeatureDetector'
+    'UIFeatureDetector',
+    'ScrollTracker',
+    'ScrollCapturePipeline',
+    'PerceptualHashIndex',
+    'get_hash_index',
+    'BlobStore',
+    'get_blob_store',
+    'ScrollArchive',
+    'ScrollArchiveWriter',
+    'iter_archive_frames',
+    'FrameRing',
+    'FrameRingReader',
+    'get_frame_ring',
+    'dump_frames'
 ]
 
-__version__ = '1.0.0' 
\ No newline at end of file
+__version__ = '1.0.0'
\ No newline at end of file
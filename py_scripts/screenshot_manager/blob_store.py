@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图内容寻址存储
+每张截图按像素内容的BLAKE2哈希保存为 blobs/<前2位>/<3-4位>/<哈希>.png（两级扇出目录），相同画面只编码、写盘一次；
+按钮目录中的截图是指向blob的硬链接（文件系统不支持硬链接时复制），引用计数记录在 blobs/refs.db，
+跨按钮、跨运行的相同画面共用一份文件；链接被删除或改写后，blob在下次截图会话开始时回收
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import cv2
+import numpy as np
+from config import CrawlerConfig
+from metrics import BLOB_WRITES, BLOB_BYTES_WRITTEN
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    path TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES blobs(digest),
+    linked INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_digest ON refs(digest);
+CREATE INDEX IF NOT EXISTS idx_blobs_refs ON blobs(refs);
+"""
+
+
+def save_frame(frame, path, blob_store=None):
+    """保存一帧截图（BGR数组）：有内容寻址存储时链接到blob，否则直接编码写盘
+    
+    直接写盘前先删除旧文件：旧文件可能是指向blob的硬链接，原地改写会改掉其他按钮和运行共用的画面
+    """
+    if blob_store is not None:
+        blob_store.save(frame, path)
+        return
+    if os.path.exists(path):
+        os.remove(path)
+    cv2.imwrite(path, frame)
+
+
+class BlobStore:
+    """截图内容寻址存储类（线程安全；多个爬虫进程共用时由SQLite写锁串行化）"""
+    
+    def __init__(self, root=None):
+        self.root = root or CrawlerConfig.BLOB_STORE_DIR
+        self.db_file = os.path.join(self.root, "refs.db")
+        self.conn = None
+        self.stats = {'stored': 0, 'deduplicated': 0, 'bytes_written': 0, 'bytes_saved': 0}
+        self._lock = threading.Lock()
+    
+    def connect(self):
+        """打开引用计数库（首次使用时建表）；连接延迟到第一次使用，fork前创建的对象不持有连接"""
+        if self.conn is not None:
+            return self.conn
+        os.makedirs(self.root, exist_ok=True)
+        # 自动提交模式，事务由 BEGIN IMMEDIATE 显式控制
+        conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self.conn = conn
+        return conn
+    
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+    
+    # ---- 写入 ----
+    
+    @staticmethod
+    def frame_digest(frame):
+        """像素内容哈希（包含尺寸和类型，形状不同的相同字节不会冲突）"""
+        frame = np.ascontiguousarray(frame)
+        digest = hashlib.blake2b(f"{frame.shape}{frame.dtype}".encode(), digest_size=20)
+        digest.update(memoryview(frame).cast('B'))
+        return digest.hexdigest()
+    
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.png")
+    
+    def save(self, frame, path):
+        """把一帧截图保存到path（指向blob的硬链接），返回内容哈希；相同画面已有blob时不再编码写盘
+        
+        PNG编码和写临时文件在事务之外完成，写锁内只做改名、链接和引用计数，其他爬虫进程不会等待编码
+        """
+        digest = self.frame_digest(frame)
+        blob = self.blob_path(digest)
+        pending = None if os.path.exists(blob) else self._write_temp(frame, blob)
+        try:
+            with self._lock, self._transaction() as conn:
+                row = conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                if row is not None and os.path.exists(blob):
+                    size = row[0]
+                    stored = False
+                else:
+                    # 事务前检查时blob还在、随后被其他进程回收的少见情况，在锁内补写
+                    if pending is None:
+                        pending = self._write_temp(frame, blob)
+                    temp, size = pending
+                    os.replace(temp, blob)
+                    pending = None
+                    stored = True
+                try:
+                    linked = self._materialize(blob, path)
+                except BaseException:
+                    # 刚写入的blob没有任何引用，随事务回滚一起删除
+                    if stored:
+                        os.remove(blob)
+                    raise
+                self._add_ref(conn, path, digest, size, linked)
+        finally:
+            if pending is not None:
+                os.remove(pending[0])
+        
+        if stored:
+            self.stats['stored'] += 1
+            self.stats['bytes_written'] += size
+            BLOB_WRITES.inc(result='stored')
+            BLOB_BYTES_WRITTEN.inc(size)
+        else:
+            self.stats['deduplicated'] += 1
+            self.stats['bytes_saved'] += size
+            BLOB_WRITES.inc(result='deduplicated')
+        return digest
+    
+    def link(self, source, target):
+        """让target引用与source相同的blob（增量爬取复用截图时使用），source不在存储中时返回False"""
+        with self._lock, self._transaction() as conn:
+            row = conn.execute(
+                "SELECT b.digest, b.size FROM refs r JOIN blobs b ON b.digest = r.digest WHERE r.path = ?",
+                (os.path.abspath(source),)
+            ).fetchone()
+            if row is None or not os.path.exists(self.blob_path(row[0])):
+                return False
+            digest, size = row
+            self._add_ref(conn, target, digest, size, self._materialize(self.blob_path(digest), target))
+            self.stats['deduplicated'] += 1
+            self.stats['bytes_saved'] += size
+        return True
+    
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE 事务：查blob、写blob和改引用计数期间其他进程不能回收同一个blob"""
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    @staticmethod
+    def _write_temp(frame, blob):
+        """把截图编码写入blob旁的临时文件，返回 (临时文件, 字节数)；改名为blob即原子写入。
+        临时文件设为只读，改名后的blob不会通过链接被原地改写
+        """
+        ok, encoded = cv2.imencode('.png', frame)
+        if not ok:
+            raise ValueError("截图PNG编码失败")
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        temp = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(encoded.tobytes())
+        os.chmod(temp, 0o444)
+        return temp, len(encoded)
+    
+    @staticmethod
+    def _materialize(blob, path):
+        """在path处创建指向blob的硬链接（原子替换旧文件），不支持硬链接时复制；返回是否为硬链接"""
+        if os.path.exists(path) and os.path.samefile(blob, path):
+            return True
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.link(blob, temp)
+            linked = True
+        except OSError:
+            shutil.copyfile(blob, temp)
+            linked = False
+        os.replace(temp, path)
+        return linked
+    
+    def _add_ref(self, conn, path, digest, size, linked):
+        """记录path引用digest；path原来引用其他blob时旧blob的引用数减一（为0的在回收时删除）"""
+        key = os.path.abspath(path)
+        old = conn.execute("SELECT digest FROM refs WHERE path = ?", (key,)).fetchone()
+        if old is not None and old[0] == digest:
+            conn.execute("UPDATE refs SET linked = ? WHERE path = ?", (int(linked), key))
+            return
+        if old is not None:
+            conn.execute("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (old[0],))
+        conn.execute("INSERT OR IGNORE INTO blobs (digest, size, refs, created_at) VALUES (?, ?, 0, ?)",
+                     (digest, size, time.time()))
+        conn.execute("UPDATE blobs SET refs = refs + 1 WHERE digest = ?", (digest,))
+        conn.execute("INSERT OR REPLACE INTO refs (path, digest, linked) VALUES (?, ?, ?)", (key, digest, int(linked)))
+    
+    # ---- 回收 ----
+    
+    def _is_live(self, path, digest, linked):
+        """引用是否仍然有效：文件还在，且硬链接引用仍指向同一个blob（没有被删除重建或改写成别的画面）"""
+        try:
+            return os.path.samefile(path, self.blob_path(digest)) if linked else os.path.exists(path)
+        except OSError:
+            return False
+    
+    def collect_garbage(self):
+        """去掉已失效的引用，删除引用数为0的blob，返回 (删除的blob数, 释放的字节数)"""
+        with self._lock, self._transaction() as conn:
+            stale = [
+                (path, digest) for path, digest, linked in conn.execute("SELECT path, digest, linked FROM refs").fetchall()
+                if not self._is_live(path, digest, linked)
+            ]
+            for path, digest in stale:
+                conn.execute("DELETE FROM refs WHERE path = ?", (path,))
+                conn.execute("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (digest,))
+            
+            orphans = conn.execute("SELECT digest, size FROM blobs WHERE refs <= 0").fetchall()
+            for digest, _ in orphans:
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        
+        freed = sum(size for _, size in orphans)
+        if orphans:
+            print(f"🧹 截图存储回收: {len(orphans)} 个不再引用的画面，释放 {freed / 1024 / 1024:.1f}MB")
+        return len(orphans), freed
+    
+    def get_summary(self):
+        """存储概况：唯一画面数、占用字节数、引用（按钮目录中的截图）数及其逻辑总大小"""
+        with self._lock:
+            conn = self.connect()
+            blobs, stored_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            refs, logical_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(b.size), 0) FROM refs r JOIN blobs b ON b.digest = r.digest"
+            ).fetchone()
+        return {'blobs': blobs, 'stored_bytes': stored_bytes, 'refs': refs, 'logical_bytes': logical_bytes}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store(root=None):
+    """获取截图内容寻址存储（同一目录在进程内共用一个对象），未启用时返回None"""
+    if not CrawlerConfig.BLOB_STORE_ENABLED:
+        return None
+    
+    root = root or CrawlerConfig.BLOB_STORE_DIR
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = BlobStore(root)
+        return store
\ No newline at end of file
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动截图流水线
+UI线程只负责滚动和抓取原始帧，后台线程负责哈希触底检测、近重复检测、编码保存、验证、文字提取和写滚动截图归档
+"""
+
+import hashlib
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import cv2
+from config import CrawlerConfig
+from tracer import tracer
+from metrics import QUEUE_DEPTH, WAIT_TIME_SAVED, DUPLICATE_FRAMES
+from .utils import ScreenshotUtils
+from .blob_store import save_frame
+from .scroll_archive import ScrollArchiveWriter
+
+
+class ScrollCapturePipeline:
+    """滚动截图采集/处理流水线"""
+    
+    STAGES = ['capture', 'scroll', 'wait', 'hash', 'encode', 'validate', 'ocr', 'archive']
+    WORKER_STAGES = ('hash', 'encode', 'validate', 'ocr', 'archive')
+    
+    def __init__(self, validator, text_extractor=None, queue_size=None, hash_index=None, blob_store=None,
+                 archive_path=None):
+        self.validator = validator
+        self.text_extractor = text_extractor
+        self.hash_index = hash_index
+        self.blob_store = blob_store
+        self.archive_path = archive_path
+        self.archive = ScrollArchiveWriter(archive_path) if archive_path else None
+        self.frames = queue.Queue(maxsize=queue_size or CrawlerConfig.CAPTURE_QUEUE_SIZE)
+        self.bottom_reached = threading.Event()
+        self.saved_paths = []
+        self.duplicates = []   # [{'path', 'duplicate_of', 'distance', 'skipped'}]
+        self.stage_timings = {stage: [] for stage in self.STAGES}
+        self._timings_lock = threading.Lock()
+        self._blocked_time = 0.0   # UI线程等待后台线程的时间（队列满、结束时等待处理完）
+        self._worker = None
+        self._previous_hash = None
+    
+    def start(self):
+        """启动后台处理线程"""
+        self._worker = threading.Thread(target=self._worker_loop, name="scroll-capture-worker", daemon=True)
+        self._worker.start()
+    
+    def submit(self, filepath, frame):
+        """提交一帧原始截图（BGR数组，UI线程调用，队列满时阻塞以形成背压）"""
+        started = time.perf_counter()
+        self.frames.put((filepath, frame))
+        self._blocked_time += time.perf_counter() - started
+        QUEUE_DEPTH.set(self.frames.qsize(), queue='capture')
+    
+    def finish(self):
+        """等待队列中的帧全部处理完，返回已保存的截图路径（写了滚动截图归档时同时关闭归档）"""
+        started = time.perf_counter()
+        self.frames.put(None)
+        if self._worker:
+            self._worker.join()
+        self._blocked_time += time.perf_counter() - started
+        
+        # 后台处理耗时原本会阻塞UI线程的滚动，扣除UI线程仍在等待后台的部分才是实际省下的时间
+        with self._timings_lock:
+            worker_time = sum(sum(self.stage_timings[stage]) for stage in self.WORKER_STAGES)
+        WAIT_TIME_SAVED.inc(max(0.0, worker_time - self._blocked_time), reason='pipeline')
+        if self.archive is not None:
+            if len(self.archive):
+                self.archive.close()
+                print(f"🗜️ 滚动截图归档: {len(self.archive)} 帧，{self.archive.stats['archive_bytes'] / 1024:.0f}KB")
+            else:
+                self.archive_path = None
+        return list(self.saved_paths)
+    
+    def record(self, stage, seconds):
+        """记录某个阶段的耗时"""
+        with self._timings_lock:
+            self.stage_timings[stage].append(seconds)
+    
+    @contextmanager
+    def stage(self, name):
+        """计时一个阶段，同时写入追踪区间"""
+        started = time.perf_counter()
+        with tracer.span(name):
+            yield
+        self.record(name, time.perf_counter() - started)
+    
+    def get_stage_summary(self):
+        """获取各阶段耗时汇总"""
+        with self._timings_lock:
+            return {
+                stage: {
+                    'count': len(timings),
+                    'total': round(sum(timings), 3),
+                    'avg': round(sum(timings) / len(timings), 3) if timings else 0
+                }
+                for stage, timings in self.stage_timings.items()
+            }
+    
+    def print_stage_summary(self):
+        """打印各阶段耗时"""
+        print("⏱️ 滚动截图各阶段耗时:")
+        for stage, summary in self.get_stage_summary().items():
+            if summary['count']:
+                print(f"   {stage:<9} 次数 {summary['count']:>3}  总计 {summary['total']:.3f}s  平均 {summary['avg']:.3f}s")
+    
+    def _worker_loop(self):
+        """后台处理线程：哈希 -> 触底检测 -> 近重复检测 -> 编码保存 -> 验证 -> 文字提取 -> 写归档"""
+        while True:
+            item = self.frames.get()
+            QUEUE_DEPTH.set(self.frames.qsize(), queue='capture')
+            if item is None:
+                break
+            
+            # 触底之后UI线程可能已经多抓了一帧，直接丢弃
+            if self.bottom_reached.is_set():
+                continue
+            
+            filepath, frame = item
+            try:
+                self._process_frame(filepath, frame)
+            except Exception as e:
+                print(f"⚠️ 处理截图失败: {filepath} - {e}")
+    
+    def _process_frame(self, filepath, frame):
+        """处理单帧截图"""
+        with self.stage('hash'):
+            current_hash = self._calculate_frame_hash(frame)
+            phash = ScreenshotUtils.calculate_perceptual_hash(frame) if self.hash_index is not None else None
+        
+        # 连续两帧内容相同说明已经滚动到底部
+        if self._previous_hash and current_hash == self._previous_hash:
+            print("🏁 检测到滚动触底，停止截图")
+            self.bottom_reached.set()
+            return
+        self._previous_hash = current_hash
+        
+        # 与其他按钮页面或之前运行保存的截图近乎相同（同一页面的滚动帧、本帧将覆盖的旧文件不算）
+        duplicate = None
+        if self.hash_index is not None:
+            duplicate = self.hash_index.find_duplicate(phash, exclude=self.saved_paths + [filepath])
+        skip = duplicate is not None and CrawlerConfig.PHASH_SKIP_DUPLICATES
+        if duplicate:
+            distance, original = duplicate
+            self.duplicates.append({'path': filepath, 'duplicate_of': original, 'distance': distance, 'skipped': skip})
+            DUPLICATE_FRAMES.inc(action='skipped' if skip else 'flagged')
+            print(f"♻️ 截图与已保存截图近乎相同（距离 {distance}）: {original}")
+        
+        if skip:
+            # 不再写盘，页面结果直接引用已保存的截图
+            filepath = original
+        else:
+            with self.stage('encode'):
+                save_frame(frame, filepath, self.blob_store)
+            if self.hash_index is not None:
+                self.hash_index.add(phash, filepath)
+            
+            with self.stage('validate'):
+                self.validator.compare_screenshot_with_target(filepath)
+        
+        if self.text_extractor:
+            with self.stage('ocr'):
+                self.text_extractor.add_frame(frame)
+        
+        self.saved_paths.append(filepath)
+        print(f"✅ 滚动截图 {len(self.saved_paths)} 完成")
+        
+        # 近重复而跳过写盘的帧同样写入归档，归档中的帧与滚动顺序一一对应
+        if self.archive is not None:
+            with self.stage('archive'):
+                self._archive_frame(frame)
+    
+    def _archive_frame(self, frame):
+        """追加一帧到滚动截图归档；写入失败时放弃本页面的归档，不影响截图本身"""
+        try:
+            self.archive.add_frame(frame)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 写入滚动截图归档失败，放弃归档: {e}")
+            self.archive.close()
+            if os.path.exists(self.archive_path):
+                os.remove(self.archive_path)
+            self.archive = None
+            self.archive_path = None
+    
+    def _calculate_frame_hash(self, frame):
+        """计算截图内容哈希，用于触底检测"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        img_resized = cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA)
+        return hashlib.md5(img_resized.tobytes()).hexdigest()
\ No newline at end of file
@@ -6,13 +6,20 @@
 """
 
 import os
+import re
 import time
-import pyautogui
-from PIL import Image, ImageGrab
 from config import CrawlerConfig
+from capture_manager import get_capture_backend, grab_bounds
+from tracer import tracer
+from metrics import FRAMES_CAPTURED, LAST_PROGRESS, DUPLICATE_FRAMES
+from input_scheduler import get_input_scheduler
 from .utils import ScreenshotUtils
 from .detection_strategy import DetectionStrategy
 from .validator import ScreenshotValidator
+from .capture_pipeline import ScrollCapturePipeline
+from .hash_index import get_hash_index
+from .blob_store import get_blob_store, save_frame
+from .frame_ring import get_frame_ring, dump_frames
 
 
 class ScreenshotManager:
@@ -28,6 +35,25 @@ class ScreenshotManager:
         # 清理标志位，确保只在第一次激活时清理
         self._screenshots_cleaned = False
         
+        # 最近一次滚动截图流水线的各阶段耗时
+        self.last_pipeline_stats = {}
+        
+        # 截图近重复索引（跨按钮、跨运行共享），以及最近一次截图中的近重复记录
+        self.hash_index = get_hash_index()
+        self.last_duplicates = []
+        
+        # 截图内容寻址存储（未启用时为None，截图直接写入按钮目录）
+        self.blob_store = get_blob_store()
+        
+        # 最近一次滚动截图写出的增量归档路径（未启用或没有截到帧时为None）
+        self.last_archive = None
+        
+        # 原始帧环形缓冲区（未启用时为None），保留最近抓到的原始帧
+        self.frame_ring = get_frame_ring()
+        
+        # 滚动时的聚焦点击和滚动操作经由输入调度器
+        self.input = get_input_scheduler()
+        
         # 为了向后兼容和测试，提供对各个检测器的直接访问
         self.system_detector = self.detection_strategy.system_detector
         self.edge_detector = self.detection_strategy.edge_detector
@@ -44,13 +70,16 @@ class ScreenshotManager:
             self._screenshots_cleaned = True
     
     def start_screenshot_session(self):
-        """启动截图会话，清理旧截图"""
+        """启动截图会话，清理旧截图并回收不再被引用的画面"""
         self._clean_previous_screenshots()
+        if self.blob_store is not None:
+            self.blob_store.collect_garbage()
         print("📸 截图会话已启动")
     
     def detect_mini_program_content_bounds(self):
         """智能检测小程序内容边界（多重检测策略）"""
-        return self.detection_strategy.detect_miniprogram_bounds()
+        with tracer.span('bounds'):
+            return self.detection_strategy.detect_miniprogram_bounds()
     
     def take_miniprogram_screenshot(self, filename="screenshot.png"):
         """拍摄小程序截图"""
@@ -66,49 +95,69 @@ class ScreenshotManager:
             print(f"🎯 使用检测到的区域进行截图: {self.utils.format_bounds_info(bounds)}")
             
             # 拍摄截图（不再扩展边界，使用精确检测结果）
-            screenshot = ImageGrab.grab(bbox=(
-                bounds['x'],
-                bounds['y'],
-                bounds['x'] + bounds['width'],
-                bounds['y'] + bounds['height']
-            ))
+            with tracer.span('capture'):
+                screenshot = grab_bounds(bounds)
+            FRAMES_CAPTURED.inc(source='screenshot')
+            self._record_frame(screenshot, (bounds['x'], bounds['y']), 'screenshot')
             
             # 保存截图 - 使用目录管理器或默认目录
-            if self.directory_manager:
-                filepath = self.directory_manager.get_button_screenshot_path(filename)
-            else:
-                filepath = os.path.join(CrawlerConfig.SCREENSHOTS_DIR, filename)
+            filepath = self._get_screenshot_path(filename)
+            self.last_duplicates = []
+            
+            phash = self.utils.calculate_perceptual_hash(screenshot) if self.hash_index is not None else None
+            duplicate = self.hash_index.find_duplicate(phash, exclude=(filepath,)) if self.hash_index is not None else None
+            if duplicate:
+                distance, original = duplicate
+                skip = CrawlerConfig.PHASH_SKIP_DUPLICATES
+                self.last_duplicates.append({'path': filepath, 'duplicate_of': original, 'distance': distance, 'skipped': skip})
+                DUPLICATE_FRAMES.inc(action='skipped' if skip else 'flagged')
+                print(f"♻️ 截图与已保存截图近乎相同（距离 {distance}）: {original}")
+                if skip:
+                    return original
             
-            screenshot.save(filepath)
+            with tracer.span('encode'):
+                save_frame(screenshot, filepath, self.blob_store)
             print(f"📸 截图已保存: {filename}")
+            if self.hash_index is not None:
+                self.hash_index.add(phash, filepath)
             
             # 自动验证截图质量
             self.validator.compare_screenshot_with_target(filepath)
             
             return filepath
-            
+        
         except Exception as e:
             print(f"❌ 截图失败: {e}")
             import traceback
             traceback.print_exc()
             return None
     
-    def take_scrolling_screenshot(self, title, scroll_pause_time=2, max_scrolls=10):
-        """拍摄滚动截图（优化版本）"""
+    def take_scrolling_screenshot(self, title, scroll_pause_time=2, max_scrolls=10, text_extractor=None):
+        """拍摄滚动截图（流水线版本）
+        
+        UI线程只负责滚动和抓取原始帧，哈希、编码保存、验证和文字提取在后台线程完成。
+        传入text_extractor时，每张新截图只对新露出的区域做增量文字识别
+        """
         print(f"\n📸 开始拍摄滚动截图: {title}")
         
-        screenshots = []
-        scroll_count = 0
-        previous_screenshot_hash = None
+        archive_path = self._get_screenshot_path(f"{title}_scroll.scrl") if CrawlerConfig.SCROLL_ARCHIVE_ENABLED else None
+        pipeline = ScrollCapturePipeline(self.validator, text_extractor, hash_index=self.hash_index,
+                                         blob_store=self.blob_store, archive_path=archive_path)
         
         try:
-            # 检测小程序区域
+            # 检测小程序区域（同一页面滚动过程中区域不变，只检测一次）
             bounds = self.detect_mini_program_content_bounds()
             if not bounds:
                 print("❌ 无法检测到小程序区域，放弃滚动截图")
                 return []
             
             print(f"📐 小程序区域: {self.utils.format_bounds_info(bounds)}")
+            bbox = (
+                bounds['x'],
+                bounds['y'],
+                bounds['x'] + bounds['width'],
+                bounds['y'] + bounds['height']
+            )
             
             # 计算安全的滚动区域（避免点击功能按钮）
             safe_scroll_point = self.utils.calculate_safe_scroll_point(
@@ -119,49 +168,77 @@ class ScreenshotManager:
             scroll_distance = max(3, (bounds['height'] - 40) // 100)  # 转换为滚动单位，最小为3
             print(f"📏 动态滚动距离: {scroll_distance} (基于窗口高度 {bounds['height']}px)")
             
-            while scroll_count < max_scrolls:
-                # 拍摄当前屏幕
-                filename = f"{title}_scroll_{scroll_count + 1}.png"
-                screenshot_path = self.take_miniprogram_screenshot(filename)
+            backend = get_capture_backend()
+            pipeline.start()
+            
+            for scroll_count in range(max_scrolls):
+                # 后台线程检测到触底后停止滚动
+                if pipeline.bottom_reached.is_set():
+                    break
                 
-                if screenshot_path:
-                    # 计算截图内容哈希，用于触底检测
-                    current_hash = self._calculate_screenshot_hash(screenshot_path)
-                    
-                    # 检查是否触底（连续两次截图内容相同）
-                    if previous_screenshot_hash and current_hash == previous_screenshot_hash:
-                        print("🏁 检测到滚动触底，停止截图")
-                        break
-                    
-                    screenshots.append(screenshot_path)
-                    print(f"✅ 滚动截图 {scroll_count + 1} 完成")
-                    previous_screenshot_hash = current_hash
-                else:
-                    print(f"⚠️ 滚动截图 {scroll_count + 1} 失败")
+                # 抓取原始帧，交给后台线程处理
+                with pipeline.stage('capture'):
+                    screenshot = backend.grab(bbox)
+                FRAMES_CAPTURED.inc(source='scroll')
+                self._record_frame(screenshot, bbox[:2], 'scroll')
+                LAST_PROGRESS.set(time.time())
+                
+                filename = f"{title}_scroll_{scroll_count + 1}.png"
+                pipeline.submit(self._get_screenshot_path(filename), screenshot)
                 
                 # 检查是否还有更多内容
                 if scroll_count < max_scrolls - 1:
                     # 在小程序安全区域进行滚动
                     print(f"📜 在安全区域滚动: ({safe_scroll_point['x']}, {safe_scroll_point['y']}) 距离: {scroll_distance}")
-                    pyautogui.click(safe_scroll_point['x'], safe_scroll_point['y'])
-                    time.sleep(0.3)
+                    with pipeline.stage('scroll'):
+                        # 滚动前聚焦滚动区域（窗口刚被点击过时调度器会跳过），向下滚动（使用动态距离）
+                        self.input.focus(safe_scroll_point['x'], safe_scroll_point['y'])
+                        self.input.scroll(-scroll_distance, safe_scroll_point['x'], safe_scroll_point['y'])
                     
-                    # 向下滚动（使用动态距离）
-                    pyautogui.scroll(-scroll_distance, x=safe_scroll_point['x'], y=safe_scroll_point['y'])
-                    time.sleep(scroll_pause_time)
-                
-                scroll_count += 1
-            
-            # 注意：不在这里点击返回按钮，让主流程控制返回操作
-            print(f"📸 滚动截图完成，共 {len(screenshots)} 张图片")
-            print(f"💡 滚动截图完成，等待主流程控制返回操作")
-            return screenshots
-            
+                    with pipeline.stage('wait'):
+                        self.input.wait(scroll_pause_time)
+        
         except Exception as e:
             print(f"❌ 滚动截图失败: {e}")
             import traceback
             traceback.print_exc()
-            return screenshots
+        
+        screenshots = pipeline.finish()
+        self.last_pipeline_stats = pipeline.get_stage_summary()
+        self.last_duplicates = list(pipeline.duplicates)
+        self.last_archive = pipeline.archive_path
+        pipeline.print_stage_summary()
+        
+        # 注意：不在这里点击返回按钮，让主流程控制返回操作
+        print(f"📸 滚动截图完成，共 {len(screenshots)} 张图片")
+        print(f"💡 滚动截图完成，等待主流程控制返回操作")
+        return screenshots
+    
+    def _record_frame(self, frame, origin, source):
+        """把抓到的原始帧写入环形缓冲区（不编码，只做一次内存拷贝）"""
+        if self.frame_ring is not None:
+            self.frame_ring.write(frame, origin=origin, source=source)
+    
+    def dump_recent_frames(self, label):
+        """把环形缓冲区中最近 FRAME_RING_DUMP_SECONDS 秒的原始帧导出到 frame_dumps/<时间>_<标签>/，返回导出目录"""
+        if self.frame_ring is None or not CrawlerConfig.FRAME_RING_DUMP_SECONDS:
+            return None
+        
+        safe_label = re.sub(r'[<>:"/\\|?*\s]', '_', label).strip('_') or "frames"
+        output_dir = os.path.join(CrawlerConfig.OUTPUT_DIR, "frame_dumps", f"{time.strftime('%Y%m%d_%H%M%S')}_{safe_label}")
+        try:
+            count = dump_frames(self.frame_ring.path, output_dir, last_seconds=CrawlerConfig.FRAME_RING_DUMP_SECONDS)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 导出最近的原始帧失败: {e}")
+            return None
+        print(f"🎞️ 已导出出错前 {count} 帧原始画面: {output_dir}")
+        return output_dir
+    
+    def _get_screenshot_path(self, filename):
+        """获取截图保存路径 - 使用目录管理器或默认目录"""
+        if self.directory_manager:
+            return self.directory_manager.get_button_screenshot_path(filename)
+        return os.path.join(CrawlerConfig.SCREENSHOTS_DIR, filename)
     
     def _calculate_screenshot_hash(self, screenshot_path):
         """计算截图内容哈希，用于触底检测"""
@@ -180,7 +257,7 @@ class ScreenshotManager:
             hash_value = hashlib.md5(img_bytes).hexdigest()
             
             return hash_value
-            
+        
         except Exception as e:
             print(f"⚠️ 计算截图哈希失败: {e}")
-            return None 
\ No newline at end of file
+            return None
\ No newline at end of file
@@ -22,16 +22,20 @@ class DetectionStrategy:
         self.edge_detector = EdgeDetector(window_manager)
         self.content_detector = ContentDetector(window_manager)
         self.validator = ScreenshotValidator()
+        # 最近一次检测实际采用的方法：system / content / edge / fallback
+        self.last_method = None
     
     def detect_miniprogram_bounds(self):
         """智能检测小程序内容边界（多重检测策略）"""
         print("\n🔍 开始智能检测小程序内容边界...")
+        self.last_method = None
         
         # 方法1: 系统窗口检测（最精确，类似Snipaste）
         print("\n🏆 尝试方法1: 系统级窗口检测")
         bounds = self.system_detector.detect_miniprogram_window()
         if bounds and self.validator.validate_miniprogram_bounds(bounds):
             print(f"✅ 系统窗口检测成功，直接使用系统检测结果")
+            self.last_method = 'system'
             return bounds
         
         # 如果没有检测到微信窗口，尝试其他方法
@@ -46,6 +50,7 @@ class DetectionStrategy:
         bounds = self.content_detector.detect_miniprogram_content()
         if bounds and self.validator.validate_miniprogram_bounds(bounds):
             print(f"✅ 内容密度检测成功")
+            self.last_method = 'content'
             return bounds
         
         # 方法3: 边缘检测方法
@@ -53,10 +58,12 @@ class DetectionStrategy:
         bounds = self.edge_detector.detect_miniprogram_edges()
         if bounds and self.validator.validate_miniprogram_bounds(bounds):
             print(f"✅ 边缘检测成功")
+            self.last_method = 'edge'
             return bounds
         
         # 所有方法都失败，使用兜底方案
         print("\n⚠️ 所有智能检测方法都失败，使用保守兜底方案")
+        self.last_method = 'fallback'
         return self._fallback_detection()
     
     def _fallback_detection(self):
@@ -6,10 +6,8 @@
 """
 
 import os
-import cv2
-import numpy as np
-from PIL import Image, ImageGrab
 from config import CrawlerConfig
+from capture_manager import grab_bounds
 from .utils import ScreenshotUtils
 from .edge_analysis import EdgeAnalyzer
 from .contour_processor import ContourProcessor
@@ -32,15 +30,7 @@ class EdgeDetector:
         try:
             # 截取整个微信窗口
             wechat_bounds = self.window_manager.wechat_window_bounds
-            full_screenshot = ImageGrab.grab(bbox=(
-                wechat_bounds['x'],
-                wechat_bounds['y'],
-                wechat_bounds['x'] + wechat_bounds['width'],
-                wechat_bounds['y'] + wechat_bounds['height']
-            ))
-            
-            # 转换为OpenCV格式
-            screenshot_cv = cv2.cvtColor(np.array(full_screenshot), cv2.COLOR_RGB2BGR)
+            screenshot_cv = grab_bounds(wechat_bounds)
             height, width = screenshot_cv.shape[:2]
             
             # 保存原始图像
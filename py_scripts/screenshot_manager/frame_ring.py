@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原始帧环形缓冲区
+截图路径抓到的每一帧（BGR原始像素，不做PNG编码）连同时间戳写入固定大小的内存映射文件，新帧覆盖最旧的帧，
+始终保留最近一段时间的画面；其他进程和工具直接映射同一文件零拷贝读取，出错时可把任意时间窗口的帧导出为PNG
+
+文件布局（小端序）：
+    文件头   "FRNG" 版本 保留 索引槽数 数据区位置 数据区大小 下一个帧序号 下一个写入位置
+    帧索引   每槽一条：帧序号 时间戳 数据位置 高 宽 通道数 区域左上角x/y 来源（帧序号为0表示空槽）
+    数据区   各帧像素连续存放，写到末尾放不下时回到数据区开头
+写入帧时先把将被覆盖的帧的序号清零再写像素，最后写入新帧的序号；读取方复制像素前后帧序号不变即说明读到的是完整的帧
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime
+import numpy as np
+from config import CrawlerConfig
+
+try:
+    import fcntl
+except ImportError:     # Windows没有fcntl，不做多写入进程检测
+    fcntl = None
+
+MAGIC = b"FRNG"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIQQQQ")       # 标记, 版本, 保留, 索引槽数, 数据区位置, 数据区大小, 下一个帧序号, 下一个写入位置
+_ENTRY = struct.Struct("<QdQIIIii16s")      # 帧序号, 时间戳, 数据位置, 高, 宽, 通道数, 左上角x, 左上角y, 来源
+_SEQ = struct.Struct("<Q")
+_INDEX_OFFSET = 64
+_PAGE = 4096
+
+
+def _layout(slots):
+    """帧索引之后的数据区按页对齐"""
+    return (_INDEX_OFFSET + slots * _ENTRY.size + _PAGE - 1) // _PAGE * _PAGE
+
+
+def _decode_entry(slot, values):
+    seq, timestamp, offset, height, width, channels, left, top, source = values
+    return {
+        'slot': slot, 'seq': seq, 'timestamp': timestamp, 'offset': offset,
+        'shape': (height, width, channels) if channels > 1 else (height, width),
+        'origin': (left, top), 'source': source.rstrip(b'\0').decode('utf-8', 'replace')
+    }
+
+
+class FrameRing:
+    """原始帧环形缓冲区写入类（进程内线程安全；同一文件只允许一个写入进程）"""
+    
+    def __init__(self, path, size_bytes, slots):
+        self.path = path
+        self.slots = slots
+        self.data_offset = _layout(slots)
+        self.data_size = size_bytes
+        self.stats = {'frames': 0, 'bytes': 0, 'too_large': 0}
+        self._lock = threading.Lock()
+        self._live = {}     # 槽 -> (数据位置, 结束位置)
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            total = self.data_offset + size_bytes
+            reuse = os.fstat(self._fd).st_size == total
+            if not reuse:
+                os.ftruncate(self._fd, total)
+            self.mm = mmap.mmap(self._fd, total)
+        except OSError:
+            os.close(self._fd)
+            raise
+        
+        if reuse and self._load_existing():
+            return
+        # 新建或参数变化：清空索引（ftruncate后数据区为稀疏文件，不占磁盘）
+        self.mm[_INDEX_OFFSET:self.data_offset] = bytes(self.data_offset - _INDEX_OFFSET)
+        self.next_seq, self.write_pos = 1, 0
+        self._write_header()
+    
+    def _load_existing(self):
+        """沿用同样参数的已有文件（保留上次运行崩溃前的帧，序号继续递增）"""
+        magic, version, _, slots, data_offset, data_size, next_seq, write_pos = _HEADER.unpack_from(self.mm, 0)
+        if (magic, version, slots, data_offset, data_size) != (MAGIC, VERSION, self.slots, self.data_offset, self.data_size):
+            return False
+        self.next_seq, self.write_pos = next_seq, write_pos
+        for slot in range(slots):
+            entry = _decode_entry(slot, _ENTRY.unpack_from(self.mm, _INDEX_OFFSET + slot * _ENTRY.size))
+            if entry['seq']:
+                self._live[slot] = (entry['offset'], entry['offset'] + int(np.prod(entry['shape'])))
+        return True
+    
+    def _write_header(self):
+        _HEADER.pack_into(self.mm, 0, MAGIC, VERSION, 0, self.slots, self.data_offset, self.data_size,
+                          self.next_seq, self.write_pos)
+    
+    def _invalidate(self, slot):
+        _SEQ.pack_into(self.mm, _INDEX_OFFSET + slot * _ENTRY.size, 0)
+        self._live.pop(slot, None)
+    
+    def write(self, frame, origin=(0, 0), source='', timestamp=None):
+        """写入一帧（uint8的BGR或灰度数组），返回帧序号；帧比整个数据区还大时不写入，返回None"""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        size = frame.nbytes
+        if size > self.data_size:
+            self.stats['too_large'] += 1
+            return None
+        
+        with self._lock:
+            seq = self.next_seq
+            slot = seq % self.slots
+            position = self.write_pos if self.write_pos + size <= self.data_size else 0
+            
+            # 先让将被覆盖的帧失效，读取方不会把写了一半的像素当成旧帧
+            self._invalidate(slot)
+            for other, (start, end) in list(self._live.items()):
+                if start < position + size and position < end:
+                    self._invalidate(other)
+            
+            target = np.frombuffer(self.mm, dtype=np.uint8, count=size, offset=self.data_offset + position)
+            target[:] = frame.reshape(-1)
+            
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 1
+            _ENTRY.pack_into(self.mm, _INDEX_OFFSET + slot * _ENTRY.size, 0,
+                             timestamp if timestamp is not None else datetime.now().timestamp(), position,
+                             height, width, channels, int(origin[0]), int(origin[1]), source.encode('utf-8')[:16])
+            _SEQ.pack_into(self.mm, _INDEX_OFFSET + slot * _ENTRY.size, seq)
+            self._live[slot] = (position, position + size)
+            
+            self.next_seq, self.write_pos = seq + 1, position + size
+            self._write_header()
+            self.stats['frames'] += 1
+            self.stats['bytes'] += size
+        return seq
+    
+    def close(self):
+        with self._lock:
+            if self.mm is not None:
+                self.mm.close()
+                os.close(self._fd)
+                self.mm = None
+
+
+class FrameRingReader:
+    """原始帧环形缓冲区读取类（只读映射，可在写入进程运行时读取）"""
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.slots, self.data_offset, self.data_size, _, _ = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError("不是原始帧环形缓冲区文件")
+        if version != VERSION:
+            raise ValueError(f"不支持的原始帧环形缓冲区版本: {version}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def close(self):
+        self.mm.close()
+    
+    def _seq(self, slot):
+        return _SEQ.unpack_from(self.mm, _INDEX_OFFSET + slot * _ENTRY.size)[0]
+    
+    def entries(self, since=None, until=None):
+        """当前保留的帧（按帧序号排序），可按时间戳范围筛选"""
+        entries = []
+        for slot in range(self.slots):
+            entry = _decode_entry(slot, _ENTRY.unpack_from(self.mm, _INDEX_OFFSET + slot * _ENTRY.size))
+            if not entry['seq'] or entry['seq'] != self._seq(slot):
+                continue
+            if (since is None or entry['timestamp'] >= since) and (until is None or entry['timestamp'] <= until):
+                entries.append(entry)
+        return sorted(entries, key=lambda entry: entry['seq'])
+    
+    def view(self, entry):
+        """零拷贝只读视图；写入方之后可能覆盖，使用完后用 is_current 确认"""
+        size = int(np.prod(entry['shape']))
+        return np.frombuffer(self.mm, dtype=np.uint8, count=size,
+                             offset=self.data_offset + entry['offset']).reshape(entry['shape'])
+    
+    def is_current(self, entry):
+        """帧是否仍未被覆盖"""
+        return self._seq(entry['slot']) == entry['seq']
+    
+    def read(self, entry):
+        """复制一帧；读取期间已被覆盖时返回None"""
+        frame = self.view(entry).copy()
+        return frame if self.is_current(entry) else None
+
+
+def dump_frames(ring_path, output_dir, last_seconds=None, seq_range=None, since=None, until=None):
+    """把环形缓冲区中的一段帧导出为PNG（frame_<帧序号>.png，文件名顺序即抓取顺序）和 frames.json，返回导出的帧数
+    
+    last_seconds: 以最新一帧为终点往前的秒数；seq_range: (起始帧序号, 结束帧序号)；since/until: 时间戳范围
+    """
+    import cv2
+    
+    with FrameRingReader(ring_path) as reader:
+        entries = reader.entries(since=since, until=until)
+        if entries and last_seconds is not None:
+            newest = entries[-1]['timestamp']
+            entries = [entry for entry in entries if entry['timestamp'] >= newest - last_seconds]
+        if seq_range is not None:
+            entries = [entry for entry in entries if seq_range[0] <= entry['seq'] <= seq_range[1]]
+        
+        os.makedirs(output_dir, exist_ok=True)
+        exported = []
+        for entry in entries:
+            frame = reader.read(entry)
+            if frame is None:
+                continue
+            filename = f"frame_{entry['seq']:08d}.png"
+            cv2.imwrite(os.path.join(output_dir, filename), frame)
+            exported.append({
+                'seq': entry['seq'], 'file': filename, 'timestamp': entry['timestamp'],
+                'time': datetime.fromtimestamp(entry['timestamp']).isoformat(timespec='milliseconds'),
+                'origin': list(entry['origin']), 'shape': list(entry['shape']), 'source': entry['source']
+            })
+    
+    with open(os.path.join(output_dir, "frames.json"), 'w', encoding='utf-8') as f:
+        json.dump({'ring': os.path.abspath(ring_path), 'frames': exported}, f, ensure_ascii=False, indent=2)
+    return len(exported)
+
+
+_rings = {}
+_rings_lock = threading.Lock()
+
+
+def get_frame_ring(path=None):
+    """获取原始帧环形缓冲区（同一文件在进程内共用一个对象），未启用或已被其他进程占用时返回None"""
+    if not CrawlerConfig.FRAME_RING_ENABLED:
+        return None
+    
+    path = path or CrawlerConfig.FRAME_RING_FILE
+    with _rings_lock:
+        if path not in _rings:
+            try:
+                _rings[path] = FrameRing(path, CrawlerConfig.FRAME_RING_SIZE_MB * 1024 * 1024, CrawlerConfig.FRAME_RING_SLOTS)
+            except OSError as e:
+                print(f"⚠️ 原始帧环形缓冲区不可用（可能有其他爬虫进程正在写入）: {e}")
+                _rings[path] = None
+        return _rings[path]
\ No newline at end of file
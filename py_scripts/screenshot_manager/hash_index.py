@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+感知哈希近重复索引
+保存64位感知哈希，按汉明距离半径查询"见过类似的截图吗"，不再逐个比较全部哈希；
+持久化为追加写入的索引文件（每行 "哈希<TAB>截图路径"），跨按钮、跨运行识别近乎相同的截图
+
+两种索引结构（查询接口相同，benchmarks/phash_index_benchmark.py 可对比）：
+    BKTree              按三角不等式剪枝，半径很小时最快
+    MultiIndexHashTable 把哈希切成4段16位分别建表，按鸽巢原理只查邻近分段，半径到8仍远快于线性扫描
+"""
+
+import os
+import threading
+from functools import lru_cache
+from config import CrawlerConfig
+
+HASH_BITS = 64
+
+# Python 3.10以下没有int.bit_count
+_popcount = getattr(int, 'bit_count', None) or (lambda value: bin(value).count('1'))
+
+
+class BKTree:
+    """BK树：每个节点为 [哈希, 值列表, {与子节点的距离: 子节点}]，距离为0的哈希合并到同一节点"""
+    
+    def __init__(self):
+        self.root = None
+        self.size = 0
+        self.last_visits = 0    # 最近一次查询比较过的哈希数
+    
+    def __len__(self):
+        return self.size
+    
+    def insert(self, hash_value, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [hash_value, [value], {}]
+            return
+        
+        node = self.root
+        while True:
+            distance = _popcount(node[0] ^ hash_value)
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, [value], {}]
+                return
+            node = child
+    
+    def query(self, hash_value, radius):
+        results = []
+        visits = 0
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            visits += 1
+            distance = _popcount(node[0] ^ hash_value)
+            if distance <= radius:
+                results.extend((distance, node[0], value) for value in node[1])
+            
+            # 三角不等式：只有与当前节点距离在 [d-r, d+r] 内的子树可能含有结果
+            low, high = distance - radius, distance + radius
+            for edge, child in node[2].items():
+                if low <= edge <= high:
+                    stack.append(child)
+        
+        self.last_visits = visits
+        return results
+    
+    def items(self):
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            for value in node[1]:
+                yield node[0], value
+            stack.extend(node[2].values())
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(bits, max_flips):
+    """bits位内翻转不超过max_flips位的全部掩码"""
+    masks = {0}
+    for _ in range(max_flips):
+        masks |= {mask | (1 << bit) for mask in masks for bit in range(bits)}
+    return tuple(sorted(masks))
+
+
+class MultiIndexHashTable:
+    """多索引哈希表：64位哈希切成CHUNKS段，每段一张 {分段值: [条目序号]} 表
+    
+    两个哈希距离不超过r时，至少有一段的距离不超过 r // CHUNKS（鸽巢原理），
+    因此只需在每张表里查找与查询分段距离不超过 r // CHUNKS 的分段值，再逐个核对候选
+    """
+    
+    CHUNKS = 4
+    CHUNK_BITS = HASH_BITS // CHUNKS
+    CHUNK_MASK = (1 << CHUNK_BITS) - 1
+    
+    def __init__(self):
+        self.tables = [{} for _ in range(self.CHUNKS)]
+        self.entries = []       # [(哈希, 值)]，序号即条目ID
+        self.last_visits = 0
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def insert(self, hash_value, value):
+        entry_id = len(self.entries)
+        self.entries.append((hash_value, value))
+        for chunk_index, table in enumerate(self.tables):
+            chunk = (hash_value >> (chunk_index * self.CHUNK_BITS)) & self.CHUNK_MASK
+            table.setdefault(chunk, []).append(entry_id)
+    
+    def query(self, hash_value, radius):
+        masks = _flip_masks(self.CHUNK_BITS, radius // self.CHUNKS)
+        candidates = set()
+        for chunk_index, table in enumerate(self.tables):
+            chunk = (hash_value >> (chunk_index * self.CHUNK_BITS)) & self.CHUNK_MASK
+            for mask in masks:
+                entry_ids = table.get(chunk ^ mask)
+                if entry_ids:
+                    candidates.update(entry_ids)
+        
+        self.last_visits = len(candidates)
+        results = []
+        for entry_id in candidates:
+            candidate, value = self.entries[entry_id]
+            distance = _popcount(candidate ^ hash_value)
+            if distance <= radius:
+                results.append((distance, candidate, value))
+        return results
+    
+    def items(self):
+        return iter(self.entries)
+
+
+INDEX_STRUCTURES = {
+    'bktree': BKTree,
+    'mih': MultiIndexHashTable
+}
+
+
+class PerceptualHashIndex:
+    """感知哈希近重复索引类（线程安全，可持久化）"""
+    
+    def __init__(self, index_file=None, structure=None):
+        self.index_file = index_file
+        self.structure = structure or CrawlerConfig.PHASH_INDEX_STRUCTURE
+        self.store = INDEX_STRUCTURES[self.structure]()
+        # 截图路径 -> 最新的哈希；同一路径被重新截图覆盖后，旧哈希的条目留在索引结构中但不再返回
+        self._latest = {}
+        self._lock = threading.Lock()
+        if index_file:
+            self._load()
+    
+    def __len__(self):
+        return len(self.store)
+    
+    @property
+    def last_visits(self):
+        """最近一次查询逐个核对过的哈希数"""
+        return self.store.last_visits
+    
+    def _load(self):
+        """从索引文件恢复，丢弃截图已被删除的条目；同一路径被重新截图覆盖时只保留最后一次的哈希"""
+        if not os.path.exists(self.index_file):
+            return
+        
+        latest = {}
+        lines = 0
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    hash_hex, _, path = line.rstrip('\n').partition('\t')
+                    lines += 1
+                    latest.pop(path, None)
+                    latest[path] = int(hash_hex, 16)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 截图近重复索引读取失败，忽略旧索引: {e}")
+            return
+        
+        for path, hash_value in latest.items():
+            if path and os.path.exists(path):
+                self._insert(hash_value, path)
+        
+        dropped = lines - len(self.store)
+        if dropped:
+            self._rewrite()
+        print(f"🗂️ 已加载截图近重复索引: {len(self.store)} 条（清理失效条目 {dropped} 条）")
+    
+    def _rewrite(self):
+        """按当前内容重写索引文件"""
+        try:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                for hash_value, value in self.store.items():
+                    if self._is_current(hash_value, value):
+                        f.write(f"{hash_value:016x}\t{value}\n")
+        except OSError as e:
+            print(f"⚠️ 截图近重复索引保存失败: {e}")
+    
+    def _append(self, hash_value, value):
+        """追加一条记录到索引文件"""
+        try:
+            index_dir = os.path.dirname(self.index_file)
+            if index_dir:
+                os.makedirs(index_dir, exist_ok=True)
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(f"{hash_value:016x}\t{value}\n")
+        except OSError as e:
+            print(f"⚠️ 截图近重复索引保存失败: {e}")
+    
+    def _insert(self, hash_value, value):
+        if isinstance(value, str):
+            if self._latest.get(value) == hash_value:
+                return
+            self._latest[value] = hash_value
+        self.store.insert(hash_value, value)
+    
+    def _is_current(self, hash_value, value):
+        """条目是否仍有效（值为截图路径时，该路径之后没有被另一个哈希覆盖）"""
+        return not isinstance(value, str) or self._latest.get(value) == hash_value
+    
+    def add(self, hash_value, value=None, persist=True):
+        """加入一个哈希，值为截图路径时取代该路径之前的条目；有索引文件且persist为True时同时追加写盘（值需为不含换行的字符串）"""
+        with self._lock:
+            self._insert(hash_value, value)
+            if persist and self.index_file:
+                self._append(hash_value, value)
+    
+    def query(self, hash_value, radius):
+        """返回汉明距离不超过radius的全部有效条目 [(距离, 哈希, 值)]，按距离升序"""
+        with self._lock:
+            results = [result for result in self.store.query(hash_value, radius) if self._is_current(result[1], result[2])]
+        results.sort(key=lambda result: result[0])
+        return results
+    
+    def nearest(self, hash_value, radius):
+        """返回半径内最近的条目 (距离, 哈希, 值)，没有时返回None"""
+        results = self.query(hash_value, radius)
+        return results[0] if results else None
+    
+    def find_duplicate(self, hash_value, radius=None, exclude=()):
+        """查找磁盘上仍存在的近重复截图，返回 (距离, 截图路径)，没有时返回None"""
+        radius = CrawlerConfig.PHASH_DUPLICATE_DISTANCE if radius is None else radius
+        for distance, _, path in self.query(hash_value, radius):
+            if path not in exclude and os.path.exists(path):
+                return distance, path
+        return None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_hash_index(index_file=None):
+    """获取截图近重复索引（同一索引文件在进程内只加载一次），未启用时返回None"""
+    if not CrawlerConfig.PHASH_INDEX_ENABLED:
+        return None
+    
+    index_file = index_file or CrawlerConfig.PHASH_INDEX_FILE
+    with _indexes_lock:
+        index = _indexes.get(index_file)
+        if index is None:
+            index = _indexes[index_file] = PerceptualHashIndex(index_file)
+        return index
\ No newline at end of file
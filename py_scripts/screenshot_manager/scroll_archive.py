@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动截图序列归档
+同一页面相邻的滚动截图大部分是上一帧整体上移后的像素：归档只保存第一帧（关键帧），
+之后每帧只保存滚动偏移和新露出的底部行（PNG压缩），预测不准的像素另存为压缩残差，解码结果与原始帧逐像素一致
+
+文件格式（小端序）：
+    文件头   "SCRL" 版本 宽 高 通道数 固定导航栏高度
+    帧记录   类型 滚动偏移 条带长度 残差长度 + 条带PNG + 残差（zlib）；关键帧的条带为整帧PNG
+    结束记录 类型0xFF，其后为帧索引（每帧的记录位置和类型）和 "SCRX" 文件尾
+顺序解码（iter_archive_frames）只需向前读取，可直接读管道；随机解码（ScrollArchive）按文件尾的索引
+跳到目标帧之前最近的关键帧再依次应用增量帧
+"""
+
+import os
+import struct
+import zlib
+import cv2
+import numpy as np
+from config import CrawlerConfig
+from .scroll_tracker import ScrollTracker
+
+MAGIC = b"SCRL"
+INDEX_MAGIC = b"SCRX"
+VERSION = 1
+
+KEY_FRAME = 0
+DELTA_FRAME = 1
+END_RECORD = 0xFF
+
+_HEADER = struct.Struct("<4sBIIBH")     # 标记, 版本, 宽, 高, 通道数, 固定导航栏高度
+_RECORD = struct.Struct("<BIII")        # 类型, 滚动偏移, 条带长度, 残差长度
+_INDEX_ENTRY = struct.Struct("<QB")     # 记录位置, 类型
+_FOOTER = struct.Struct("<QI4s")        # 索引位置, 帧数, 标记
+
+# 残差（预测错误的像素）超过该比例时不如直接存关键帧
+MAX_RESIDUAL_RATIO = 0.25
+
+
+def _encode_png(image):
+    ok, data = cv2.imencode('.png', image)
+    if not ok:
+        raise ValueError("PNG编码失败")
+    return data.tobytes()
+
+
+def _decode_png(data):
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError("PNG解码失败")
+    return image
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("滚动截图归档不完整")
+    return data
+
+
+def predict_frame(previous, scroll, fixed_header):
+    """按滚动偏移由上一帧推出当前帧：导航栏不动，滚动区域上移scroll行（新露出的底部行仍为旧像素，由条带覆盖）"""
+    predicted = previous.copy()
+    if scroll:
+        predicted[fixed_header:previous.shape[0] - scroll] = previous[fixed_header + scroll:]
+    return predicted
+
+
+class ScrollArchiveWriter:
+    """滚动截图归档写入类（逐帧追加，可在截图流水线中边截边写）"""
+    
+    def __init__(self, path, fixed_header=None, keyframe_interval=0):
+        """keyframe_interval大于0时每隔这么多帧插入一个关键帧，缩短随机解码需要重放的帧数"""
+        self.path = path
+        self.fixed_header = CrawlerConfig.SCROLL_FIXED_HEADER_HEIGHT if fixed_header is None else fixed_header
+        self.keyframe_interval = keyframe_interval
+        self.tracker = ScrollTracker(fixed_header=self.fixed_header)
+        self.file = None
+        self.shape = None
+        self.previous = None
+        self.last_scroll = None  # 上一次的滚动偏移，作为下一帧的预计偏移
+        self.since_key = 0   # 距上一个关键帧的帧数
+        self.index = []      # [(记录位置, 类型)]
+        self.stats = {'key_frames': 0, 'delta_frames': 0, 'raw_bytes': 0, 'archive_bytes': 0}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def add_frame(self, frame):
+        """追加一帧（BGR或灰度数组），返回记录类型"""
+        if self.file is None:
+            self._open(frame)
+        
+        record = None
+        key_due = self.keyframe_interval and self.since_key >= self.keyframe_interval
+        if self.previous is not None and frame.shape == self.shape and not key_due:
+            record = self._delta_record(self.previous, frame)
+        if record is None:
+            record = (KEY_FRAME, 0, _encode_png(frame), b'')
+        
+        kind, scroll, strip, residual = record
+        self.index.append((self.file.tell(), kind))
+        self.file.write(_RECORD.pack(kind, scroll, len(strip), len(residual)))
+        self.file.write(strip)
+        self.file.write(residual)
+        
+        self.stats['key_frames' if kind == KEY_FRAME else 'delta_frames'] += 1
+        self.since_key = 1 if kind == KEY_FRAME else self.since_key + 1
+        self.stats['raw_bytes'] += frame.nbytes
+        self.previous = frame.copy()
+        return kind
+    
+    def close(self):
+        """写结束记录和帧索引，返回归档文件路径"""
+        if self.file is None:
+            return None
+        self.file.write(_RECORD.pack(END_RECORD, 0, 0, 0))
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(_INDEX_ENTRY.pack(*entry))
+        self.file.write(_FOOTER.pack(index_offset, len(self.index), INDEX_MAGIC))
+        self.stats['archive_bytes'] = self.file.tell()
+        self.file.close()
+        self.file = None
+        return self.path
+    
+    def _open(self, frame):
+        """按第一帧的尺寸写文件头
+        
+        先删除旧文件：增量爬取复用页面时旧归档是指向基线的硬链接，原地截断会改掉基线运行的归档
+        """
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        self.shape = frame.shape
+        if os.path.lexists(self.path):
+            os.remove(self.path)
+        self.file = open(self.path, 'wb')
+        self.file.write(_HEADER.pack(MAGIC, VERSION, width, height, channels, self.fixed_header))
+    
+    def _find_scroll(self, previous, frame):
+        """滚动偏移：先用行特征估计，再在估计值附近找滚动区域重叠部分逐像素差异最少的偏移"""
+        estimate = self.tracker.estimate_offset(previous, frame, expected=self.last_scroll)
+        if estimate is None:
+            return None
+        
+        height = frame.shape[0]
+        best_scroll, best_diff = None, None
+        for scroll in range(max(0, estimate - 2), min(height - self.fixed_header, estimate + 3)):
+            diff = np.count_nonzero(frame[self.fixed_header:height - scroll] != previous[self.fixed_header + scroll:])
+            if best_diff is None or diff < best_diff:
+                best_scroll, best_diff = scroll, diff
+                if diff == 0:
+                    break
+        if best_scroll:
+            self.last_scroll = best_scroll
+        return best_scroll
+    
+    def _delta_record(self, previous, frame):
+        """增量帧记录 (类型, 滚动偏移, 新露出行的PNG, 残差)，无法可靠预测时返回None（改存关键帧）"""
+        scroll = self._find_scroll(previous, frame)
+        if scroll is None:
+            return None
+        
+        height = frame.shape[0]
+        predicted = predict_frame(previous, scroll, self.fixed_header)
+        strip = b''
+        if scroll:
+            predicted[height - scroll:] = frame[height - scroll:]
+            strip = _encode_png(frame[height - scroll:])
+        
+        # 残差按uint8回绕相减，解码时相加即可还原；大部分为0，zlib压缩后很小
+        residual = frame - predicted
+        changed = np.count_nonzero(residual)
+        if changed > residual.size * MAX_RESIDUAL_RATIO:
+            return None
+        return DELTA_FRAME, scroll, strip, zlib.compress(residual.tobytes(), 6) if changed else b''
+
+
+class _FrameDecoder:
+    """按文件头参数把帧记录还原为图像"""
+    
+    def __init__(self, header):
+        magic, version, width, height, channels, fixed_header = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("不是滚动截图归档文件")
+        if version != VERSION:
+            raise ValueError(f"不支持的滚动截图归档版本: {version}")
+        self.shape = (height, width, channels) if channels > 1 else (height, width)
+        self.fixed_header = fixed_header
+    
+    def decode(self, previous, kind, scroll, strip, residual):
+        if kind == KEY_FRAME:
+            return _decode_png(strip)
+        
+        frame = predict_frame(previous, scroll, self.fixed_header)
+        if scroll:
+            frame[self.shape[0] - scroll:] = _decode_png(strip).reshape((scroll,) + self.shape[1:])
+        if residual:
+            frame += np.frombuffer(zlib.decompress(residual), dtype=np.uint8).reshape(self.shape)
+        return frame
+
+
+def iter_archive_frames(stream):
+    """顺序解码：从可读的二进制流（文件或管道）中依次产出每一帧，只向前读取"""
+    decoder = _FrameDecoder(_read_exact(stream, _HEADER.size))
+    frame = None
+    while True:
+        kind, scroll, strip_size, residual_size = _RECORD.unpack(_read_exact(stream, _RECORD.size))
+        if kind == END_RECORD:
+            return
+        strip = _read_exact(stream, strip_size)
+        residual = _read_exact(stream, residual_size)
+        frame = decoder.decode(frame, kind, scroll, strip, residual)
+        yield frame
+
+
+class ScrollArchive:
+    """滚动截图归档读取类（随机解码任意一帧；顺序访问时复用上一次解码的帧）"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.decoder = _FrameDecoder(_read_exact(self.file, _HEADER.size))
+        
+        self.file.seek(-_FOOTER.size, os.SEEK_END)
+        index_offset, count, magic = _FOOTER.unpack(_read_exact(self.file, _FOOTER.size))
+        if magic != INDEX_MAGIC:
+            raise ValueError("滚动截图归档缺少帧索引（写入未完成？）")
+        self.file.seek(index_offset)
+        self.index = [_INDEX_ENTRY.unpack(_read_exact(self.file, _INDEX_ENTRY.size)) for _ in range(count)]
+        self._cached = None   # (帧序号, 帧)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def __iter__(self):
+        for frame_index in range(len(self)):
+            yield self.read_frame(frame_index)
+    
+    def close(self):
+        self.file.close()
+    
+    def _read_record(self, frame_index):
+        self.file.seek(self.index[frame_index][0])
+        kind, scroll, strip_size, residual_size = _RECORD.unpack(_read_exact(self.file, _RECORD.size))
+        return kind, scroll, _read_exact(self.file, strip_size), _read_exact(self.file, residual_size)
+    
+    def read_frame(self, frame_index):
+        """解码第frame_index帧（从之前最近的关键帧或缓存的帧开始重放增量）"""
+        if not 0 <= frame_index < len(self.index):
+            raise IndexError(f"帧序号超出范围: {frame_index}")
+        
+        start = max(i for i in range(frame_index + 1) if self.index[i][1] == KEY_FRAME)
+        frame = None
+        if self._cached is not None and start <= self._cached[0] <= frame_index:
+            start, frame = self._cached[0] + 1, self._cached[1]
+        
+        for i in range(start, frame_index + 1):
+            frame = self.decoder.decode(frame, *self._read_record(i))
+        self._cached = (frame_index, frame)
+        return frame.copy()
+
+
+def pack_scroll_sequence(screenshot_paths, archive_path, fixed_header=None, keyframe_interval=0):
+    """把已保存的滚动截图（按顺序）打包为归档，返回写入统计"""
+    with ScrollArchiveWriter(archive_path, fixed_header, keyframe_interval) as writer:
+        for path in screenshot_paths:
+            frame = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if frame is None:
+                raise ValueError(f"无法读取截图: {path}")
+            writer.add_frame(frame)
+    return writer.stats
+
+
+def unpack_scroll_sequence(archive_path, output_dir, prefix="scroll"):
+    """把归档解码为逐帧PNG（<prefix>_<序号>.png，序号从1开始），返回文件路径列表"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    with open(archive_path, 'rb') as f:
+        for frame_index, frame in enumerate(iter_archive_frames(f)):
+            path = os.path.join(output_dir, f"{prefix}_{frame_index + 1}.png")
+            cv2.imwrite(path, frame)
+            paths.append(path)
+    return paths
\ No newline at end of file
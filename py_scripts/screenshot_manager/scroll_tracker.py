@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+滚动偏移跟踪器
+通过行特征匹配测量相邻两帧滚动截图之间的实际滚动像素
+"""
+
+import cv2
+import numpy as np
+from config import CrawlerConfig
+
+
+class ScrollTracker:
+    """滚动偏移跟踪器"""
+    
+    def __init__(self, fixed_header=None, max_error=None, column_bands=16, tie_tolerance=None):
+        self.fixed_header = CrawlerConfig.SCROLL_FIXED_HEADER_HEIGHT if fixed_header is None else fixed_header
+        self.max_error = max_error or CrawlerConfig.SCROLL_OFFSET_MAX_ERROR
+        self.tie_tolerance = CrawlerConfig.SCROLL_OFFSET_TIE_TOLERANCE if tie_tolerance is None else tie_tolerance
+        self.column_bands = column_bands
+    
+    def estimate_offset(self, previous, current, expected=None):
+        """估计当前帧相对上一帧向上滚动的像素数
+        
+        expected为预计的滚动像素（如本页上一次实测的偏移）。内容平坦或重复时多个偏移误差几乎相同，
+        此时取最接近expected的偏移；没有expected时视为无法可靠匹配，不偏向0（偏小会漏掉两帧之间的文字）
+        返回0表示没有滚动（已触底），返回None表示两帧无法可靠匹配
+        """
+        if previous is None or current is None or previous.shape != current.shape:
+            return None
+        
+        previous_rows = self._row_signature(previous)
+        current_rows = self._row_signature(current)
+        height = len(current_rows)
+        
+        # 至少保留四分之一的重叠区域，避免空白行造成误匹配
+        min_overlap = max(1, height // 4)
+        offsets = np.arange(0, height - min_overlap + 1)
+        if not len(offsets):
+            print("⚠️ 滚动区域过小")
+            return None
+        errors = np.array([np.abs(previous_rows[offset:] - current_rows[:height - offset]).mean() for offset in offsets])
+        
+        best_error = errors.min()
+        if best_error > self.max_error:
+            print(f"⚠️ 滚动偏移匹配失败 (最小误差 {best_error:.1f})")
+            return None
+        
+        # 与最小误差相差不超过容差的偏移都算并列；并列偏移集中在最优值附近时仍取最优值
+        tied = offsets[errors <= best_error + self.tie_tolerance]
+        if tied.max() - tied.min() <= 2:
+            return int(offsets[errors.argmin()])
+        if expected is None:
+            print(f"⚠️ 滚动偏移不确定（{len(tied)} 个偏移误差相近，{tied.min()}~{tied.max()}px）")
+            return None
+        return int(tied[np.abs(tied - expected).argmin()])
+    
+    def _row_signature(self, frame):
+        """把滚动区域压缩为每行若干列带的平均灰度"""
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        region = frame[self.fixed_header:]
+        return cv2.resize(region, (self.column_bands, region.shape[0]), interpolation=cv2.INTER_AREA).astype(np.float32)
\ No newline at end of file
@@ -6,11 +6,9 @@
 """
 
 import os
-import cv2
-import numpy as np
-from PIL import Image, ImageGrab
 import pygetwindow as gw
 from config import CrawlerConfig
+from capture_manager import get_capture_backend
 from .utils import ScreenshotUtils
 from .window_analyzer import WindowContentAnalyzer
 
@@ -83,20 +81,17 @@ class SystemWindowDetector:
             
             print(f"🔍 分析窗口: '{title}' - {ScreenshotUtils.format_bounds_info({'x': left, 'y': top, 'width': width, 'height': height})}")
             
-            # 截取窗口内容进行分析
-            window_screenshot = ImageGrab.grab(bbox=(left, top, left + width, top + height))
+            # 截取窗口内容进行分析（截图后端直接返回OpenCV格式）
+            screenshot_cv = get_capture_backend().grab((left, top, left + width, top + height))
             
             # 保存窗口截图用于调试
             safe_title = ScreenshotUtils.safe_filename(title)
             debug_path = ScreenshotUtils.save_debug_image(
-                window_screenshot, 
+                screenshot_cv, 
                 f"debug_window_{safe_title}.png", 
                 "窗口截图"
             )
             
-            # 转换为OpenCV格式分析
-            screenshot_cv = cv2.cvtColor(np.array(window_screenshot), cv2.COLOR_RGB2BGR)
-            
             # 使用分析器检测小程序特征区域
             miniprogram_bounds = self.analyzer.analyze_window_for_miniprogram(screenshot_cv, title)
             
@@ -51,8 +51,8 @@ class UIFeatureDetector:
         
         horizontal_lines = []
         if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
+            # 不同OpenCV版本返回(N,1,4)或(N,4)
+            for x1, y1, x2, y2 in lines.reshape(-1, 4):
                 # 检查是否为水平线（角度接近0度）
                 angle = abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
                 if angle < 10 or angle > 170:  # 水平线
@@ -5,10 +5,12 @@
 包含通用的工具函数和辅助方法
 """
 
+import hashlib
 import os
 import time
+import cv2
 import numpy as np
-from PIL import Image, ImageGrab
+from PIL import ImageGrab
 from config import CrawlerConfig
 
 
@@ -69,7 +71,6 @@ class ScreenshotUtils:
         try:
             filepath = os.path.join(CrawlerConfig.SCREENSHOTS_DIR, filename)
             if isinstance(image, np.ndarray):
-                import cv2
                 cv2.imwrite(filepath, image)
             else:
                 image.save(filepath)
@@ -123,4 +124,57 @@ class ScreenshotUtils:
     @staticmethod
     def format_bounds_info(bounds):
         """格式化边界信息输出"""
-        return f"位置({bounds['x']},{bounds['y']}) 尺寸({bounds['width']}x{bounds['height']})" 
\ No newline at end of file
+        return f"位置({bounds['x']},{bounds['y']}) 尺寸({bounds['width']}x{bounds['height']})"
+    
+    @staticmethod
+    def calculate_iou(bounds_a, bounds_b):
+        """计算两个区域的交并比（IoU），任一区域为空时返回0"""
+        if not bounds_a or not bounds_b:
+            return 0.0
+        
+        left = max(bounds_a['x'], bounds_b['x'])
+        top = max(bounds_a['y'], bounds_b['y'])
+        right = min(bounds_a['x'] + bounds_a['width'], bounds_b['x'] + bounds_b['width'])
+        bottom = min(bounds_a['y'] + bounds_a['height'], bounds_b['y'] + bounds_b['height'])
+        
+        intersection = max(0, right - left) * max(0, bottom - top)
+        union = bounds_a['width'] * bounds_a['height'] + bounds_b['width'] * bounds_b['height'] - intersection
+        return intersection / union if union > 0 else 0.0
+
+    @staticmethod
+    def calculate_perceptual_hash(image, hash_size=8):
+        """计算图像的64位差值感知哈希（dHash）
+
+        对轻微的渲染差异不敏感，可用汉明距离判断两张截图是否"看起来一样"
+        """
+        if not isinstance(image, np.ndarray):
+            image = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+
+        # 数组按截图后端约定视为BGR
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        pixels = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA).astype(np.int16)
+        diff = pixels[:, 1:] > pixels[:, :-1]
+
+        hash_value = 0
+        for bit in diff.flatten():
+            hash_value = (hash_value << 1) | int(bit)
+        return hash_value
+
+    @staticmethod
+    def calculate_content_digest(image, scale=4, quantize_bits=3):
+        """计算图像内容摘要：缩小scale倍、丢弃低quantize_bits位后取BLAKE2哈希
+
+        与感知哈希不同，任何一处文字变化都会改变摘要，用于判断页面内容是否与上次完全一致
+        """
+        if not isinstance(image, np.ndarray):
+            image = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+
+        height, width = image.shape[:2]
+        small = cv2.resize(image, (max(1, width // scale), max(1, height // scale)), interpolation=cv2.INTER_AREA)
+        quantized = np.ascontiguousarray(small >> quantize_bits)
+        return hashlib.blake2b(quantized.tobytes(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def hamming_distance(hash1, hash2):
+        """计算两个感知哈希之间的汉明距离"""
+        return bin(hash1 ^ hash2).count('1') 
\ No newline at end of file
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+小程序模拟器模块
+在Linux/CI上无需微信即可端到端运行爬虫，用于可复现的性能测试
+"""
+
+from .mini_program import MiniProgramSimulator, SimulatedPage
+from .environment import SimulatedEnvironment, SimulatorCaptureBackend, VirtualClock
+
+__all__ = ['MiniProgramSimulator', 'SimulatedPage', 'SimulatedEnvironment', 'SimulatorCaptureBackend', 'VirtualClock']
\ No newline at end of file
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟运行环境
+替换截图、输入、窗口几何和OCR调用，在无macOS/微信的环境下端到端运行爬虫
+"""
+
+import os
+import sys
+import threading
+import time
+import cv2
+from config import CrawlerConfig
+from tracer import tracer
+from metrics import ANALYSIS_LATENCY
+from capture_manager import CaptureBackend, set_capture_backend
+from .fake_modules import install_fake_modules, restore_modules, set_active_environment, get_fake_module
+from .mini_program import MiniProgramSimulator, LABEL_MARKER, LABEL_HEIGHT, decode_label_color
+
+TITLE_BAR_HEIGHT = 30
+WECHAT_BUNDLE_ID = "com.tencent.xinWeChat"
+
+
+class VirtualClock:
+    """虚拟时钟：time.sleep只推进虚拟时间，不真正等待"""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleep_count = 0
+        self.slept = 0.0
+        self._lock = threading.Lock()
+    
+    def sleep(self, seconds):
+        with self._lock:
+            self.now += seconds
+            self.sleep_count += 1
+            self.slept += seconds
+    
+    def advance(self, seconds):
+        """推进虚拟时间（不计为sleep）"""
+        with self._lock:
+            self.now += seconds
+    
+    def reset_counters(self):
+        with self._lock:
+            self.sleep_count = 0
+            self.slept = 0.0
+
+
+class SimulatorCaptureBackend(CaptureBackend):
+    """从模拟小程序渲染画面的截图后端"""
+    
+    name = 'simulator'
+    
+    def __init__(self, environment):
+        self.environment = environment
+    
+    def grab(self, bbox):
+        self.environment.count('frames')
+        self.environment.count('frame_pixels', (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]))
+        app = self.environment.app
+        return self._crop(app.render(), app.origin, bbox)
+
+
+class SimulatedEnvironment:
+    """模拟运行环境"""
+    
+    def __init__(self, app=None, pixels_per_scroll=60, analysis_latency=0.0, window_origin=(0, 0)):
+        self.app = app
+        self.pixels_per_scroll = pixels_per_scroll
+        self.analysis_latency = analysis_latency
+        self.window_origin = window_origin
+        self.screen_size = (1440, 900)
+        self.frontmost = WECHAT_BUNDLE_ID     # 前台应用，switch_app 模拟切到其他应用
+        self.clock = VirtualClock()
+        self.installed = False
+        self._replaced_modules = {}
+        self._real_sleep = None
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+    
+    # ---- 安装/卸载 ----
+    
+    def install(self):
+        """安装模拟依赖、虚拟时钟和截图后端（必须在导入爬虫模块之前调用）"""
+        if self.installed:
+            return self
+        if 'crawler_core' in sys.modules and sys.modules.get('pyautogui') is not get_fake_module('pyautogui'):
+            raise RuntimeError("模拟环境必须在导入爬虫模块之前安装")
+        
+        self._replaced_modules = install_fake_modules()
+        set_active_environment(self)
+        
+        if self.app is None:
+            from ocr_manager.button_matcher import ButtonMatcher
+            self.app = MiniProgramSimulator(ButtonMatcher().target_buttons)
+        self.set_app(self.app)
+        
+        self._real_sleep = time.sleep
+        time.sleep = self.clock.sleep
+        set_capture_backend(SimulatorCaptureBackend(self))
+        # 输入调度器按虚拟时间计算操作间隔、查询模拟的前台窗口（必须在替换pyautogui之后导入）
+        from input_scheduler import InputScheduler, set_input_scheduler
+        from focus_tracker import FocusTracker
+        set_input_scheduler(InputScheduler(clock=lambda: self.clock.now, focus_tracker=FocusTracker(probe=self._focus_probe)))
+        self.installed = True
+        return self
+    
+    def set_app(self, app):
+        """切换模拟小程序"""
+        app.clock = self.clock
+        app.origin = (self.window_origin[0], self.window_origin[1] + TITLE_BAR_HEIGHT)
+        self.app = app
+    
+    def uninstall(self):
+        """恢复真实依赖和time.sleep"""
+        if not self.installed:
+            return
+        time.sleep = self._real_sleep
+        set_capture_backend(None)
+        from input_scheduler import set_input_scheduler
+        set_input_scheduler(None)
+        set_active_environment(None)
+        restore_modules(self._replaced_modules)
+        self.installed = False
+    
+    def __enter__(self):
+        return self.install()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
+    
+    def use_output_dir(self, output_dir):
+        """把爬取结果（含结果数据库）、截图及其内容寻址存储、原始帧环形缓冲区、按钮缓存、截图索引、OCR运行配置和服务令牌重定向到指定目录"""
+        CrawlerConfig.OUTPUT_DIR = output_dir
+        CrawlerConfig.SCREENSHOTS_DIR = os.path.join(output_dir, "screenshots")
+        CrawlerConfig.BLOB_STORE_DIR = os.path.join(output_dir, "blobs")
+        CrawlerConfig.FRAME_RING_FILE = os.path.join(output_dir, "frame_ring.bin")
+        CrawlerConfig.BUTTON_CACHE_FILE = os.path.join(output_dir, "button_cache.json")
+        CrawlerConfig.PHASH_INDEX_FILE = os.path.join(output_dir, "phash_index.tsv")
+        CrawlerConfig.RESULTS_DB_FILE = os.path.join(output_dir, "crawl_results.db")
+        CrawlerConfig.METRICS_SNAPSHOT_FILE = os.path.join(output_dir, "metrics_snapshot.json")
+        CrawlerConfig.DAEMON_TOKEN_FILE = os.path.join(output_dir, "daemon_token")
+        CrawlerConfig.OCR_PROFILE_FILE = os.path.join(output_dir, "ocr_profile.json")
+    
+    # ---- 爬虫接入 ----
+    
+    def create_crawler(self):
+        """创建接入模拟环境的主爬虫器"""
+        from crawler_core import MainCrawler
+        crawler = MainCrawler()
+        self.attach(crawler)
+        return crawler
+    
+    def attach(self, crawler):
+        """替换爬虫实例上依赖真实窗口和分析服务器的方法"""
+        window_manager = crawler.window_manager
+        window_manager.find_and_setup_wechat_window = lambda: self._setup_window(window_manager)
+        window_manager.detect_mini_program_area = lambda: self._detect_mini_program_area(window_manager)
+        
+        crawler.screenshot_manager.detection_strategy.detect_miniprogram_bounds = self.get_mini_program_bounds
+        crawler.analysis_client.check_server_health = lambda: True
+        crawler.analysis_client.analyze_screenshot = self._analyze_screenshot
+        return crawler
+    
+    def get_mini_program_bounds(self):
+        """小程序区域的屏幕坐标"""
+        return {
+            'x': self.app.origin[0],
+            'y': self.app.origin[1],
+            'width': self.app.width,
+            'height': self.app.height
+        }
+    
+    def _setup_window(self, window_manager):
+        window_manager.wechat_window_bounds = {
+            'x': self.window_origin[0],
+            'y': self.window_origin[1],
+            'width': self.app.width,
+            'height': self.app.height + TITLE_BAR_HEIGHT
+        }
+        return True
+    
+    def _detect_mini_program_area(self, window_manager):
+        window_manager.is_in_mini_program = True
+        window_manager.mini_program_bounds = {
+            'x': 0,
+            'y': TITLE_BAR_HEIGHT,
+            'width': self.app.width,
+            'height': self.app.height
+        }
+        return True
+    
+    def _analyze_screenshot(self, image_path, page_name="unknown"):
+        """模拟分析服务器：返回截图中可见的文字"""
+        with tracer.span('analysis', page=page_name):
+            self.clock.advance(self.analysis_latency)
+        ANALYSIS_LATENCY.observe(self.analysis_latency)
+        image = cv2.imread(image_path)
+        if image is None:
+            return None
+        return {
+            'extractedTexts': [
+                {'text': text, 'confidence': confidence, 'position': {'x': bbox[0][0], 'y': bbox[0][1]}}
+                for bbox, text, confidence in self._decode_labels(image)
+            ],
+            'detectedButtons': [],
+            'detectedIcons': [],
+            'layoutInfo': {'source': 'simulator'},
+            'colorPalette': []
+        }
+    
+    # ---- 输入和OCR ----
+    
+    def switch_app(self, bundle_id):
+        """模拟其他应用切到前台（微信窗口失去焦点）"""
+        self.frontmost = bundle_id
+    
+    def _focus_probe(self, x, y):
+        """模拟的前台应用查询（对应 focus_tracker.macos_focus_probe）：屏幕上只有微信窗口"""
+        window = (self.window_origin[0], self.window_origin[1], self.app.width, self.app.height + TITLE_BAR_HEIGHT)
+        inside = window[0] <= x < window[0] + window[2] and window[1] <= y < window[1] + window[3]
+        return {'bundle_id': self.frontmost, 'name': '微信' if self.frontmost == WECHAT_BUNDLE_ID else self.frontmost,
+                'window': window, 'owner': WECHAT_BUNDLE_ID if inside else None}
+    
+    def handle_click(self, x, y):
+        self.count('clicks')
+        if x is None or y is None:
+            return
+        if self.frontmost != WECHAT_BUNDLE_ID:
+            # 非活动窗口上的第一次点击只激活窗口，不传给小程序
+            self.frontmost = WECHAT_BUNDLE_ID
+            self.count('activation_clicks')
+            return
+        self.app.click(x, y)
+    
+    def handle_scroll(self, clicks, x=None, y=None):
+        self.count('scrolls')
+        self.app.scroll(clicks, self.pixels_per_scroll)
+    
+    def read_text(self, image):
+        """模拟EasyOCR.readtext"""
+        if isinstance(image, str):
+            image = cv2.imread(image)
+        self.count('ocr_calls')
+        self.count('ocr_pixels', image.shape[0] * image.shape[1])
+        return self._decode_labels(image)
+    
+    def _decode_labels(self, image):
+        """识别图像中的颜色编码文字色块，被裁掉上下边缘的色块视为无法识别"""
+        mask = (image[:, :, 2] == LABEL_MARKER).astype('uint8')
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+        
+        results = []
+        for index in range(1, count):
+            x, y, width, height = (int(v) for v in stats[index, :4])
+            if height < LABEL_HEIGHT:
+                continue
+            
+            label_id = decode_label_color(image[y, x])
+            if label_id >= len(self.app.labels):
+                continue
+            
+            # 左右被裁掉的色块只识别出可见部分的文字
+            text = self.app.labels[label_id]
+            full_width = self.app.label_width(text)
+            if width < full_width:
+                text = text[:max(1, len(text) * width // full_width)]
+            
+            bbox = [[x, y], [x + width, y], [x + width, y + height], [x, y + height]]
+            results.append((bbox, text, 0.99))
+        return results
+    
+    # ---- 统计 ----
+    
+    def count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+    
+    def reset_stats(self):
+        """清空计数（保留小程序状态）"""
+        with self._stats_lock:
+            self.stats = {'frames': 0, 'frame_pixels': 0, 'ocr_calls': 0, 'ocr_pixels': 0, 'clicks': 0, 'scrolls': 0,
+                          'activation_clicks': 0}
+        self.clock.reset_counters()
+    
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['sleeps'] = self.clock.sleep_count
+        stats['sleep_seconds'] = round(self.clock.slept, 3)
+        stats['navigations'] = len(self.app.history) if self.app else 0
+        return stats
\ No newline at end of file
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟依赖模块
+用模拟实现替换 pyautogui / pygetwindow / easyocr，把输入和OCR转发给当前激活的模拟环境
+"""
+
+import sys
+import time
+import types
+
+FAKE_MODULE_NAMES = ('pyautogui', 'pygetwindow', 'easyocr')
+
+_active_environment = None
+_fake_modules = {}
+
+
+def set_active_environment(environment):
+    """设置接收输入和OCR调用的模拟环境"""
+    global _active_environment
+    _active_environment = environment
+
+
+def _environment():
+    if _active_environment is None:
+        raise RuntimeError("模拟环境未安装")
+    return _active_environment
+
+
+def _build_pyautogui():
+    module = types.ModuleType('pyautogui')
+    module.PAUSE = 0.1
+    module.FAILSAFE = True
+    
+    def _pause():
+        # 与真实pyautogui一致：每次操作后等待PAUSE秒
+        if module.PAUSE:
+            time.sleep(module.PAUSE)
+    
+    def click(x=None, y=None, clicks=1, interval=0.0, button='left', duration=0.0, **kwargs):
+        for _ in range(clicks):
+            _environment().handle_click(x, y)
+        _pause()
+    
+    def scroll(clicks, x=None, y=None, **kwargs):
+        _environment().handle_scroll(clicks, x, y)
+        _pause()
+    
+    def moveTo(x=None, y=None, duration=0.0, **kwargs):
+        _pause()
+    
+    def drag(x_offset=0, y_offset=0, duration=0.0, *args, **kwargs):
+        _pause()
+    
+    def press(keys, presses=1, interval=0.0, **kwargs):
+        _pause()
+    
+    def hotkey(*args, **kwargs):
+        _pause()
+    
+    def size():
+        return _environment().screen_size
+    
+    for function in (click, scroll, moveTo, drag, press, hotkey, size):
+        setattr(module, function.__name__, function)
+    return module
+
+
+def _build_pygetwindow():
+    module = types.ModuleType('pygetwindow')
+    module.getAllTitles = lambda: []
+    module.getAllWindows = lambda: []
+    module.getWindowsWithTitle = lambda title: []
+    module.getWindowGeometry = lambda title: None
+    return module
+
+
+def _build_easyocr():
+    module = types.ModuleType('easyocr')
+    
+    class Reader:
+        """模拟EasyOCR读取器，按颜色编码色块识别文字"""
+        
+        def __init__(self, lang_list=None, gpu=False, verbose=False, **kwargs):
+            self.lang_list = lang_list
+        
+        def readtext(self, image, **kwargs):
+            return _environment().read_text(image)
+    
+    module.Reader = Reader
+    return module
+
+
+def install_fake_modules():
+    """把模拟模块放入sys.modules，返回被替换的原模块以便恢复"""
+    if not _fake_modules:
+        _fake_modules.update({
+            'pyautogui': _build_pyautogui(),
+            'pygetwindow': _build_pygetwindow(),
+            'easyocr': _build_easyocr()
+        })
+    
+    replaced = {}
+    for name in FAKE_MODULE_NAMES:
+        replaced[name] = sys.modules.get(name)
+        sys.modules[name] = _fake_modules[name]
+    return replaced
+
+
+def restore_modules(replaced):
+    """恢复被替换的原模块"""
+    for name, module in replaced.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+
+def get_fake_module(name):
+    return _fake_modules.get(name)
\ No newline at end of file
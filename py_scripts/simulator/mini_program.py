@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本化小程序
+按脚本渲染主页按钮和可滚动内页（内页可带跳转到下一级页面的按钮），响应点击、滚动和返回操作
+
+文字以颜色编码的色块渲染：R通道固定为标记值，G/B通道编码文字编号，
+模拟OCR按色块解码即可得到文字，任意裁剪区域都能正确识别
+"""
+
+import numpy as np
+
+LABEL_MARKER = 17          # 文字色块的R通道标记值
+LABEL_HEIGHT = 20          # 文字色块高度
+LABEL_CHAR_WIDTH = 14      # 每个字符的色块宽度
+HEADER_HEIGHT = 60         # 固定导航栏高度
+MAIN_PAGE = "主页"
+
+BACKGROUND_COLOR = (255, 255, 255)
+HEADER_COLOR = (246, 246, 246)
+ARROW_COLOR = (30, 30, 30)
+BUTTON_COLOR = (250, 242, 235)
+BUTTON_BORDER_COLOR = (210, 200, 190)
+SEPARATOR_COLOR = (225, 225, 225)
+
+
+def encode_label_color(label_id):
+    """文字编号 -> BGR颜色"""
+    return (label_id % 256, label_id // 256, LABEL_MARKER)
+
+
+def decode_label_color(pixel):
+    """BGR颜色 -> 文字编号"""
+    return int(pixel[1]) * 256 + int(pixel[0])
+
+
+class SimulatedPage:
+    """模拟内页"""
+    
+    def __init__(self, name, item_count=20, row_height=64, links=()):
+        """links为页面顶部按钮跳转到的页面名称列表"""
+        self.name = name
+        self.items = [f"{name}条目{i + 1}" for i in range(item_count)]
+        self.row_height = row_height
+        self.links = list(links)
+    
+    @property
+    def items_top(self):
+        return 20 + len(self.links) * 76
+    
+    @property
+    def content_height(self):
+        return self.items_top + len(self.items) * self.row_height + 20
+    
+    def link_rects(self, width):
+        """页面顶部跳转按钮的区域（内容坐标）"""
+        return {name: (12, 20 + i * 76, width - 24, 60) for i, name in enumerate(self.links)}
+
+
+class MiniProgramSimulator:
+    """脚本化小程序模拟器"""
+    
+    def __init__(self, buttons, app_name="模拟小程序", pages=None, width=414, height=736, load_time=0.5, clock=None):
+        """buttons为主页按钮文字列表；pages为 {页面名称: SimulatedPage}（含下一级页面），缺省时自动生成"""
+        self.app_name = app_name
+        self.buttons = list(buttons)
+        self.pages = pages or {
+            name: SimulatedPage(name, item_count=12 + (i % 4) * 6)
+            for i, name in enumerate(self.buttons)
+        }
+        self.width = width
+        self.height = height
+        self.load_time = load_time
+        self.clock = clock
+        self.origin = (0, 0)  # 小程序左上角的屏幕坐标，由模拟环境设置
+        
+        # 预先登记全部文字，模拟OCR只读访问
+        self.labels = []
+        self.label_ids = {}
+        for text in [app_name] + self.buttons + list(self.pages) + [
+            text for page in self.pages.values() for text in page.links + page.items
+        ]:
+            self._register_label(text)
+        
+        self.button_rects = self._layout_buttons()
+        self._content_cache = {}
+        self.reset()
+    
+    def reset(self):
+        """回到主页顶部"""
+        self.current_page = MAIN_PAGE
+        self.stack = [MAIN_PAGE]  # 页面栈，返回时弹出一级
+        self.scroll_offset = 0
+        self.ready_at = 0
+        self.history = []
+    
+    def update_page(self, page_name):
+        """模拟页面内容更新：条目顺序倒转（文字均已登记），清除渲染缓存"""
+        self.pages[page_name].items.reverse()
+        self._content_cache.pop(page_name, None)
+    
+    def _register_label(self, text):
+        if text not in self.label_ids:
+            self.label_ids[text] = len(self.labels)
+            self.labels.append(text)
+    
+    def label_width(self, text):
+        return min(self.width - 48, len(text) * LABEL_CHAR_WIDTH + 8)
+    
+    def _layout_buttons(self):
+        """主页按钮两列网格布局（内容坐标）"""
+        rects = {}
+        column_width = (self.width - 36) // 2
+        for i, name in enumerate(self.buttons):
+            row, column = divmod(i, 2)
+            x = 12 + column * (column_width + 12)
+            y = 20 + row * 76
+            rects[name] = (x, y, column_width, 60)
+        return rects
+    
+    # ---- 交互 ----
+    
+    def _now(self):
+        return self.clock.now if self.clock else 0
+    
+    def is_loading(self):
+        return self._now() < self.ready_at
+    
+    def click(self, x, y):
+        """处理屏幕坐标的点击，返回是否触发了页面跳转"""
+        local_x, local_y = x - self.origin[0], y - self.origin[1]
+        if not (0 <= local_x < self.width and 0 <= local_y < self.height) or self.is_loading():
+            return False
+        
+        if self.current_page != MAIN_PAGE and local_x < 70 and local_y < HEADER_HEIGHT:
+            self._go_back()
+            return True
+        
+        content_y = local_y - HEADER_HEIGHT + self.scroll_offset
+        if self.current_page == MAIN_PAGE:
+            rects = self.button_rects
+        else:
+            rects = self.pages[self.current_page].link_rects(self.width)
+        for name, (bx, by, bw, bh) in rects.items():
+            if bx <= local_x < bx + bw and by <= content_y < by + bh and local_y >= HEADER_HEIGHT:
+                self._navigate(name)
+                return True
+        return False
+    
+    def scroll(self, clicks, pixels_per_click=60):
+        """滚动（clicks为负表示向下滚动）"""
+        if self.is_loading():
+            return
+        max_offset = max(0, self._content(self.current_page).shape[0] - (self.height - HEADER_HEIGHT))
+        self.scroll_offset = int(min(max_offset, max(0, self.scroll_offset - clicks * pixels_per_click)))
+    
+    def _navigate(self, page_name):
+        self.stack.append(page_name)
+        self._show(page_name)
+    
+    def _go_back(self):
+        if len(self.stack) > 1:
+            self.stack.pop()
+        self._show(self.stack[-1])
+    
+    def _show(self, page_name):
+        self.history.append((self.current_page, page_name))
+        self.current_page = page_name
+        self.scroll_offset = 0
+        self.ready_at = self._now() + self.load_time
+    
+    # ---- 渲染 ----
+    
+    def render(self):
+        """渲染当前视口（BGR）"""
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        frame[:] = BACKGROUND_COLOR
+        frame[:HEADER_HEIGHT] = HEADER_COLOR
+        
+        is_main = self.current_page == MAIN_PAGE
+        title = self.app_name if is_main else self.current_page
+        self._draw_label(frame, title, (self.width - self.label_width(title)) // 2, (HEADER_HEIGHT - LABEL_HEIGHT) // 2 + 4)
+        if not is_main:
+            frame[34:47, 26:41] = ARROW_COLOR
+        
+        # 页面加载中只显示导航栏
+        if self.is_loading():
+            return frame
+        
+        content = self._content(self.current_page)
+        visible = content[self.scroll_offset:self.scroll_offset + self.height - HEADER_HEIGHT]
+        frame[HEADER_HEIGHT:HEADER_HEIGHT + visible.shape[0]] = visible
+        return frame
+    
+    def _content(self, page_name):
+        """渲染整页内容（缓存）"""
+        content = self._content_cache.get(page_name)
+        if content is not None:
+            return content
+        
+        if page_name == MAIN_PAGE:
+            content = self._new_canvas(max(self.height - HEADER_HEIGHT, 40 + 76 * ((len(self.buttons) + 1) // 2)))
+            for name, (x, y, w, h) in self.button_rects.items():
+                content[y:y + h, x:x + w] = BUTTON_BORDER_COLOR
+                content[y + 2:y + h - 2, x + 2:x + w - 2] = BUTTON_COLOR
+                label_width = self.label_width(name)
+                self._draw_label(content, name, x + (w - label_width) // 2, y + (h - LABEL_HEIGHT) // 2)
+        else:
+            page = self.pages[page_name]
+            content = self._new_canvas(max(self.height - HEADER_HEIGHT, page.content_height))
+            for name, (x, y, w, h) in page.link_rects(self.width).items():
+                content[y:y + h, x:x + w] = BUTTON_BORDER_COLOR
+                content[y + 2:y + h - 2, x + 2:x + w - 2] = BUTTON_COLOR
+                self._draw_label(content, name, x + (w - self.label_width(name)) // 2, y + (h - LABEL_HEIGHT) // 2)
+            for i, item in enumerate(page.items):
+                top = page.items_top + i * page.row_height
+                self._draw_label(content, item, 24, top + 10)
+                # 右侧灰度条纹为滚动偏移匹配提供纹理
+                shade = 90 + (i * 37) % 140
+                content[top + 8:top + page.row_height - 16, self.width - 80:self.width - 24] = (shade, shade, shade)
+                content[top + page.row_height - 2:top + page.row_height - 1, 16:self.width - 16] = SEPARATOR_COLOR
+        
+        content.flags.writeable = False
+        self._content_cache[page_name] = content
+        return content
+    
+    def _new_canvas(self, height):
+        canvas = np.empty((height, self.width, 3), dtype=np.uint8)
+        canvas[:] = BACKGROUND_COLOR
+        return canvas
+    
+    def _draw_label(self, canvas, text, x, y):
+        canvas[y:y + LABEL_HEIGHT, x:x + self.label_width(text)] = encode_label_color(self.label_ids[text])
\ No newline at end of file
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+阶段耗时追踪器
+记录各阶段耗时区间，导出Chrome trace（chrome://tracing / Perfetto）并汇总各阶段p50/p95
+"""
+
+import json
+import os
+import threading
+import time
+from config import CrawlerConfig
+
+
+class _NullSpan:
+    """追踪关闭时使用的空区间，进入和退出都不做任何事"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """一个耗时区间"""
+    
+    __slots__ = ('tracer', 'name', 'category', 'args', 'started')
+    
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+    
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        ended = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        self.tracer._add_event(self.name, self.category, self.started, ended - self.started, self.args)
+        return False
+
+
+class Tracer:
+    """阶段耗时追踪器"""
+    
+    def __init__(self, enabled=None):
+        self.enabled = CrawlerConfig.TRACE_ENABLED if enabled is None else enabled
+        self.reset()
+    
+    def reset(self):
+        """清空已记录的区间，开始新一轮追踪"""
+        self.origin = time.perf_counter_ns()
+        self.events = []
+        self.thread_names = {}
+    
+    def span(self, name, category='stage', **args):
+        """返回记录耗时的上下文管理器：with tracer.span('ocr'): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args or None)
+    
+    def _add_event(self, name, category, started, duration, args):
+        thread = threading.current_thread()
+        if thread.ident not in self.thread_names:
+            self.thread_names[thread.ident] = thread.name
+        # list.append在CPython中是原子操作，后台线程可直接写入
+        self.events.append((name, category, started, duration, thread.ident, args))
+    
+    def get_stage_stats(self, category=None):
+        """按区间名称汇总次数、总耗时和p50/p95（毫秒）"""
+        durations = {}
+        for name, event_category, _, duration, _, _ in list(self.events):
+            if category is None or event_category == category:
+                durations.setdefault(name, []).append(duration / 1e6)
+        
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            stats[name] = {
+                'count': len(values),
+                'total_ms': round(sum(values), 3),
+                'p50_ms': round(self._percentile(values, 50), 3),
+                'p95_ms': round(self._percentile(values, 95), 3)
+            }
+        return dict(sorted(stats.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+    
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        """最近秩百分位数"""
+        if not sorted_values:
+            return 0
+        rank = max(1, -(-len(sorted_values) * percent // 100))
+        return sorted_values[int(rank) - 1]
+    
+    def export_chrome_trace(self, filepath):
+        """导出Chrome trace JSON"""
+        pid = os.getpid()
+        thread_names = dict(self.thread_names)
+        thread_ids = {ident: index + 1 for index, ident in enumerate(thread_names)}
+        
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_ids[ident], 'args': {'name': name}}
+            for ident, name in thread_names.items()
+        ]
+        for name, category, started, duration, ident, args in list(self.events):
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (started - self.origin) / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': thread_ids.get(ident, 0)
+            }
+            if args:
+                event['args'] = {key: str(value) for key, value in args.items()}
+            trace_events.append(event)
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return filepath
+
+
+# 进程内共享的追踪器
+tracer = Tracer()
\ No newline at end of file
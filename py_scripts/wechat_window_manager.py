@@ -7,11 +7,11 @@
 
 import subprocess
 import time
-import pyautogui
 import cv2
 import numpy as np
-from PIL import Image, ImageGrab
 from config import CrawlerConfig
+from capture_manager import grab_bounds
+from input_scheduler import get_input_scheduler
 
 class WeChatWindowManager:
     """微信窗口管理器"""
@@ -20,6 +20,7 @@ class WeChatWindowManager:
         self.mini_program_bounds = None
         self.is_in_mini_program = False
         self.wechat_window_bounds = None
+        self.input = get_input_scheduler()
         
     def find_and_setup_wechat_window(self):
         """查找并设置微信窗口"""
@@ -76,16 +77,8 @@ class WeChatWindowManager:
             return False
         
         try:
-            # 截取微信窗口
-            screenshot = ImageGrab.grab(bbox=(
-                self.wechat_window_bounds['x'],
-                self.wechat_window_bounds['y'],
-                self.wechat_window_bounds['x'] + self.wechat_window_bounds['width'],
-                self.wechat_window_bounds['y'] + self.wechat_window_bounds['height']
-            ))
-            
-            # 转换为OpenCV格式
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            # 截取微信窗口（截图后端直接返回OpenCV格式）
+            screenshot_cv = grab_bounds(self.wechat_window_bounds)
             
             # 检测是否已经在小程序界面
             if self.is_already_in_mini_program(screenshot_cv):
@@ -210,8 +203,8 @@ class WeChatWindowManager:
         for pos in entry_positions:
             try:
                 print(f"🎯 尝试点击位置: {pos}")
-                pyautogui.click(pos[0], pos[1])
-                time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
+                self.input.click(pos[0], pos[1])
+                self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
                 
                 # 检测是否成功进入小程序界面
                 if self.detect_mini_program_area():
@@ -235,14 +228,7 @@ class WeChatWindowManager:
         
         try:
             # 截取当前屏幕
-            screenshot = ImageGrab.grab(bbox=(
-                self.wechat_window_bounds['x'],
-                self.wechat_window_bounds['y'],
-                self.wechat_window_bounds['x'] + self.wechat_window_bounds['width'],
-                self.wechat_window_bounds['y'] + self.wechat_window_bounds['height']
-            ))
-            
-            screenshot_cv = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+            screenshot_cv = grab_bounds(self.wechat_window_bounds)
             
             # 查找小程序图标（通常是圆角矩形）
             mini_programs = self.find_mini_program_icons(screenshot_cv)
@@ -254,8 +240,8 @@ class WeChatWindowManager:
                 click_y = self.wechat_window_bounds['y'] + first_program[1]
                 
                 print(f"🎯 点击第一个小程序: ({click_x}, {click_y})")
-                pyautogui.click(click_x, click_y)
-                time.sleep(CrawlerConfig.PAGE_LOAD_DELAY)
+                self.input.click(click_x, click_y)
+                self.input.wait(CrawlerConfig.PAGE_LOAD_DELAY)
                 
                 self.is_in_mini_program = True
                 print("✅ 已进入小程序")
@@ -322,10 +308,9 @@ class WeChatWindowManager:
                  safe_top_area_height // 2)
         
         try:
-            print(f"🎯 聚焦到小程序顶部安全区域: ({center_x}, {safe_y})")
-            pyautogui.click(center_x, safe_y)
-            time.sleep(CrawlerConfig.FOCUS_DELAY)
-            print("✅ 已安全聚焦到小程序顶部区域")
+            # 交给输入调度器：窗口刚被点击过时跳过，紧接着还要点击时与之合并，聚焦后的等待为 focus 操作间隔
+            if self.input.focus(center_x, safe_y):
+                print(f"🎯 聚焦到小程序顶部安全区域: ({center_x}, {safe_y})")
             return True
         except Exception as e:
             print(f"❌ 聚焦失败: {e}")
@@ -343,12 +328,17 @@ class WeChatWindowManager:
             'height': self.mini_program_bounds['height']
         }
     
-    def setup_mini_program_environment(self):
-        """设置小程序环境（完整流程）"""
+    def setup_mini_program_environment(self, reuse_window=False):
+        """设置小程序环境（完整流程）
+        
+        reuse_window为True且已记录微信窗口位置时，跳过窗口查找和重新摆放（批量模式下窗口不会移动）
+        """
         print("🚀 开始设置小程序环境...")
         
         # 1. 查找并设置微信窗口
-        if not self.find_and_setup_wechat_window():
+        if reuse_window and self.wechat_window_bounds:
+            print("♻️ 复用已设置的微信窗口")
+        elif not self.find_and_setup_wechat_window():
             return False
         
         # 2. 动态检测小程序区域